@@ -0,0 +1,203 @@
+from chip8_control_unit import Chip8ControlUnit
+from chip8_scheduler import Chip8Scheduler
+from chip8_rom import Chip8Rom
+import argparse
+import asyncio
+
+FRAME_RATE = 60
+
+class Chip8SessionInput:
+	"""
+	Input provider whose keys are set by the host, e.g. from the messages of a remote client.
+	"""
+	def __init__(self) -> None:
+		self.keys = 0
+
+	def get_keys(self) -> int:
+		return self.keys
+
+
+class Chip8Session:
+	"""
+	A control unit driven by a coroutine instead of a thread or a busy loop. Every frame runs the scheduler (sampling
+	the keys, executing the instructions and ticking the timers owed for the elapsed time) and then yields to the event
+	loop until the next frame is due, so any number of sessions share one thread. Presentation is a separate task:
+	any number of consumers can iterate frames() to receive the screen whenever it changes.
+	"""
+	def __init__(self, control_unit:Chip8ControlUnit, instructions_per_second:int=500, frame_rate:int=FRAME_RATE) -> None:
+		"""
+		Parameters
+		----------
+		control_unit : The Chip8ControlUnit to drive. Its input provider is replaced by a Chip8SessionInput.
+		instructions_per_second : The speed of the CPU.
+		frame_rate : The number of frames per second.
+		"""
+		self.control_unit = control_unit
+		self.input = Chip8SessionInput()
+		control_unit.machine.set_input_provider(self.input)
+		self.instructions_per_second = instructions_per_second
+		self.frame_period = 1.0 / frame_rate
+		self.frames_run = 0
+		self.finished = False
+		self._frame_done = asyncio.Condition()
+
+	def set_keys(self, keys:int) -> None:
+		"""
+		Set the state of the 16 keys, sampled at the start of the next frame.
+
+		Parameters
+		----------
+		keys : A 16 bit mask, bit n is set if the key 0xn is pressed.
+		"""
+		self.input.keys = keys & 0xFFFF
+
+	async def run(self, frames:int|None=None) -> None:
+		"""
+		Run the session at its frame rate.
+
+		Parameters
+		----------
+		frames : The number of frames to run, None to run until the task is cancelled.
+		"""
+		loop = asyncio.get_running_loop()
+		scheduler = Chip8Scheduler(self.control_unit, self.instructions_per_second, clock=loop.time)
+		next_frame = loop.time()
+		try:
+			while frames is None or self.frames_run < frames:
+				scheduler.run_frame()
+				self.frames_run += 1
+				async with self._frame_done:
+					self._frame_done.notify_all()
+
+				# Frames are due on a fixed grid, a late frame doesn't push the following ones back
+				next_frame += self.frame_period
+				now = loop.time()
+				if next_frame < now:
+					next_frame = now
+				await asyncio.sleep(next_frame - now)
+		finally:
+			self.finished = True
+			async with self._frame_done:
+				self._frame_done.notify_all()
+
+	async def frames(self):
+		"""
+		Iterate the screen, once when the iteration starts and then after every frame that changed it, until the
+		session finishes. A slow consumer skips frames instead of falling behind.
+
+		Yields
+		------
+		The framebuffer with one bit per pixel, see Chip8Screen.pack.
+		"""
+		machine = self.control_unit.machine
+		changes = None
+		while True:
+			if machine.get_screen_changes() != changes:
+				changes = machine.get_screen_changes()
+				yield machine.get_packed_screen()
+			if self.finished:
+				return
+			async with self._frame_done:
+				await self._frame_done.wait()
+
+
+class Chip8Host:
+	"""
+	Hosts any number of sessions in one event loop, one task per session.
+	"""
+	def __init__(self) -> None:
+		self.sessions = {}
+
+	def start(self, control_unit:Chip8ControlUnit, instructions_per_second:int=500, frames:int|None=None) -> Chip8Session:
+		"""
+		Start running a control unit as a new session. Must be called from a coroutine.
+		"""
+		session = Chip8Session(control_unit, instructions_per_second)
+		task = asyncio.create_task(session.run(frames))
+		self.sessions[session] = task
+		task.add_done_callback(lambda task: self.sessions.pop(session, None))
+		return session
+
+	async def stop(self, session:Chip8Session) -> None:
+		"""
+		Stop a session and wait for its task to finish.
+		"""
+		task = self.sessions.pop(session, None)
+		if task is not None:
+			task.cancel()
+			try:
+				await task
+			except asyncio.CancelledError:
+				pass
+
+	async def serve(self, rom:Chip8Rom, host:str="127.0.0.1", port:int=0, instructions_per_second:int=500) -> asyncio.AbstractServer:
+		"""
+		Start a local TCP server (a stand-in for a websocket endpoint) where every connection plays its own session of
+		a ROM. The protocol is line based:
+
+		client -> server: "keys NNNN" with the 16 bit key mask in hexadecimal, "quit" to end the session.
+		server -> client: "frame ..." with the packed framebuffer (see Chip8Screen.pack) in hexadecimal, whenever it
+		changes.
+
+		Returns
+		-------
+		The asyncio server, already listening. Its sockets tell the port when 0 was requested.
+		"""
+		async def handle(reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+			control_unit = Chip8ControlUnit()
+			control_unit.load_rom(rom)
+			session = self.start(control_unit, instructions_per_second)
+			presenter = asyncio.create_task(_present(session, writer))
+			try:
+				await _read_input(session, reader)
+			finally:
+				await self.stop(session)
+				presenter.cancel()
+				writer.close()
+
+		return await asyncio.start_server(handle, host, port)
+
+
+async def _read_input(session:Chip8Session, reader:asyncio.StreamReader) -> None:
+	"""
+	Input task of a connection: apply the client's messages until it quits or disconnects.
+	"""
+	while True:
+		line = await reader.readline()
+		if not line:
+			return
+		parts = line.decode("ascii", errors="replace").split()
+		if not parts:
+			# Blank lines, e.g. a client's keep-alive
+			continue
+		command, *arguments = parts
+		if command == "quit":
+			return
+		if command == "keys" and len(arguments) == 1:
+			try:
+				session.set_keys(int(arguments[0], 16))
+			except ValueError:
+				pass
+
+async def _present(session:Chip8Session, writer:asyncio.StreamWriter) -> None:
+	"""
+	Presentation task of a connection: send the screen to the client whenever it changes.
+	"""
+	async for screen in session.frames():
+		writer.write(b"frame " + screen.hex().encode("ascii") + b"\n")
+		await writer.drain()
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Serve sessions of a Chip 8 ROM over a local line-based TCP protocol.")
+	parser.add_argument("rom", help="The *.ch8 file every session plays")
+	parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+	parser.add_argument("--port", type=int, default=8008, help="Port to listen on")
+	arguments = parser.parse_args()
+
+	async def main() -> None:
+		server = await Chip8Host().serve(Chip8Rom.open(arguments.rom), arguments.host, arguments.port)
+		async with server:
+			await server.serve_forever()
+
+	asyncio.run(main())
@@ -0,0 +1,319 @@
+import numpy
+from chip8_font import font, big_font, BIG_FONT_ADDRESS
+from chip8_rom import Chip8Rom, PROGRAM_START
+
+MEMORY_SIZE = 0x1000
+STACK_SIZE = 16
+SCREEN_WIDTH = 64
+SCREEN_HEIGHT = 32
+# Sprites are at most 15 rows tall (DXYN, N in the range (0x0,0xF))
+MAX_SPRITE_HEIGHT = 15
+
+class Chip8BatchMachine:
+	"""
+	Runs N Chip 8 machines in lockstep. The state of all the machines is stored as a struct of arrays (one row
+	per machine), and every step executes one instruction on each of them: the machines are grouped by opcode and
+	each group is executed with a handful of NumPy operations, instead of one Python call per machine.
+
+	The opcodes behave like the ones in Chip8ControlUnit. A machine that fetches an invalid opcode, or overflows
+	its stack, is halted instead of raising, so the rest of the batch keeps running.
+	"""
+	def __init__(self, count:int, seed:int|None=None) -> None:
+		"""
+		Parameters
+		----------
+		count : The number of machines.
+		seed : The seed for the random number generator used by CXNN, None to seed it from the OS.
+		"""
+		self.count = count
+		self.memory = numpy.zeros(shape=(count, MEMORY_SIZE), dtype=numpy.uint8)
+		self.registers = numpy.zeros(shape=(count, 16), dtype=numpy.uint8)
+		self.memory_register = numpy.zeros(shape=count, dtype=numpy.int64)
+		self.program_counter = numpy.full(shape=count, fill_value=PROGRAM_START, dtype=numpy.int64)
+		self.stack = numpy.zeros(shape=(count, STACK_SIZE), dtype=numpy.int64)
+		self.stack_pointer = numpy.zeros(shape=count, dtype=numpy.int64)
+		self.timer = numpy.zeros(shape=count, dtype=numpy.int64)
+		self.sound_timer = numpy.zeros(shape=count, dtype=numpy.int64)
+		self.screens = numpy.zeros(shape=(count, SCREEN_HEIGHT, SCREEN_WIDTH), dtype=bool)
+		self.keys = numpy.zeros(shape=(count, 16), dtype=bool)
+		# Register waiting for a key press (FX0A), -1 if the machine isn't waiting
+		self.waiting_register = numpy.full(shape=count, fill_value=-1, dtype=numpy.int64)
+		self.halted = numpy.zeros(shape=count, dtype=bool)
+		self.cycles = numpy.zeros(shape=count, dtype=numpy.int64)
+		self.random = numpy.random.default_rng(seed)
+
+		# Load the fonts into every machine's memory, at the same addresses as Chip8Machine
+		for key, value in font.items():
+			self.memory[:, key * 0x5:key * 0x5 + len(value)] = value
+		for key, value in big_font.items():
+			self.memory[:, BIG_FONT_ADDRESS + key * 0xA:BIG_FONT_ADDRESS + key * 0xA + len(value)] = value
+
+		self._sprite_rows = numpy.arange(MAX_SPRITE_HEIGHT)
+		self._sprite_columns = numpy.arange(8)
+		self._categories = [
+			self._category0, self._category1, self._category2, self._category3,
+			self._category4, self._category5, self._category6, self._category7,
+			self._category8, self._category9, self._categoryA, self._categoryB,
+			self._categoryC, self._categoryD, self._categoryE, self._categoryF
+		]
+
+	def load_rom(self, rom:Chip8Rom|bytes, machines=slice(None)) -> None:
+		"""
+		Copy a program into the memory of some of the machines, starting at address 0x200.
+
+		Parameters
+		----------
+		rom : A Chip8Rom or the bytes of the program.
+		machines : Index (int, slice, array of indices or boolean mask) of the machines to load, all of them by default.
+		"""
+		if not isinstance(rom, Chip8Rom):
+			rom = Chip8Rom(rom)
+		self.memory[machines, PROGRAM_START:PROGRAM_START + len(rom)] = numpy.frombuffer(rom.data, dtype=numpy.uint8)
+
+	def run(self, steps:int) -> None:
+		"""
+		Execute a number of steps, one instruction per running machine each.
+		"""
+		for i in range(steps):
+			self.step()
+
+	def step(self) -> None:
+		"""
+		Execute one instruction on every machine that isn't halted or waiting for a key.
+		"""
+		self._resolve_waiting()
+
+		running = numpy.flatnonzero(~self.halted & (self.waiting_register < 0))
+		if len(running) == 0:
+			return
+
+		program_counter = self.program_counter[running]
+		codes = (self.memory[running, program_counter & 0xFFF].astype(numpy.int64) << 8) | self.memory[running, (program_counter + 1) & 0xFFF]
+		# Every machine moves to the next instruction, jumps and skips overwrite it for their group
+		self.program_counter[running] = program_counter + 0x2
+		self.cycles[running] += 1
+
+		categories = codes >> 12
+		for category in numpy.unique(categories):
+			group = categories == category
+			self._categories[category](running[group], codes[group])
+
+	def tick_timers(self) -> None:
+		"""
+		Reduce both timers of every machine by 1, if they aren't already 0.
+		"""
+		self.timer -= self.timer > 0
+		self.sound_timer -= self.sound_timer > 0
+
+	def set_keys(self, keys:numpy.ndarray) -> None:
+		"""
+		Set the pressed keys of every machine.
+
+		Parameters
+		----------
+		keys : A boolean numpy.ndarray of dimensions (N,16), True for the keys that are pressed.
+		"""
+		self.keys[:] = keys
+
+	def _resolve_waiting(self) -> None:
+		"""
+		Store the lowest pressed key in the register of the machines waiting for input (FX0A) that have one.
+		"""
+		waiting = numpy.flatnonzero((self.waiting_register >= 0) & self.keys.any(axis=1))
+		if len(waiting) == 0:
+			return
+		self.registers[waiting, self.waiting_register[waiting]] = self.keys[waiting].argmax(axis=1)
+		self.waiting_register[waiting] = -1
+		self.program_counter[waiting] += 0x2
+
+
+	# Opcode groups. Each one receives the indices of its machines and their codes.
+	def _category0(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# 00E0, clear the screen
+		clear = machines[codes == 0x00E0]
+		self.screens[clear] = False
+
+		# 00EE, return from subroutine
+		selected = codes == 0x00EE
+		returning = machines[selected]
+		underflow = self.stack_pointer[returning] == 0
+		self._halt(returning[underflow])
+		returning = returning[~underflow]
+		self.stack_pointer[returning] -= 1
+		self.program_counter[returning] = self.stack[returning, self.stack_pointer[returning]] + 0x2
+
+		# Every other code in this category is invalid
+		self._halt(machines[(codes != 0x00E0) & ~selected])
+
+	def _category1(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# 1NNN, jump
+		self.program_counter[machines] = codes & 0xFFF
+
+	def _category2(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# 2NNN, call subroutine
+		overflow = self.stack_pointer[machines] >= STACK_SIZE
+		self._halt(machines[overflow])
+		machines = machines[~overflow]
+		codes = codes[~overflow]
+		self.stack[machines, self.stack_pointer[machines]] = (self.program_counter[machines] - 0x2) & 0xFFF
+		self.stack_pointer[machines] += 1
+		self.program_counter[machines] = codes & 0xFFF
+
+	def _category3(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# 3XNN, skip if Vx == NN
+		self._skip(machines, self.registers[machines, (codes >> 8) & 0xF] == (codes & 0xFF))
+
+	def _category4(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# 4XNN, skip if Vx != NN
+		self._skip(machines, self.registers[machines, (codes >> 8) & 0xF] != (codes & 0xFF))
+
+	def _category5(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# 5XY0, skip if Vx == Vy. The XO-CHIP 5XY2/5XY3 aren't supported, they halt like every other 5XYN.
+		valid = (codes & 0xF) == 0x0
+		self._halt(machines[~valid])
+		machines, codes = machines[valid], codes[valid]
+		self._skip(machines, self.registers[machines, (codes >> 8) & 0xF] == self.registers[machines, (codes >> 4) & 0xF])
+
+	def _category6(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# 6XNN, Vx = NN
+		self.registers[machines, (codes >> 8) & 0xF] = codes & 0xFF
+
+	def _category7(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# 7XNN, Vx += NN without carry
+		x = (codes >> 8) & 0xF
+		self.registers[machines, x] = (self.registers[machines, x] + (codes & 0xFF)) & 0xFF
+
+	def _category8(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		x = (codes >> 8) & 0xF
+		value1 = self.registers[machines, x].astype(numpy.int64)
+		value2 = self.registers[machines, (codes >> 4) & 0xF].astype(numpy.int64)
+		operation = codes & 0xF
+
+		result = numpy.select(
+			[operation == 0x0, operation == 0x1, operation == 0x2, operation == 0x3, operation == 0x4,
+			(operation == 0x5) | (operation == 0x7), operation == 0x6, operation == 0xE],
+			[value2, value1 | value2, value1 & value2, value1 ^ value2, value1 + value2,
+			value1 - value2, value1 >> 1, value1 << 1]
+		)
+		flag = numpy.select(
+			[operation == 0x4, (operation == 0x5) | (operation == 0x7), operation == 0x6, operation == 0xE],
+			[result > 0xFF, result >= 0, value1 & 0x1, (value1 & 0x80) >> 7]
+		)
+
+		valid = (operation <= 0x7) | (operation == 0xE)
+		self._halt(machines[~valid])
+		machines, x, result, flag, operation = machines[valid], x[valid], result[valid], flag[valid], operation[valid]
+
+		# The result is stored first, so the flag wins when X is F
+		self.registers[machines, x] = result & 0xFF
+		sets_flag = operation >= 0x4
+		self.registers[machines[sets_flag], 0xF] = flag[sets_flag]
+
+	def _category9(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# 9XY0, skip if Vx != Vy
+		self._skip(machines, self.registers[machines, (codes >> 8) & 0xF] != self.registers[machines, (codes >> 4) & 0xF])
+
+	def _categoryA(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# ANNN, I = NNN
+		self.memory_register[machines] = codes & 0xFFF
+
+	def _categoryB(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# BNNN, jump to V0 + NNN
+		self.program_counter[machines] = self.registers[machines, 0x0] + (codes & 0xFFF)
+
+	def _categoryC(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# CXNN, Vx = rand() & NN
+		self.registers[machines, (codes >> 8) & 0xF] = self.random.integers(0, 0x100, size=len(machines)) & codes & 0xFF
+
+	def _categoryD(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		# DXYN, draw a sprite N rows tall, wrapping around the edges of the screen
+		rows = self._sprite_rows
+		addresses = (self.memory_register[machines, None] + rows) & 0xFFF
+		sprites = self.memory[machines[:, None], addresses]
+		# Rows past the height of each sprite don't draw anything
+		sprites[rows >= (codes[:, None] & 0xF)] = 0
+		bits = numpy.unpackbits(sprites[:, :, None], axis=2).view(bool)
+
+		x = self.registers[machines, (codes >> 8) & 0xF].astype(numpy.int64)
+		y = self.registers[machines, (codes >> 4) & 0xF].astype(numpy.int64)
+		x_indices = (x[:, None] + self._sprite_columns) & (SCREEN_WIDTH - 1)
+		y_indices = (y[:, None] + rows) & (SCREEN_HEIGHT - 1)
+		region = (machines[:, None, None], y_indices[:, :, None], x_indices[:, None, :])
+
+		current = self.screens[region]
+		self.registers[machines, 0xF] = (current & bits).any(axis=(1, 2))
+		self.screens[region] = current ^ bits
+
+	def _categoryE(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		pressed = self.keys[machines, self.registers[machines, (codes >> 8) & 0xF] & 0xF]
+		operation = codes & 0xFF
+		# EX9E, skip if the key is pressed. EXA1, skip if it isn't.
+		self._skip(machines, ((operation == 0x9E) & pressed) | ((operation == 0xA1) & ~pressed))
+		self._halt(machines[(operation != 0x9E) & (operation != 0xA1)])
+
+	def _categoryF(self, machines:numpy.ndarray, codes:numpy.ndarray) -> None:
+		x = (codes >> 8) & 0xF
+		operation = codes & 0xFF
+		value = self.registers[machines, x].astype(numpy.int64)
+
+		# FX07, Vx = timer
+		selected = operation == 0x07
+		self.registers[machines[selected], x[selected]] = self.timer[machines[selected]]
+
+		# FX0A, wait for a key press. The program counter stays at this instruction until it's resolved.
+		selected = operation == 0x0A
+		self.waiting_register[machines[selected]] = x[selected]
+		self.program_counter[machines[selected]] -= 0x2
+
+		# FX15, timer = Vx. FX18, sound timer = Vx.
+		selected = operation == 0x15
+		self.timer[machines[selected]] = value[selected]
+		selected = operation == 0x18
+		self.sound_timer[machines[selected]] = value[selected]
+
+		# FX1E, I += Vx
+		selected = operation == 0x1E
+		self.memory_register[machines[selected]] = (self.memory_register[machines[selected]] + value[selected]) & 0xFFFF
+
+		# FX29, I = address of the font character Vx
+		selected = operation == 0x29
+		self.memory_register[machines[selected]] = value[selected] * 0x5
+
+		# FX33, binary-coded decimal of Vx at I, I+1, I+2
+		selected = operation == 0x33
+		bcd_machines = machines[selected]
+		address = self.memory_register[bcd_machines]
+		self.memory[bcd_machines, address & 0xFFF] = value[selected] // 100 % 10
+		self.memory[bcd_machines, (address + 1) & 0xFFF] = value[selected] // 10 % 10
+		self.memory[bcd_machines, (address + 2) & 0xFFF] = value[selected] % 10
+
+		# FX55 and FX65, store and load V0 to Vx (inclusive) at I. One register number at a time for all the machines.
+		store = operation == 0x55
+		load = operation == 0x65
+		for register_number in range(16):
+			selected = store & (x >= register_number)
+			if selected.any():
+				storing = machines[selected]
+				self.memory[storing, (self.memory_register[storing] + register_number) & 0xFFF] = self.registers[storing, register_number]
+			selected = load & (x >= register_number)
+			if selected.any():
+				loading = machines[selected]
+				self.registers[loading, register_number] = self.memory[loading, (self.memory_register[loading] + register_number) & 0xFFF]
+
+		valid = numpy.isin(operation, (0x07, 0x0A, 0x15, 0x18, 0x1E, 0x29, 0x33, 0x55, 0x65))
+		self._halt(machines[~valid])
+
+
+	# Helper methods
+	def _skip(self, machines:numpy.ndarray, condition:numpy.ndarray) -> None:
+		"""
+		Skip the next instruction of the machines that meet the condition.
+		"""
+		self.program_counter[machines[condition]] += 0x2
+
+	def _halt(self, machines:numpy.ndarray) -> None:
+		"""
+		Stop the given machines, leaving their program counter at the instruction that halted them.
+		"""
+		self.halted[machines] = True
+		self.program_counter[machines] -= 0x2
@@ -0,0 +1,151 @@
+from chip8_control_unit import Chip8ControlUnit
+from chip8_decoder import OPCODE_NAMES
+from chip8_rom import Chip8Rom
+from chip8_farm import find_roms
+import argparse
+import json
+import os
+import platform
+import time
+import numpy
+
+# Synthetic instruction mixes. Each one is an endless loop, so it can run for any number of cycles.
+SYNTHETIC_PROGRAMS = {
+	# V0=1, V1=2, then every 8XYN opcode and a 7XNN forever
+	"alu": bytes.fromhex("60 01 61 02 80 14 81 05 82 16 83 1E 84 03 85 11 86 22 87 37 88 40 70 03 12 04"),
+	# I=font, then 15 and 5 rows tall sprites at moving coordinates forever
+	"sprites": bytes.fromhex("A0 00 60 00 61 00 D0 15 70 05 71 03 F2 29 72 01 D0 1F 12 06"),
+	# I=0x300, then store and load all the registers and store a BCD forever
+	"memory": bytes.fromhex("A3 00 FF 55 FF 65 F3 33 12 02"),
+	# Call a subroutine that calls another one, forever
+	"calls": bytes.fromhex("22 06 12 00 00 E0 22 0C 00 EE 00 E0 70 01 00 EE")
+}
+
+# The default speed of main.py, used to measure the time of a frame
+INSTRUCTIONS_PER_FRAME = 500 // 60
+
+def _new_control_unit(rom:Chip8Rom) -> Chip8ControlUnit:
+	chip8vm = Chip8ControlUnit(seed=0)
+	chip8vm.load_rom(rom)
+	return chip8vm
+
+def measure_throughput(rom:Chip8Rom, cycles:int) -> float:
+	"""
+	Get the instructions per second of Chip8ControlUnit.run for a program.
+	"""
+	chip8vm = _new_control_unit(rom)
+	start = time.perf_counter()
+	chip8vm.run(cycles=cycles)
+	return cycles / (time.perf_counter() - start)
+
+def measure_block_throughput(rom:Chip8Rom, cycles:int) -> float:
+	"""
+	Get the instructions per second of Chip8ControlUnit.execute_block for a program.
+	"""
+	chip8vm = _new_control_unit(rom)
+	executed = 0
+	start = time.perf_counter()
+	while executed < cycles:
+		executed += chip8vm.execute_block()
+	return executed / (time.perf_counter() - start)
+
+def measure_opcodes(rom:Chip8Rom, cycles:int) -> dict:
+	"""
+	Time every instruction of a program on its own, grouped by opcode.
+
+	Returns
+	-------
+	A dictionary {opcode name: {"count": executions, "mean_ns": mean time of decode_and_execute in nanoseconds}}.
+	The cost of reading the clock is subtracted.
+	"""
+	clock = time.perf_counter_ns
+	overhead = min(-clock() + clock() for i in range(1000))
+
+	chip8vm = _new_control_unit(rom)
+	counts = {}
+	totals = {}
+	for i in range(cycles):
+		program_counter = chip8vm.program_counter
+		code = (chip8vm.machine.read_memory(program_counter) << 0x8) | chip8vm.machine.read_memory(program_counter + 1)
+		start = clock()
+		chip8vm.decode_and_execute(code)
+		elapsed = clock() - start - overhead
+
+		name = OPCODE_NAMES[code]
+		counts[name] = counts.get(name, 0) + 1
+		totals[name] = totals.get(name, 0) + elapsed
+	return {name: {"count": counts[name], "mean_ns": max(totals[name] / counts[name], 0.0)} for name in sorted(counts)}
+
+def measure_frames(rom:Chip8Rom, frames:int) -> dict:
+	"""
+	Time the work of a host frame (the instructions of a frame at the default speed, a timer tick and a presentation),
+	without any pacing.
+
+	Returns
+	-------
+	A dictionary with the mean and maximum frame time in milliseconds.
+	"""
+	chip8vm = _new_control_unit(rom)
+	frame_times = numpy.zeros(shape=frames)
+	for i in range(frames):
+		start = time.perf_counter()
+		chip8vm.run(cycles=INSTRUCTIONS_PER_FRAME)
+		chip8vm.tick_timers()
+		chip8vm.machine.update_screen()
+		frame_times[i] = time.perf_counter() - start
+	return {"mean_ms": float(frame_times.mean() * 1000), "max_ms": float(frame_times.max() * 1000)}
+
+def benchmark(name:str, rom:Chip8Rom, cycles:int) -> dict:
+	"""
+	Run every measurement on a program.
+
+	Returns
+	-------
+	A dictionary with the results, ready to be serialized as JSON.
+	"""
+	return {
+		"name": name,
+		"cycles": cycles,
+		"instructions_per_second": measure_throughput(rom, cycles),
+		"block_instructions_per_second": measure_block_throughput(rom, cycles),
+		"frame_time": measure_frames(rom, max(cycles // INSTRUCTIONS_PER_FRAME, 1)),
+		"opcodes": measure_opcodes(rom, cycles)
+	}
+
+def run_benchmarks(cycles:int, rom_paths:list=()) -> dict:
+	"""
+	Benchmark the synthetic instruction mixes and the given ROMs, headlessly.
+
+	Parameters
+	----------
+	cycles : The number of instructions executed by each measurement.
+	rom_paths : Paths to *.ch8 files, or directories containing them.
+
+	Returns
+	-------
+	A dictionary with the results, ready to be serialized as JSON.
+	"""
+	programs = [(name, Chip8Rom(data)) for name, data in SYNTHETIC_PROGRAMS.items()]
+	for path in rom_paths:
+		programs += [(os.path.basename(file_path), Chip8Rom.open(file_path)) for file_path in find_roms(path)]
+
+	return {
+		"python": platform.python_version(),
+		"numpy": numpy.__version__,
+		"benchmarks": [benchmark(name, rom, cycles) for name, rom in programs]
+	}
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Benchmark the Chip 8 interpreter and print the results as JSON.")
+	parser.add_argument("roms", nargs="*", help="*.ch8 files, or directories containing them, benchmarked after the synthetic mixes")
+	parser.add_argument("--cycles", type=int, default=200000, help="Instructions executed by each measurement")
+	parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of the standard output")
+	arguments = parser.parse_args()
+
+	report = json.dumps(run_benchmarks(arguments.cycles, arguments.roms), indent=2)
+	if arguments.output is None:
+		print(report)
+	else:
+		with open(arguments.output, "w") as file:
+			file.write(report)
@@ -1,25 +1,127 @@
 from chip8_machine import Chip8Machine
 from chip8_decoder import *
+from chip8_translator import Chip8Translator
+from chip8_rom import Chip8Rom, PROGRAM_START
+from chip8_font import BIG_FONT_ADDRESS
+from chip8_quirks import get_profile, get_handler_name
+from chip8_decode_cache import load_analysis
 import numpy
 import time
 
+# Dispatch tables already built, keyed by (control unit class, quirks profile)
+_dispatch_tables = {}
+
+# Value of Chip8ControlUnit.waiting_register while the CPU waits for the next frame (display_wait quirk)
+DISPLAY_WAIT = 0x10
+
+def build_dispatch_table(control_unit_class:type, profile:frozenset=frozenset()) -> list:
+	"""
+	Get a table with the function that executes each one of the 0x10000 possible codes. The table is only built
+	the first time it's requested for a given class and quirks profile, then it's shared by all their instances.
+
+	Parameters
+	----------
+	control_unit_class : Chip8ControlUnit or a subclass of it.
+	profile : The set of quirks, see chip8_quirks.get_profile. The opcodes they affect are executed by their variants.
+
+	Returns
+	-------
+	A list indexed by code, whose elements are unbound methods that take (control_unit, remainder).
+	"""
+	table = _dispatch_tables.get((control_unit_class, profile))
+	if table is None:
+		handlers = {name: getattr(control_unit_class, get_handler_name(name, profile)) for name in set(OPCODE_NAMES) if name is not None}
+		invalid = control_unit_class.opcode_invalid
+		table = [invalid if name is None else handlers[name] for name in OPCODE_NAMES]
+		_dispatch_tables[(control_unit_class, profile)] = table
+	return table
+
+
+# Stop conditions for Chip8ControlUnit.run
+def pc_reaches(address:int):
+	"""
+	Stop when the program counter reaches an address.
+	"""
+	return lambda control_unit: control_unit.program_counter == address
+
+def register_matches(register_number:int, predicate):
+	"""
+	Stop when the value of a register meets a condition.
+
+	Parameters
+	----------
+	register_number : int in the range (0x0,0xF)
+	predicate : A function that takes the value of the register and returns True to stop.
+	"""
+	return lambda control_unit: predicate(control_unit.machine.read_register(register_number))
+
+def display_idle(cycles:int):
+	"""
+	Stop when the screen hasn't changed for a number of consecutive instructions.
+	"""
+	# [screen changes seen last time, instructions since the last change]
+	state = [None, 0]
+	def condition(control_unit) -> bool:
+		changes = control_unit.machine.get_screen_changes()
+		if changes != state[0]:
+			state[0] = changes
+			state[1] = 0
+		else:
+			state[1] += 1
+		return state[1] >= cycles
+	return condition
+
 
 class Chip8ControlUnit():
-	def __init__(self) -> None:
-		self.machine = Chip8Machine()
+	def __init__(self, display=None, seed:int|None=None, input_provider=None, quirks:str|frozenset|None=None) -> None:
+		"""
+		Parameters
+		----------
+		display : A Chip8Display to present the screen in, or None to run headless.
+		seed : The seed for the random number generator used by CXNN, None to seed it from the OS.
+		input_provider : The source of the key states, sampled once per frame (see Chip8Keyboard), or None for a
+		keyboard whose keys are never pressed.
+		quirks : The platform to behave like, a profile name or a set of quirks (see chip8_quirks), None for the
+		emulator's original behavior.
+		"""
+		self.machine = Chip8Machine(display, input_provider)
 		self.program_counter = 0x200
+		# Every control unit has its own generator, so its random numbers can be reproduced and saved (see chip8_snapshot)
+		self.random = numpy.random.PCG64(seed)
+		# Register waiting for a key press (FX0A), DISPLAY_WAIT while waiting for the next frame, None if the CPU isn't waiting
+		self.waiting_register = None
+		self.quirks = get_profile(quirks)
+		self._dispatch_table = build_dispatch_table(type(self), self.quirks)
+		self._translator = Chip8Translator(self)
 		
-	def load_file(self, file_path:str):
+	def load_file(self, file_path:str, cache_dir:str|None=None):
 		"""
 		Load a Chip8 (*.ch8) file into the virtual machine's memory.
 
 		Parameters
 		----------
 		file_path : A string containing the path to the file
+		cache_dir : A directory of ROM analyses, see load_rom.
 		"""
-		with open(file_path, 'rb') as file:
-			file_contents = numpy.fromfile(file, dtype='B')
-		self.machine.write_memory(0x200, file_contents)
+		self.load_rom(Chip8Rom.open(file_path), cache_dir=cache_dir)
+
+	def load_rom(self, rom:Chip8Rom, analysis=None, cache_dir:str|None=None):
+		"""
+		Copy a program into the virtual machine's memory, starting at address 0x200.
+
+		Parameters
+		----------
+		rom : The Chip8Rom to load, it can be shared with other control units.
+		analysis : The static analysis of the program (see chip8_disassembler.analyze_rom), used to split it into
+		blocks. None to split it as it runs.
+		cache_dir : A directory where the program is analyzed a single time, by the first process that loads it (see
+		chip8_decode_cache). Used when no analysis is given, None to skip the cache.
+		"""
+		if analysis is None and cache_dir is not None:
+			analysis = load_analysis(rom, cache_dir)
+		self.machine.write_memory(PROGRAM_START, rom.data)
+		self._translator.clear()
+		self._translator.set_analysis(analysis)
 
 	def execute_instruction(self):
 		bytes = self.machine.read_memory_range(self.program_counter, self.program_counter + 2)
@@ -28,6 +130,120 @@ class Chip8ControlUnit():
 		code |= bytes[1]
 		self.decode_and_execute(code)
 
+	def run(self, cycles:int|None=None, until=None) -> int:
+		"""
+		Execute instructions in a tight loop, without any pacing (timers aren't ticked and the screen isn't presented),
+		until the cycle budget is spent, the stop condition is met or the CPU starts waiting for a key press (FX0A).
+		A waiting CPU doesn't execute anything.
+
+		Parameters
+		----------
+		cycles : The maximum number of instructions to execute, None for no limit.
+		until : A function that takes the control unit and returns True to stop, checked before every instruction.
+		See pc_reaches, register_matches and display_idle. None to only stop after the given cycles.
+
+		Returns
+		-------
+		The number of instructions executed.
+		"""
+		if cycles is None and until is None:
+			raise ValueError("run needs a number of cycles, a stop condition or both")
+
+		dispatch_table = self._dispatch_table
+		memory = self.machine.read_memory_range(0x0, 0x1000)
+		executed = 0
+		if until is None:
+			# Fast path, the same as execute_instruction with everything looked up once
+			while executed < cycles and self.waiting_register is None:
+				code = (memory[self.program_counter] << 0x8) | memory[self.program_counter + 1]
+				dispatch_table[code](self, code & 0xFFF)
+				self.program_counter += 0x2
+				executed += 1
+		else:
+			while (cycles is None or executed < cycles) and self.waiting_register is None and not until(self):
+				code = (memory[self.program_counter] << 0x8) | memory[self.program_counter + 1]
+				dispatch_table[code](self, code & 0xFFF)
+				self.program_counter += 0x2
+				executed += 1
+		return executed
+
+	def execute_block(self) -> int:
+		"""
+		Execute every instruction up to the end of the basic block that starts at the program counter. Blocks end with
+		a jump, call, return, skip or memory write, and are translated into Python functions the first time they run.
+		Code that writes memory directly through the machine must call invalidate_blocks afterwards.
+
+		Returns
+		-------
+		The number of instructions executed, 0 if the CPU is waiting for a key press.
+		"""
+		if self.waiting_register is not None:
+			return 0
+		return self._translator.execute()
+
+	def run_blocks(self, cycles:int) -> int:
+		"""
+		Execute a number of instructions through the translated blocks (see execute_block), stopping early if the CPU
+		starts waiting. The blocks that don't fit in the remaining budget are executed one instruction at a time, so
+		the result is exactly the same as run(cycles).
+
+		Returns
+		-------
+		The number of instructions executed.
+		"""
+		translator = self._translator
+		executed = 0
+		while executed < cycles and self.waiting_register is None:
+			executed += translator.execute(cycles - executed)
+		return executed
+
+	def invalidate_blocks(self, start:int, finish:int) -> None:
+		"""
+		Discard the translated blocks that contain an address in the given range. Start inclusive, finish non-inclusive.
+		The addresses wrap around the end of the memory.
+		"""
+		self._translator.invalidate(start, finish)
+
+	def sample_keys(self) -> int:
+		"""
+		Sample the keys from the input provider, see Chip8Keyboard.sample. Call it once per frame. If the CPU is waiting
+		for a key press (FX0A), the lowest key pressed since the previous sample ends the wait. A CPU waiting for the
+		next frame (display_wait quirk) continues.
+
+		Returns
+		-------
+		A 16 bit mask, bit n is set if the key 0xn is pressed.
+		"""
+		keys = self.machine.sample_keys()
+		if self.waiting_register == DISPLAY_WAIT:
+			self.waiting_register = None
+			self.program_counter += 0x2
+		elif self.waiting_register is not None:
+			pressed = self.machine.get_pressed_keys()
+			if pressed != 0:
+				self.press_key((pressed & -pressed).bit_length() - 1)
+		return keys
+
+	def press_key(self, key:int) -> bool:
+		"""
+		Deliver a key press to a CPU waiting for one (FX0A): the key is stored in the waiting register and the
+		execution continues after the FX0A.
+
+		Parameters
+		----------
+		key : int in the range (0x0,0xF)
+
+		Returns
+		-------
+		True if the CPU was waiting, False otherwise.
+		"""
+		if self.waiting_register is None or self.waiting_register == DISPLAY_WAIT:
+			return False
+		self.machine.write_register(self.waiting_register, key)
+		self.waiting_register = None
+		self.program_counter += 0x2
+		return True
+
 	def tick_timers(self):
 		if self.machine.get_remaining_time() > 0:
 			self.machine.timer_tick()
@@ -43,30 +259,18 @@ class Chip8ControlUnit():
 		----------
 		code : The 2 byte integer (0x0,0xFFFF) for the opcode to be executed.
 		"""
-		# Get the broad category of the code, which corresponds to the most significant four bits.
-		opcode_category = (code & 0xF000) >> 12
-
-		# The remainder will be used to get the specific opcode and send arguments if required
-		remainder = code & 0xFFF
-		
-		# Get the complete set of opcodoes corresponding to the opcode_category
-		category = DECODER[opcode_category]
-		# Get the mask corresponding to this opcode_category, to identify the specific opcode
-		category_mask = category.get("mask")
-		if category_mask is None:
-			# If there's no mask for this category, then there's only a single opcode
-			opcode = category["opcodes"][0x0]
-		else:
-			# Otherwise, find the specific opcode by using the category's mask
-			opcode = category["opcodes"][remainder & category_mask]
-		
-		# Finally, call the specific opcode and send its arguments
-		self.__getattribute__(opcode)(remainder)
-
+		# The handler for every code is decoded in advance, the remainder (12 least significant bits) holds its arguments
+		self._dispatch_table[code](self, code & 0xFFF)
 		self.program_counter += 0x2
 	
 
 	# Opcodes
+	def opcode_invalid(self, remainder:int):
+		"""
+		Placeholder for the codes that don't correspond to any Chip 8 opcode.
+		"""
+		raise KeyError(f"Invalid opcode, remainder {remainder:#05x}")
+
 	def opcode00E0(self, remainder:int):
 		"""
 		Clear the screen.
@@ -78,6 +282,50 @@ class Chip8ControlUnit():
 		Return from subroutine
 		"""
 		self.program_counter = self.machine.pop_stack()
+
+	def opcode00CN(self, remainder:int):
+		"""
+		Scroll the screen down N rows (SUPER-CHIP).
+		"""
+		self.machine.scroll_screen(down=remainder & 0xF)
+
+	def opcode00DN(self, remainder:int):
+		"""
+		Scroll the screen up N rows (XO-CHIP).
+		"""
+		self.machine.scroll_screen(down=-(remainder & 0xF))
+
+	def opcode00FB(self, remainder:int):
+		"""
+		Scroll the screen right 4 pixels (SUPER-CHIP).
+		"""
+		self.machine.scroll_screen(right=4)
+
+	def opcode00FC(self, remainder:int):
+		"""
+		Scroll the screen left 4 pixels (SUPER-CHIP).
+		"""
+		self.machine.scroll_screen(right=-4)
+
+	def opcode00FD(self, remainder:int):
+		"""
+		Exit the interpreter (SUPER-CHIP). The CPU stays on this instruction, so the program stops while the timers and
+		the screen keep going.
+		"""
+		# 0x2 is subtracted because decode_and_execute increments the program counter by 0x2
+		self.program_counter -= 0x2
+
+	def opcode00FE(self, remainder:int):
+		"""
+		Switch to the low resolution (64x32) screen, clearing it (SUPER-CHIP).
+		"""
+		self.machine.set_high_resolution(False)
+
+	def opcode00FF(self, remainder:int):
+		"""
+		Switch to the high resolution (128x64) screen, clearing it (SUPER-CHIP).
+		"""
+		self.machine.set_high_resolution(True)
 	
 	def opcode1(self, remainder:int):
 		"""
@@ -123,6 +371,26 @@ class Chip8ControlUnit():
 		if value1 == value2:
 			self.program_counter += 0x2
 
+	def opcode5_2(self, remainder:int):
+		"""
+		Store the values of registers Vx to Vy (inclusive, in reverse order if x > y) in memory, starting at address I.
+		I isn't modified (XO-CHIP).
+		"""
+		starting_address = self.machine.read_memory_register()
+		registers = self.register_range(remainder)
+		self.machine.write_memory(starting_address, bytes(self.machine.read_register(register) for register in registers))
+		self.invalidate_blocks(starting_address, starting_address + len(registers))
+
+	def opcode5_3(self, remainder:int):
+		"""
+		Fill registers Vx to Vy (inclusive, in reverse order if x > y) from memory, starting at address I. I isn't
+		modified (XO-CHIP).
+		"""
+		registers = self.register_range(remainder)
+		values = self.machine.read_memory_block(self.machine.read_memory_register(), len(registers))
+		for register, value in zip(registers, values):
+			self.machine.write_register(register, value)
+
 	def opcode6(self, remainder:int):
 		"""
 		Set register Vx = NN, NN is a 1 byte constant (0x0,0xFF)
@@ -163,6 +431,27 @@ class Chip8ControlUnit():
 		value1, value2 = self.read_two_registers(remainder)
 		self.machine.write_register((remainder & 0xF00) >> 8, value1 ^ value2)
 
+	def opcode8_1_vf_reset(self, remainder:int):
+		"""
+		Set register Vx |= Vy (bitwise or), then Vf = 0 (logic_vf_reset quirk)
+		"""
+		self.opcode8_1(remainder)
+		self.set_registerF(0x0)
+
+	def opcode8_2_vf_reset(self, remainder:int):
+		"""
+		Set register Vx &= Vy (bitwise and), then Vf = 0 (logic_vf_reset quirk)
+		"""
+		self.opcode8_2(remainder)
+		self.set_registerF(0x0)
+
+	def opcode8_3_vf_reset(self, remainder:int):
+		"""
+		Set register Vx ^= Vy (bitwise xor), then Vf = 0 (logic_vf_reset quirk)
+		"""
+		self.opcode8_3(remainder)
+		self.set_registerF(0x0)
+
 	def opcode8_4(self, remainder:int):
 		"""
 		Set register Vx += Vy. Sets a carry flag in register Vf.
@@ -194,6 +483,14 @@ class Chip8ControlUnit():
 		value = self.read_one_register(remainder)
 		self.set_registerF(value & 0x1)
 		self.machine.write_register((remainder & 0xF00) >> 8, value >> 0x1)
+
+	def opcode8_6_vy(self, remainder:int):
+		"""
+		Store the least significant bit of Vy in Vf and set Vx = Vy >> 1 (shift_vy quirk)
+		"""
+		value = self.machine.read_register((remainder & 0xF0) >> 0x4)
+		self.set_registerF(value & 0x1)
+		self.machine.write_register((remainder & 0xF00) >> 8, value >> 0x1)
 	
 	def opcode8_7(self, remainder:int):
 		"""
@@ -215,6 +512,14 @@ class Chip8ControlUnit():
 		self.set_registerF((value & 0x80) >> 0x7)
 		self.machine.write_register((remainder & 0xF00) >> 8, value << 0x1)
 
+	def opcode8_E_vy(self, remainder:int):
+		"""
+		Store the most significant bit of Vy in Vf, then set Vx = Vy << 1 (shift_vy quirk)
+		"""
+		value = self.machine.read_register((remainder & 0xF0) >> 0x4)
+		self.set_registerF((value & 0x80) >> 0x7)
+		self.machine.write_register((remainder & 0xF00) >> 8, value << 0x1)
+
 	def opcode9(self, remainder:int):
 		"""
 		Skip the next instruction if Vx != Vy
@@ -235,46 +540,72 @@ class Chip8ControlUnit():
 		"""
 		# 0x2 is subtracted because decode_and_execute increments the program counter by 0x2
 		self.program_counter = self.machine.read_register(0x0) + remainder - 0x2
+
+	def opcodeB_vx(self, remainder:int):
+		"""
+		Jump to address Vx + XNN (jump_vx quirk)
+		"""
+		# 0x2 is subtracted because decode_and_execute increments the program counter by 0x2
+		self.program_counter = self.read_one_register(remainder) + remainder - 0x2
 	
 	def opcodeC(self, remainder:int):
 		"""
 		Set register Vx = rand() & NN, NN is a constant in the range (0x0,0xFF)
 		"""
-		random_number = numpy.random.randint(0, 0x100)
+		random_number = self.random.random_raw() & 0xFF
 		self.machine.write_register((remainder & 0xF00) >> 8, (random_number) & (remainder & 0xFF))
 
 	def opcodeD(self, remainder:int):
 		"""
-		Draw sprite according to the rules described in the screen module.
+		Draw sprite according to the rules described in the screen module. The screen is only marked as dirty,
+		it's presented by whoever drives the frames (see Chip8Machine.update_screen). A height of 0 draws a 16x16
+		sprite (SUPER-CHIP). Every selected plane takes its own sprite, stored one after the other (XO-CHIP).
 		"""
-		start_address = self.machine.read_memory_register()
-		sprite_height = remainder & 0xF
-		sprite = self.machine.read_memory_range(start_address, start_address + sprite_height)
-		x, y = self.read_two_registers(remainder)
-		pixels_flipped = self.machine.draw_sprite(sprite, x, y)
-		if pixels_flipped:
-			self.set_registerF(0x1)
-		else:
-			self.set_registerF(0x0)
-		
-		self.machine.update_screen()
+		self.draw(remainder, clip=False)
+
+	def opcodeD_clip(self, remainder:int):
+		"""
+		Draw sprite, clipping it at the edges of the screen (clip_sprites quirk).
+		"""
+		self.draw(remainder, clip=True)
+
+	def opcodeD_display_wait(self, remainder:int):
+		"""
+		Draw sprite, then wait for the next frame (display_wait quirk). The CPU stays on this instruction until
+		sample_keys starts the next frame.
+		"""
+		self.draw(remainder, clip=False)
+		self.wait_for_frame()
+
+	def opcodeD_clip_display_wait(self, remainder:int):
+		"""
+		Draw sprite clipping it at the edges of the screen, then wait for the next frame (clip_sprites and display_wait
+		quirks).
+		"""
+		self.draw(remainder, clip=True)
+		self.wait_for_frame()
 
 	def opcodeE_9E(self, remainder:int):
 		"""
 		Skip the next instruction if the given key is pressed.
 		"""
-		key = self.read_one_register(remainder)
-		if self.machine.is_key_pressed(key):
+		# The keys are sampled once per frame into a 16 bit mask
+		if (self.machine.get_keys() >> self.read_one_register(remainder)) & 0x1:
 			self.program_counter += 0x2
 	
 	def opcodeE_A1(self, remainder:int):
 		"""
 		Skip the next instruction if the given key is not pressed
 		"""
-		key = self.read_one_register(remainder)
-		if not self.machine.is_key_pressed(key):
+		if not (self.machine.get_keys() >> self.read_one_register(remainder)) & 0x1:
 			self.program_counter += 0x2
 
+	def opcodeF_01(self, remainder:int):
+		"""
+		Select the screen planes affected by the drawing opcodes, given by the mask X (XO-CHIP).
+		"""
+		self.machine.select_planes((remainder & 0xF00) >> 8)
+
 	def opcodeF_07(self, remainder:int):
 		"""
 		Set register Vx to the value of the timer
@@ -283,9 +614,12 @@ class Chip8ControlUnit():
 
 	def opcodeF_0A(self, remainder:int):
 		"""
-		Wait for an input and store it in Vx, halt all operations meanwhile.
+		Wait for a key press and store the key in Vx. The CPU stays on this instruction and stops executing until the
+		press is delivered by sample_keys or press_key, while the timers and the screen keep going.
 		"""
-		self.machine.write_register((0xF00) >> 8, self.machine.wait_for_input())
+		self.waiting_register = (remainder & 0xF00) >> 8
+		# Stay on this instruction, 0x2 is subtracted because decode_and_execute increments the program counter by 0x2
+		self.program_counter -= 0x2
 	
 	def opcodeF_15(self, remainder:int):
 		"""
@@ -313,6 +647,14 @@ class Chip8ControlUnit():
 		# Multiply the value by 0x5 because each member of the font occupies 5 spots in memory.
 		self.machine.write_memory_register(value * 0x5)
 
+	def opcodeF_30(self, remainder:int):
+		"""
+		Set register I to the location of the big (8x10) char whose value is stored in Vx (SUPER-CHIP).
+		"""
+		value = self.read_one_register(remainder)
+		# Each member of the big font occupies 10 spots in memory.
+		self.machine.write_memory_register(BIG_FONT_ADDRESS + (value & 0xF) * 0xA)
+
 	def opcodeF_33(self, remainder:int):
 		"""
 		Store the binary-coded representation of the value stored in Vx, in register I
@@ -320,9 +662,8 @@ class Chip8ControlUnit():
 		starting_address = self.machine.read_memory_register()
 		value = self.read_one_register(remainder)
 		
-		self.machine.write_memory(starting_address, value // 100 % 10)
-		self.machine.write_memory(starting_address + 1, value // 10 % 10)
-		self.machine.write_memory(starting_address + 2, value % 10)
+		self.machine.write_memory(starting_address, bytes((value // 100 % 10, value // 10 % 10, value % 10)))
+		self.invalidate_blocks(starting_address, starting_address + 3)
 
 	
 	def opcodeF_55(self, remainder:int):
@@ -331,8 +672,22 @@ class Chip8ControlUnit():
 		"""
 		starting_address = self.machine.read_memory_register()
 		number_of_registers = (remainder & 0xF00) >> 0x8
-		for i in range(number_of_registers + 1):
-			self.machine.write_memory(starting_address + i, self.machine.read_register(i))
+		self.machine.write_memory(starting_address, self.machine.read_registers(number_of_registers + 1))
+		self.invalidate_blocks(starting_address, starting_address + number_of_registers + 1)
+
+	def opcodeF_55_increment(self, remainder:int):
+		"""
+		Store V0 to Vx (inclusive) in memory starting at address I, then I += X + 1 (load_store_increment quirk).
+		"""
+		self.opcodeF_55(remainder)
+		self.machine.write_memory_register(self.machine.read_memory_register() + ((remainder & 0xF00) >> 0x8) + 1)
+
+	def opcodeF_55_increment_x(self, remainder:int):
+		"""
+		Store V0 to Vx (inclusive) in memory starting at address I, then I += X (load_store_increment_x quirk).
+		"""
+		self.opcodeF_55(remainder)
+		self.machine.write_memory_register(self.machine.read_memory_register() + ((remainder & 0xF00) >> 0x8))
 		
 	def opcodeF_65(self, remainder:int):
 		"""
@@ -340,11 +695,69 @@ class Chip8ControlUnit():
 		"""
 		starting_address = self.machine.read_memory_register()
 		number_of_registers = (remainder & 0xF00) >> 0x8
-		for i in range(number_of_registers + 1):
-			self.machine.write_register(i, self.machine.read_memory(starting_address + i))
+		self.machine.write_registers(self.machine.read_memory_block(starting_address, number_of_registers + 1))
+
+	def opcodeF_65_increment(self, remainder:int):
+		"""
+		Fill V0 to Vx (inclusive) from memory starting at address I, then I += X + 1 (load_store_increment quirk).
+		"""
+		self.opcodeF_65(remainder)
+		self.machine.write_memory_register(self.machine.read_memory_register() + ((remainder & 0xF00) >> 0x8) + 1)
+
+	def opcodeF_65_increment_x(self, remainder:int):
+		"""
+		Fill V0 to Vx (inclusive) from memory starting at address I, then I += X (load_store_increment_x quirk).
+		"""
+		self.opcodeF_65(remainder)
+		self.machine.write_memory_register(self.machine.read_memory_register() + ((remainder & 0xF00) >> 0x8))
+
+	def opcodeF_75(self, remainder:int):
+		"""
+		Store the values stored in registers V0 to Vx (inclusive) in the persistent flags (SUPER-CHIP).
+		"""
+		self.machine.write_flags(self.machine.read_registers(((remainder & 0xF00) >> 0x8) + 1))
+
+	def opcodeF_85(self, remainder:int):
+		"""
+		Fill registers V0 to Vx (inclusive) from the persistent flags (SUPER-CHIP).
+		"""
+		self.machine.write_registers(self.machine.read_flags(((remainder & 0xF00) >> 0x8) + 1))
 
 
 	# Helper methods
+	def draw(self, remainder:int, clip:bool) -> None:
+		"""
+		This method is designed to work alongside the DXYN opcodes. Draws the sprite at I and sets Vf if any pixel was
+		turned off.
+
+		Parameters
+		----------
+		remainder : The 12 least significant bits of the opcode (opcode & 0x0FFF).
+		clip : Clip the sprite at the edges of the screen instead of wrapping it around.
+		"""
+		start_address = self.machine.read_memory_register()
+		sprite_height = remainder & 0xF
+		sprite_width = 8
+		if sprite_height == 0:
+			sprite_height = 16
+			sprite_width = 16
+		sprite_size = sprite_height * (sprite_width // 8) * self.machine.get_selected_plane_count()
+		sprite = self.machine.read_memory_block(start_address, sprite_size)
+		x, y = self.read_two_registers(remainder)
+		pixels_flipped = self.machine.draw_sprite(sprite, x, y, sprite_width, clip)
+		if pixels_flipped:
+			self.set_registerF(0x1)
+		else:
+			self.set_registerF(0x0)
+
+	def wait_for_frame(self) -> None:
+		"""
+		Stop executing until the next frame starts, see sample_keys. The CPU stays on the current instruction.
+		"""
+		self.waiting_register = DISPLAY_WAIT
+		# 0x2 is subtracted because decode_and_execute increments the program counter by 0x2
+		self.program_counter -= 0x2
+
 	def read_one_register(self, remainder:int) -> int:
 		"""
 		This method is designed to work alongside Chip 8 opcodes. Reads the value of a single register.
@@ -366,6 +779,19 @@ class Chip8ControlUnit():
 		"""
 		return self.machine.read_register((remainder & 0xF00) >> 8), self.machine.read_register((remainder & 0xF0) >> 0x4)
 
+	def register_range(self, remainder:int) -> range:
+		"""
+		This method is designed to work alongside Chip 8 opcodes. Get the register numbers from x to y (inclusive),
+		counting down if x > y.
+
+		Parameters
+		----------
+		remainder : The 12 least significant bits of the opcode (opcode & 0x0FFF).
+		"""
+		x = (remainder & 0xF00) >> 8
+		y = (remainder & 0xF0) >> 0x4
+		return range(x, y + 1) if x <= y else range(x, y - 1, -1)
+
 	def set_registerF(self, value:int):
 		"""
 		This methos is a shortcut for self.machine.write_register(15, value), because registerF is used as a helper for some
@@ -0,0 +1,124 @@
+from chip8_decoder import OPCODE_NAMES
+from chip8_disassembler import analyze_rom
+from chip8_rom import Chip8Rom
+import hashlib
+import mmap
+import os
+import struct
+import numpy
+
+CACHE_MAGIC = b"C8DC"
+CACHE_VERSION = 2
+CACHE_EXTENSION = ".c8d"
+
+# Identifies the decoder tables the analysis was made with, files written with other tables are analyzed again
+_DECODER_DIGEST = hashlib.sha256("\n".join(name or "" for name in OPCODE_NAMES).encode("ascii")).digest()[:16]
+
+# magic, version, SHA-256 of the ROM, decoder digest, number of leaders, hazards, subroutines, references and
+# unknown writes
+_HEADER = struct.Struct("<4sB32s16sHHHHH")
+# File layout: header | leaders | hazards | subroutines | references | unknown writes
+# The address lists are 2 bytes per address, sorted.
+_ADDRESS_LISTS = ("leaders", "hazards", "subroutines", "references", "unknown_writes")
+
+
+class Chip8CachedAnalysis:
+	"""
+	The parts of a ROM's static analysis (see chip8_disassembler.Chip8Analysis) the emulator uses: the block starts
+	and the self-modifying code hazards given to the translator (see Chip8Translator.set_analysis), plus the
+	subroutines, I references and unknown writes. Decoding itself is a table lookup (see chip8_decoder.OPCODE_NAMES),
+	so the analysis is the only work worth keeping between processes.
+	"""
+	def __init__(self, rom_hash:bytes, leaders, hazards, subroutines, references, unknown_writes) -> None:
+		"""
+		Parameters
+		----------
+		rom_hash : The SHA-256 digest of the ROM.
+		leaders, hazards, subroutines, references, unknown_writes : Addresses, see Chip8Analysis.
+		"""
+		self.rom_hash = rom_hash
+		self.leaders = frozenset(int(address) for address in leaders)
+		self.hazards = frozenset(int(address) for address in hazards)
+		self.subroutines = frozenset(int(address) for address in subroutines)
+		self.references = frozenset(int(address) for address in references)
+		self.unknown_writes = frozenset(int(address) for address in unknown_writes)
+
+	@classmethod
+	def analyze(cls, rom:Chip8Rom) -> "Chip8CachedAnalysis":
+		"""
+		Analyze a ROM, see chip8_disassembler.analyze_rom.
+		"""
+		analysis = analyze_rom(rom)
+		return cls(analysis.rom_hash, analysis.leaders, analysis.hazards, analysis.subroutines, analysis.references, analysis.unknown_writes)
+
+	def to_bytes(self) -> bytes:
+		"""
+		Get the cache file's content, see from_buffer.
+		"""
+		address_lists = [numpy.array(sorted(getattr(self, name)), dtype="<u2") for name in _ADDRESS_LISTS]
+		return b"".join((
+			_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, self.rom_hash, _DECODER_DIGEST, *(len(addresses) for addresses in address_lists)),
+			*(addresses.tobytes() for addresses in address_lists)
+		))
+
+	@classmethod
+	def from_buffer(cls, buffer) -> "Chip8CachedAnalysis":
+		"""
+		Read an analysis written by to_bytes.
+
+		Raises
+		------
+		ValueError if the buffer isn't a cache file of this version and decoder.
+		"""
+		magic, version, rom_hash, decoder_digest, *counts = _HEADER.unpack_from(buffer)
+		if magic != CACHE_MAGIC:
+			raise ValueError("The buffer isn't a cached Chip 8 analysis")
+		if version != CACHE_VERSION or decoder_digest != _DECODER_DIGEST:
+			raise ValueError("The analysis was written by another version of the decoder")
+		expected_size = _HEADER.size + 2 * sum(counts)
+		if len(buffer) != expected_size:
+			raise ValueError(f"The cached analysis is {len(buffer)} bytes long, expected {expected_size} bytes")
+
+		offset = _HEADER.size
+		address_lists = []
+		for count in counts:
+			address_lists.append(numpy.frombuffer(buffer, dtype="<u2", count=count, offset=offset))
+			offset += 2 * count
+		return cls(rom_hash, *address_lists)
+
+
+def get_cache_path(cache_dir:str, rom:Chip8Rom) -> str:
+	"""
+	Get the path of a ROM's cache file, named after the SHA-256 of its image.
+	"""
+	return os.path.join(cache_dir, hashlib.sha256(rom.data).hexdigest() + CACHE_EXTENSION)
+
+def load_analysis(rom:Chip8Rom, cache_dir:str) -> Chip8CachedAnalysis:
+	"""
+	Get the analysis of a ROM from the cache directory, memory mapping its file. ROMs without a valid file are
+	analyzed and their file is written, so the next process that loads them skips the analysis.
+
+	Parameters
+	----------
+	rom : The Chip8Rom to analyze.
+	cache_dir : The directory of the cache files, created if it doesn't exist. Any number of processes can share it.
+	"""
+	path = get_cache_path(cache_dir, rom)
+	try:
+		with open(path, "rb") as file:
+			with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+				analysis = Chip8CachedAnalysis.from_buffer(buffer)
+		if analysis.rom_hash == hashlib.sha256(rom.data).digest():
+			return analysis
+	except (OSError, ValueError, struct.error):
+		# Missing, empty, truncated or stale files are written again
+		pass
+
+	analysis = Chip8CachedAnalysis.analyze(rom)
+	os.makedirs(cache_dir, exist_ok=True)
+	# Written under a temporary name and renamed, so other processes never map a partial file
+	temporary_path = f"{path}.{os.getpid()}.tmp"
+	with open(temporary_path, "wb") as file:
+		file.write(analysis.to_bytes())
+	os.replace(temporary_path, path)
+	return analysis
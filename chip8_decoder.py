@@ -2,7 +2,15 @@ CATEGORY0 = {
 	"mask":0xFFF,
 	"opcodes":{
 		0x0E0:"opcode00E0",
-		0x0EE:"opcode00EE"
+		0x0EE:"opcode00EE",
+		# SUPER-CHIP
+		**{0x0C0 | n:"opcode00CN" for n in range(0x1, 0x10)},
+		**{0x0D0 | n:"opcode00DN" for n in range(0x1, 0x10)},
+		0x0FB:"opcode00FB",
+		0x0FC:"opcode00FC",
+		0x0FD:"opcode00FD",
+		0x0FE:"opcode00FE",
+		0x0FF:"opcode00FF"
 	}
 }
 
@@ -31,8 +39,12 @@ CATEGORY4 = {
 }
 
 CATEGORY5 = {
+	"mask":0xF,
 	"opcodes":{
-		0x0:"opcode5"
+		0x0:"opcode5",
+		# XO-CHIP
+		0x2:"opcode5_2",
+		0x3:"opcode5_3"
 	}
 }
 
@@ -104,15 +116,19 @@ CATEGORYE = {
 CATEGORYF = {
 	"mask":0xFF,
 	"opcodes":{
+		0x01:"opcodeF_01",
 		0x07:"opcodeF_07",
 		0x0A:"opcodeF_0A",
 		0x15:"opcodeF_15",
 		0x18:"opcodeF_18",
 		0x1E:"opcodeF_1E",
 		0x29:"opcodeF_29",
+		0x30:"opcodeF_30",
 		0x33:"opcodeF_33",
 		0x55:"opcodeF_55",
-		0x65:"opcodeF_65"
+		0x65:"opcodeF_65",
+		0x75:"opcodeF_75",
+		0x85:"opcodeF_85"
 	}
 }
 
@@ -134,4 +150,29 @@ DECODER = {
 	0XD:CATEGORYD,
 	0XE:CATEGORYE,
 	0XF:CATEGORYF
-}
\ No newline at end of file
+}
+
+def decode_opcode_name(code:int) -> str|None:
+	"""
+	Get the name of the control unit method that executes a given opcode.
+
+	Parameters
+	----------
+	code : The 2 byte integer (0x0,0xFFFF) for the opcode.
+
+	Returns
+	-------
+	The name of the method, or None if the code doesn't correspond to any Chip 8, SUPER-CHIP or XO-CHIP opcode.
+	"""
+	# Get the complete set of opcodes corresponding to the most significant four bits
+	category = DECODER[(code & 0xF000) >> 12]
+	# Get the mask corresponding to this category, to identify the specific opcode
+	category_mask = category.get("mask")
+	if category_mask is None:
+		# If there's no mask for this category, then there's only a single opcode
+		return category["opcodes"][0x0]
+	return category["opcodes"].get(code & 0xFFF & category_mask)
+
+
+# The method name for each one of the 0x10000 possible codes, decoded a single time when the module is imported
+OPCODE_NAMES = [decode_opcode_name(code) for code in range(0x10000)]
@@ -0,0 +1,335 @@
+from chip8_decoder import OPCODE_NAMES
+from chip8_translator import BLOCK_TERMINATORS
+from chip8_rom import Chip8Rom, PROGRAM_START
+import argparse
+import hashlib
+
+# Assembly of every opcode, formatted with the fields of the code: x, y, n, nn and nnn
+MNEMONICS = {
+	"opcode00E0":"CLS",
+	"opcode00EE":"RET",
+	"opcode00CN":"SCD {n}",
+	"opcode00DN":"SCU {n}",
+	"opcode00FB":"SCR",
+	"opcode00FC":"SCL",
+	"opcode00FD":"EXIT",
+	"opcode00FE":"LOW",
+	"opcode00FF":"HIGH",
+	"opcode1":"JP {nnn:#05x}",
+	"opcode2":"CALL {nnn:#05x}",
+	"opcode3":"SE V{x:X}, {nn:#04x}",
+	"opcode4":"SNE V{x:X}, {nn:#04x}",
+	"opcode5":"SE V{x:X}, V{y:X}",
+	"opcode5_2":"SAVE V{x:X}-V{y:X}",
+	"opcode5_3":"LOAD V{x:X}-V{y:X}",
+	"opcode6":"LD V{x:X}, {nn:#04x}",
+	"opcode7":"ADD V{x:X}, {nn:#04x}",
+	"opcode8_0":"LD V{x:X}, V{y:X}",
+	"opcode8_1":"OR V{x:X}, V{y:X}",
+	"opcode8_2":"AND V{x:X}, V{y:X}",
+	"opcode8_3":"XOR V{x:X}, V{y:X}",
+	"opcode8_4":"ADD V{x:X}, V{y:X}",
+	"opcode8_5":"SUB V{x:X}, V{y:X}",
+	"opcode8_6":"SHR V{x:X}, V{y:X}",
+	"opcode8_7":"SUBN V{x:X}, V{y:X}",
+	"opcode8_E":"SHL V{x:X}, V{y:X}",
+	"opcode9":"SNE V{x:X}, V{y:X}",
+	"opcodeA":"LD I, {nnn:#05x}",
+	"opcodeB":"JP V0, {nnn:#05x}",
+	"opcodeC":"RND V{x:X}, {nn:#04x}",
+	"opcodeD":"DRW V{x:X}, V{y:X}, {n}",
+	"opcodeE_9E":"SKP V{x:X}",
+	"opcodeE_A1":"SKNP V{x:X}",
+	"opcodeF_01":"PLANE {x}",
+	"opcodeF_07":"LD V{x:X}, DT",
+	"opcodeF_0A":"LD V{x:X}, K",
+	"opcodeF_15":"LD DT, V{x:X}",
+	"opcodeF_18":"LD ST, V{x:X}",
+	"opcodeF_1E":"ADD I, V{x:X}",
+	"opcodeF_29":"LD F, V{x:X}",
+	"opcodeF_30":"LD HF, V{x:X}",
+	"opcodeF_33":"LD B, V{x:X}",
+	"opcodeF_55":"LD [I], V{x:X}",
+	"opcodeF_65":"LD V{x:X}, [I]",
+	"opcodeF_75":"LD R, V{x:X}",
+	"opcodeF_85":"LD V{x:X}, R"
+}
+
+# How every opcode continues the execution, besides the instructions in BLOCK_TERMINATORS all of them fall through
+JUMPS = {"opcode1"}
+CALLS = {"opcode2"}
+SKIPS = {"opcode3", "opcode4", "opcode5", "opcode9", "opcodeE_9E", "opcodeE_A1"}
+# The next instruction can't be known statically
+INDIRECT_JUMPS = {"opcodeB"}
+# No next instruction: the return address comes from the stack, or the program stops
+ENDS = {"opcode00EE", "opcode00FD"}
+# Opcodes that write memory at I, with the number of bytes written as a function of the remainder
+STORES = {
+	"opcodeF_33":lambda remainder: 3,
+	"opcodeF_55":lambda remainder: ((remainder & 0xF00) >> 8) + 1,
+	"opcode5_2":lambda remainder: abs(((remainder & 0xF00) >> 8) - ((remainder & 0xF0) >> 4)) + 1
+}
+# Opcodes that change I to a value unknown to the analysis
+I_CHANGES = {"opcodeB", "opcodeF_1E", "opcodeF_29", "opcodeF_30", "opcodeF_55", "opcodeF_65"}
+
+def disassemble_instruction(code:int) -> str:
+	"""
+	Get the assembly of an instruction.
+
+	Parameters
+	----------
+	code : The 2 byte integer (0x0,0xFFFF) for the opcode.
+
+	Returns
+	-------
+	The mnemonic and its operands, or a DW directive if the code doesn't correspond to any opcode.
+	"""
+	name = OPCODE_NAMES[code]
+	if name is None:
+		return f"DW {code:#06x}"
+	return MNEMONICS[name].format(x=(code & 0xF00) >> 8, y=(code & 0xF0) >> 4, n=code & 0xF, nn=code & 0xFF, nnn=code & 0xFFF)
+
+
+class Chip8Block:
+	"""
+	A basic block of the control-flow graph: a straight run of instructions, entered at its first one.
+	"""
+	def __init__(self, start:int, end:int, successors:tuple, indirect:bool) -> None:
+		"""
+		Parameters
+		----------
+		start : The address of the first instruction.
+		end : The address after the last instruction.
+		successors : The start addresses of the blocks the execution can continue at.
+		indirect : True if the block ends with a jump whose destination isn't known statically (BNNN).
+		"""
+		self.start = start
+		self.end = end
+		self.successors = successors
+		self.indirect = indirect
+
+	def __len__(self) -> int:
+		"""
+		The number of instructions of the block.
+		"""
+		return (self.end - self.start) // 2
+
+
+class Chip8Analysis:
+	"""
+	Static analysis of a ROM: the code reachable from 0x200 (following jumps, calls, returns and skips), split into
+	basic blocks, the sprite data and the code addresses the program may write (self-modifying code hazards).
+	"""
+	def __init__(self, rom:Chip8Rom) -> None:
+		self.rom_hash = hashlib.sha256(rom.data).digest()
+		self.size = len(rom)
+		# Address -> code of every reachable instruction
+		self.instructions = {}
+		# Start address -> Chip8Block
+		self.blocks = {}
+		# Entry addresses of the subroutines
+		self.subroutines = set()
+		# Addresses loaded into I by ANNN, usually sprites
+		self.references = set()
+		# Code addresses written by a store whose destination is known
+		self.hazards = set()
+		# Addresses of the stores whose destination isn't known statically
+		self.unknown_writes = set()
+
+		data = bytes(rom.data)
+		self._discover(data)
+		self._split_blocks()
+		self._find_hazards()
+
+	def _read(self, data:bytes, address:int) -> int|None:
+		offset = address - PROGRAM_START
+		if offset < 0 or offset + 2 > len(data):
+			return None
+		return (data[offset] << 0x8) | data[offset + 1]
+
+	def _discover(self, data:bytes) -> None:
+		"""
+		Find every instruction reachable from the start of the program.
+		"""
+		# Every call returns after itself, so the instruction after a call is reachable
+		pending = [PROGRAM_START]
+		while pending:
+			address = pending.pop()
+			if address in self.instructions:
+				continue
+			code = self._read(data, address)
+			if code is None or OPCODE_NAMES[code] is None:
+				continue
+			self.instructions[address] = code
+			pending.extend(self._next_addresses(address, code))
+			name = OPCODE_NAMES[code]
+			if name in CALLS:
+				self.subroutines.add(code & 0xFFF)
+			elif name == "opcodeA":
+				self.references.add(code & 0xFFF)
+
+	def _next_addresses(self, address:int, code:int) -> tuple:
+		"""
+		Get the addresses the execution can continue at after an instruction.
+		"""
+		name = OPCODE_NAMES[code]
+		if name in JUMPS:
+			return (code & 0xFFF,)
+		if name in CALLS:
+			return (code & 0xFFF, address + 2)
+		if name in SKIPS:
+			return (address + 2, address + 4)
+		if name in INDIRECT_JUMPS or name in ENDS:
+			return ()
+		return (address + 2,)
+
+	def _split_blocks(self) -> None:
+		"""
+		Split the reachable instructions into basic blocks. A block starts at the program's entry, at the destination of
+		a jump, call or skip, and after the instructions that end the translator's blocks (see BLOCK_TERMINATORS).
+		"""
+		leaders = {PROGRAM_START}
+		for address, code in self.instructions.items():
+			next_addresses = self._next_addresses(address, code)
+			if OPCODE_NAMES[code] in BLOCK_TERMINATORS or next_addresses != (address + 2,):
+				leaders.update(next_addresses)
+				leaders.add(address + 2)
+		self.leaders = frozenset(leader for leader in leaders if leader in self.instructions)
+
+		for start in sorted(self.leaders):
+			address = start
+			while True:
+				code = self.instructions[address]
+				next_address = address + 2
+				if OPCODE_NAMES[code] in BLOCK_TERMINATORS or next_address in self.leaders or next_address not in self.instructions:
+					break
+				address = next_address
+			successors = tuple(successor for successor in self._next_addresses(address, code) if successor in self.instructions)
+			self.blocks[start] = Chip8Block(start, address + 2, successors, OPCODE_NAMES[code] in INDIRECT_JUMPS)
+
+	def _find_hazards(self) -> None:
+		"""
+		Follow I through every block to find the code addresses the program writes. I is only known after an ANNN of
+		the same block, stores with any other I are recorded in unknown_writes.
+		"""
+		for block in self.blocks.values():
+			memory_register = None
+			for address in range(block.start, block.end, 2):
+				code = self.instructions[address]
+				name = OPCODE_NAMES[code]
+				if name in STORES:
+					if memory_register is None:
+						self.unknown_writes.add(address)
+					else:
+						for written in range(memory_register, memory_register + STORES[name](code & 0xFFF)):
+							# An instruction starting at the previous address is modified too
+							for instruction_address in (written - 1, written):
+								if instruction_address in self.instructions:
+									self.hazards.add(instruction_address)
+				if name == "opcodeA":
+					memory_register = code & 0xFFF
+				elif name in I_CHANGES:
+					memory_register = None
+
+	def get_code_addresses(self) -> set:
+		"""
+		Get every byte address that belongs to a reachable instruction.
+		"""
+		return {address + offset for address in self.instructions for offset in (0, 1)}
+
+	def get_data_ranges(self) -> list:
+		"""
+		Get the parts of the ROM that aren't reachable code, usually sprites and tables. A range also starts at every
+		address loaded into I.
+
+		Returns
+		-------
+		A sorted list of (start, end) address tuples, end non-inclusive.
+		"""
+		code = self.get_code_addresses()
+		ranges = []
+		start = None
+		for address in range(PROGRAM_START, PROGRAM_START + self.size + 1):
+			is_data = address < PROGRAM_START + self.size and address not in code
+			if is_data and start is not None and address in self.references:
+				ranges.append((start, address))
+				start = address
+			elif is_data and start is None:
+				start = address
+			elif not is_data and start is not None:
+				ranges.append((start, address))
+				start = None
+		return ranges
+
+	def to_dot(self) -> str:
+		"""
+		Get the control-flow graph in the Graphviz format, every node labeled with its address and instruction count.
+		"""
+		lines = ["digraph chip8 {", "\tnode [shape=box, fontname=monospace];"]
+		for start, block in sorted(self.blocks.items()):
+			label = f"{start:#05x}\\n{len(block)} instructions"
+			if block.indirect:
+				label += "\\nindirect jump"
+			lines.append(f"\tb{start:03x} [label=\"{label}\"];")
+			for successor in block.successors:
+				lines.append(f"\tb{start:03x} -> b{successor:03x};")
+		lines.append("}")
+		return "\n".join(lines) + "\n"
+
+	def to_listing(self, rom:Chip8Rom) -> str:
+		"""
+		Get the disassembly of the ROM: the blocks of code, with their instruction counts and successors, and the data
+		as bytes drawn as sprite rows.
+		"""
+		data = bytes(rom.data)
+		data_ranges = self.get_data_ranges()
+		lines = [f"; {len(self.blocks)} blocks, {len(self.instructions)} instructions, {sum(end - start for start, end in data_ranges)} data bytes"]
+		items = [(start, "block", block) for start, block in self.blocks.items()] + [(start, "data", end) for start, end in data_ranges]
+		for start, kind, value in sorted(items, key=lambda item: item[0]):
+			lines.append("")
+			if kind == "block":
+				successors = ", ".join(f"{successor:#05x}" for successor in value.successors) or ("?" if value.indirect else "none")
+				subroutine = " (subroutine)" if start in self.subroutines else ""
+				lines.append(f"block_{start:03x}:{subroutine} ; {len(value)} instructions -> {successors}")
+				for address in range(value.start, value.end, 2):
+					code = self.instructions[address]
+					hazard = "  ; modified by the program" if address in self.hazards else ""
+					lines.append(f"{address:#05x}  {code:04X}  {disassemble_instruction(code)}{hazard}")
+			else:
+				referenced = " (referenced by I)" if start in self.references else ""
+				lines.append(f"data_{start:03x}:{referenced}")
+				for address in range(start, value):
+					byte = data[address - PROGRAM_START]
+					pattern = "".join("#" if (byte >> bit) & 0x1 else "." for bit in range(7, -1, -1))
+					lines.append(f"{address:#05x}  {byte:02X}    {pattern}  DB {byte:#04x}")
+		return "\n".join(lines) + "\n"
+
+
+# Analyses already done, keyed by the SHA-256 digest of the ROM
+_analyses = {}
+
+def analyze_rom(rom:Chip8Rom) -> Chip8Analysis:
+	"""
+	Get the static analysis of a ROM. The analysis of each ROM image is only done once per process, see
+	Chip8ControlUnit.load_rom for how the emulator uses it.
+	"""
+	digest = hashlib.sha256(rom.data).digest()
+	analysis = _analyses.get(digest)
+	if analysis is None:
+		analysis = Chip8Analysis(rom)
+		_analyses[digest] = analysis
+	return analysis
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Disassemble a Chip 8 ROM, separating the reachable code from the data.")
+	parser.add_argument("rom", help="The *.ch8 file to disassemble")
+	parser.add_argument("--dot", default=None, help="Write the control-flow graph into this Graphviz file")
+	arguments = parser.parse_args()
+
+	rom = Chip8Rom.open(arguments.rom)
+	analysis = analyze_rom(rom)
+	print(analysis.to_listing(rom), end="")
+	if arguments.dot is not None:
+		with open(arguments.dot, "w") as file:
+			file.write(analysis.to_dot())
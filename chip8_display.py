@@ -0,0 +1,102 @@
+from pygame import SCALED, FULLSCREEN, Rect
+from pygame.display import init, set_mode, get_init, update
+from pygame.pixelcopy import array_to_surface
+from pygame.key import get_pressed, key_code
+from chip8_keyboard import hex_to_str
+import math
+import time
+
+class Chip8Display:
+	"""
+	Presents the framebuffer of a Chip 8 screen in a pygame window. The screen works without it, so machines that
+	don't need a window (tests, batch jobs) never initialize pygame.
+
+	Presentation is frame based: the display uploads at most one frame per refresh period, and only the region of
+	the screen that changed since the previous one.
+	"""
+	def __init__(self, width:int=64, height:int=32, flags:int=SCALED | FULLSCREEN, refresh_rate:int|None=60) -> None:
+		self.initialize(width, height, flags, refresh_rate)
+
+	def initialize(self, width:int, height:int, flags:int, refresh_rate:int|None) -> None:
+		"""
+		Initializes the pygame display with the given size and flags, and stores its surface.
+
+		Parameters
+		----------
+		refresh_rate : Maximum number of presentations per second, or None to present on every request.
+		"""
+		init()
+		self.flags = flags
+		self.surface = set_mode(size=(width, height), flags=flags)
+		self.refresh_period = 0.0 if refresh_rate is None else 1.0 / refresh_rate
+		self.next_present = 0.0
+
+	def get_init(self) -> bool:
+		"""
+		Get the init state of the pygame display.
+
+		Returns
+		-------
+		True if the display is initialized, False otherwise.
+		"""
+		return get_init()
+
+	def present(self, screen, force:bool=False) -> bool:
+		"""
+		Copy the dirty region of a screen's framebuffer into the surface and display it, unless a frame was already
+		presented during the current refresh period. A skipped region stays dirty until the next presentation.
+		The surface is resized when the screen changes resolution (SUPER-CHIP 00FE/00FF).
+
+		Parameters
+		----------
+		screen : The Chip8Screen to present.
+		force : Present even if the refresh period hasn't elapsed.
+
+		Returns
+		-------
+		True if a frame was presented, False otherwise.
+		"""
+		now = time.monotonic()
+		if not force and now < self.next_present:
+			return False
+
+		dirty_rect = screen.take_dirty_rect()
+		if dirty_rect is None:
+			return False
+
+		if self.surface.get_size() != (screen.width, screen.height):
+			self.surface = set_mode(size=(screen.width, screen.height), flags=self.flags)
+			dirty_rect = (0, 0, screen.width, screen.height)
+
+		left, top, right, bottom = dirty_rect
+		rect = Rect(left, top, right - left, bottom - top)
+		array_to_surface(self.surface.subsurface(rect), screen.get_state()[left:right, top:bottom])
+		update(rect)
+		if self.refresh_period > 0:
+			# Move to the next period boundary, so presenting late doesn't push every following frame back
+			self.next_present += self.refresh_period * (math.floor((now - self.next_present) / self.refresh_period) + 1)
+		return True
+
+
+class Chip8PygameInput:
+	"""
+	Input provider that reads the 16 keys from the pygame window's keyboard state, with the same mapping as
+	Chip8Keyboard. The state only changes when the window's events are processed (pygame.event.get or
+	pygame.event.pump), so process them once per frame before the keys are sampled.
+	"""
+	def __init__(self) -> None:
+		# (bit of the key in the mask, pygame key code)
+		self._keys = [(0x1 << key, key_code(input_string)) for key, input_string in hex_to_str.items()]
+
+	def get_keys(self) -> int:
+		"""
+		Returns
+		-------
+		A 16 bit mask, bit n is set if the key 0xn is pressed.
+		"""
+		pressed = get_pressed()
+		keys = 0
+		for bit, code in self._keys:
+			if pressed[code]:
+				keys |= bit
+		return keys
@@ -0,0 +1,173 @@
+from chip8_control_unit import Chip8ControlUnit
+from multiprocessing import shared_memory
+import multiprocessing
+import argparse
+import hashlib
+import json
+import os
+import numpy
+
+STATUS_FINISHED = 0
+STATUS_ERROR = 1
+# The ROM waits for a key press (FX0A) that never comes, before the end of its cycles
+STATUS_WAITING = 2
+STATUS_NAMES = {STATUS_FINISHED:"finished", STATUS_ERROR:"error", STATUS_WAITING:"waiting"}
+
+# One row per job, written by the workers straight into shared memory
+RESULT_DTYPE = numpy.dtype([
+	("status", numpy.uint8),
+	("cycles", numpy.uint64),
+	("program_counter", numpy.uint16),
+	("memory_register", numpy.uint16),
+	("registers", numpy.uint8, 16),
+	("screen_hash", numpy.uint8, 32)
+])
+
+# Results array of the current worker process, attached by _attach_results
+_results = None
+
+def _attach_results(name:str, count:int) -> None:
+	"""
+	Pool initializer, attaches the worker to the shared results array.
+	"""
+	global _results
+	results_memory = shared_memory.SharedMemory(name=name)
+	_results = (results_memory, numpy.ndarray(shape=count, dtype=RESULT_DTYPE, buffer=results_memory.buf))
+
+def screen_hash(chip8vm:Chip8ControlUnit) -> bytes:
+	"""
+	Get the SHA-256 digest of a control unit's screen, with one bit per pixel.
+	"""
+	return hashlib.sha256(numpy.packbits(chip8vm.machine.get_screen_state() != 0).tobytes()).digest()
+
+def run_rom(file_path:str, seed:int, cycles:int, cycles_per_frame:int) -> tuple:
+	"""
+	Run a ROM headlessly for a fixed number of cycles, a frame of instructions at a time (see Chip8ControlUnit.run).
+	No key is ever pressed, so a ROM that waits for one stops there.
+
+	Parameters
+	----------
+	file_path : The path to the *.ch8 file.
+	seed : Seed for the random number generator used by CXNN.
+	cycles : The number of instructions to execute.
+	cycles_per_frame : The number of instructions between two 60 Hz timer ticks.
+
+	Returns
+	-------
+	A tuple (status, cycles executed, control unit).
+	"""
+	chip8vm = Chip8ControlUnit(seed=seed)
+	chip8vm.load_file(file_path)
+
+	executed = 0
+	try:
+		while executed < cycles and chip8vm.waiting_register is None:
+			executed += chip8vm.run(cycles=min(cycles_per_frame, cycles - executed))
+			if executed % cycles_per_frame == 0:
+				chip8vm.tick_timers()
+	except Exception:
+		# run doesn't report the instructions of the frame that failed, find them again
+		executed, chip8vm = _run_until_error(file_path, seed, cycles, cycles_per_frame)
+		return STATUS_ERROR, executed, chip8vm
+	if chip8vm.waiting_register is not None:
+		return STATUS_WAITING, executed, chip8vm
+	return STATUS_FINISHED, executed, chip8vm
+
+def _run_until_error(file_path:str, seed:int, cycles:int, cycles_per_frame:int) -> tuple:
+	"""
+	Run a ROM that failed in run_rom again, one instruction at a time. Nothing but the seed affects the run, so it
+	fails at the same instruction.
+
+	Returns
+	-------
+	A tuple (cycles executed before the error, control unit).
+	"""
+	chip8vm = Chip8ControlUnit(seed=seed)
+	chip8vm.load_file(file_path)
+
+	executed = 0
+	try:
+		while executed < cycles:
+			chip8vm.execute_instruction()
+			executed += 1
+			if executed % cycles_per_frame == 0:
+				chip8vm.tick_timers()
+	except Exception:
+		pass
+	return executed, chip8vm
+
+def _run_job(job:tuple) -> None:
+	"""
+	Run a single job inside a worker and store its result in its row of the shared results array.
+	"""
+	index, file_path, seed, cycles, cycles_per_frame = job
+	status, executed, chip8vm = run_rom(file_path, seed, cycles, cycles_per_frame)
+
+	row = _results[1][index]
+	row["status"] = status
+	row["cycles"] = executed
+	row["program_counter"] = chip8vm.program_counter & 0xFFFF
+	row["memory_register"] = chip8vm.machine.read_memory_register()
+	row["registers"] = numpy.frombuffer(chip8vm.machine.read_registers(16), dtype=numpy.uint8)
+	row["screen_hash"] = numpy.frombuffer(screen_hash(chip8vm), dtype=numpy.uint8)
+
+def run_farm(file_paths:list, cycles:int, seeds:list=(0,), cycles_per_frame:int=8, processes:int|None=None) -> tuple:
+	"""
+	Run every ROM with every seed in a pool of processes, one headless control unit per job.
+
+	Parameters
+	----------
+	file_paths : The paths to the *.ch8 files.
+	cycles : The number of instructions to execute per job.
+	seeds : The seeds for the random number generator, every ROM is run once per seed.
+	cycles_per_frame : The number of instructions between two 60 Hz timer ticks.
+	processes : The number of worker processes, the number of CPUs by default.
+
+	Returns
+	-------
+	A tuple (jobs, results). jobs is a list of (file path, seed) and results a numpy.ndarray of RESULT_DTYPE, in the same order.
+	"""
+	jobs = [(file_path, seed) for file_path in file_paths for seed in seeds]
+	if len(jobs) == 0:
+		return jobs, numpy.zeros(shape=0, dtype=RESULT_DTYPE)
+
+	results_memory = shared_memory.SharedMemory(create=True, size=RESULT_DTYPE.itemsize * len(jobs))
+	try:
+		with multiprocessing.Pool(processes, initializer=_attach_results, initargs=(results_memory.name, len(jobs))) as pool:
+			pool.map(_run_job, [(i, file_path, seed, cycles, cycles_per_frame) for i, (file_path, seed) in enumerate(jobs)])
+		results = numpy.ndarray(shape=len(jobs), dtype=RESULT_DTYPE, buffer=results_memory.buf).copy()
+	finally:
+		results_memory.close()
+		results_memory.unlink()
+	return jobs, results
+
+def find_roms(path:str) -> list:
+	"""
+	Get the *.ch8 files in a directory, sorted by name. A path to a file is returned as is.
+	"""
+	if os.path.isfile(path):
+		return [path]
+	return sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(".ch8"))
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Run a directory of Chip 8 ROMs (or many seeds of one ROM) on all cores.")
+	parser.add_argument("path", help="A directory containing *.ch8 files, or a single *.ch8 file")
+	parser.add_argument("--cycles", type=int, default=100000, help="Instructions executed per job")
+	parser.add_argument("--seeds", type=int, default=1, help="Number of seeds (0 to N-1) each ROM is run with")
+	parser.add_argument("--cycles-per-frame", type=int, default=8, help="Instructions between two 60 Hz timer ticks")
+	parser.add_argument("--processes", type=int, default=None, help="Worker processes, the number of CPUs by default")
+	arguments = parser.parse_args()
+
+	jobs, results = run_farm(find_roms(arguments.path), arguments.cycles, range(arguments.seeds), arguments.cycles_per_frame, arguments.processes)
+	for (file_path, seed), result in zip(jobs, results):
+		print(json.dumps({
+			"rom": file_path,
+			"seed": seed,
+			"status": STATUS_NAMES[int(result["status"])],
+			"cycles": int(result["cycles"]),
+			"program_counter": int(result["program_counter"]),
+			"memory_register": int(result["memory_register"]),
+			"registers": bytes(result["registers"]).hex(),
+			"screen_hash": bytes(result["screen_hash"]).hex()
+		}))
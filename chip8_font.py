@@ -15,4 +15,26 @@ font = {
 	0xD:[0xE0, 0x90, 0x90, 0x90, 0xE0],
 	0xE:[0xF0, 0x80, 0xF0, 0x80, 0xF0],
 	0xF:[0xF0, 0x80, 0xF0, 0x80, 0x80] 
-}
\ No newline at end of file
+}
+
+# SUPER-CHIP 8x10 font, loaded after the small one (see BIG_FONT_ADDRESS). SUPER-CHIP only had the digits, the letters
+# are the ones used by Octo for XO-CHIP.
+big_font = {
+	0x0:[0x3C, 0x7E, 0xE7, 0xC3, 0xC3, 0xC3, 0xC3, 0xE7, 0x7E, 0x3C],
+	0x1:[0x18, 0x38, 0x58, 0x18, 0x18, 0x18, 0x18, 0x18, 0x18, 0x3C],
+	0x2:[0x3E, 0x7F, 0xC3, 0x06, 0x0C, 0x18, 0x30, 0x60, 0xFF, 0xFF],
+	0x3:[0x3C, 0x7E, 0xC3, 0x03, 0x0E, 0x0E, 0x03, 0xC3, 0x7E, 0x3C],
+	0x4:[0x06, 0x0E, 0x1E, 0x36, 0x66, 0xC6, 0xFF, 0xFF, 0x06, 0x06],
+	0x5:[0xFF, 0xFF, 0xC0, 0xC0, 0xFC, 0xFE, 0x03, 0xC3, 0x7E, 0x3C],
+	0x6:[0x3E, 0x7C, 0xE0, 0xC0, 0xFC, 0xFE, 0xC3, 0xC3, 0x7E, 0x3C],
+	0x7:[0xFF, 0xFF, 0x03, 0x06, 0x0C, 0x18, 0x30, 0x60, 0x60, 0x60],
+	0x8:[0x3C, 0x7E, 0xC3, 0xC3, 0x7E, 0x7E, 0xC3, 0xC3, 0x7E, 0x3C],
+	0x9:[0x3C, 0x7E, 0xC3, 0xC3, 0x7F, 0x3F, 0x03, 0x03, 0x3E, 0x7C],
+	0xA:[0x7E, 0xFF, 0xC3, 0xC3, 0xC3, 0xFF, 0xFF, 0xC3, 0xC3, 0xC3],
+	0xB:[0xFE, 0xFF, 0xC3, 0xFE, 0xFE, 0xC3, 0xC3, 0xC3, 0xFF, 0xFE],
+	0xC:[0x3C, 0xFF, 0xC3, 0xC0, 0xC0, 0xC0, 0xC0, 0xC3, 0xFF, 0x3C],
+	0xD:[0xFC, 0xFE, 0xC3, 0xC3, 0xC3, 0xC3, 0xC3, 0xC3, 0xFE, 0xFC],
+	0xE:[0xFF, 0xFF, 0xC0, 0xC0, 0xFF, 0xFF, 0xC0, 0xC0, 0xFF, 0xFF],
+	0xF:[0xFF, 0xFF, 0xC0, 0xC0, 0xFF, 0xFF, 0xC0, 0xC0, 0xC0, 0xC0]
+}
+BIG_FONT_ADDRESS = 0x50
@@ -59,13 +59,37 @@ class Chip8Keyboard:
 	0xB->c\\
 	0xF->v
 	"""
-	def __init__(self) -> None:
-		self.valid_inputs = ['1','2','3','4','q','w','e','r','a','s','d','f','z','x','c','v']
-		
+	def __init__(self, provider=None) -> None:
+		"""
+		Parameters
+		----------
+		provider : An input provider (an object with a get_keys() method, see Chip8LiveInput) sampled once per frame
+		by sample, or None for a keyboard whose keys are never pressed (headless machines).
+		"""
+		self.provider = provider
+		# Bit n is set if the key 0xn was pressed when the provider was last sampled
+		self.keys = 0
+		# Bit n is set if the key 0xn was pressed in the last sample but not in the one before
+		self.pressed = 0
+
+	def sample(self) -> int:
+		"""
+		Read the state of the 16 keys from the provider. The state stays the same until the next sample, so every
+		instruction of a frame sees the same keys.
+
+		Returns
+		-------
+		A 16 bit mask, bit n is set if the key 0xn is pressed.
+		"""
+		if self.provider is not None:
+			keys = self.provider.get_keys() & 0xFFFF
+			self.pressed = keys & ~self.keys
+			self.keys = keys
+		return self.keys
 		
 	def is_key_pressed(self, input:int) -> bool:
 		"""
-		Check if the input key is pressed. Valid inputs are: '1','2','3','4','q','w','e','r','a','s','d','f','z','x','c' and 'v'.
+		Check if the input key was pressed when the keys were last sampled.
 
 		Parameters
 		----------
@@ -75,20 +99,41 @@ class Chip8Keyboard:
 		-------
 		True if the key is pressed, False otherwise.
 		"""
-		input_string = hex_to_str[input]
-		if (keyboard.is_pressed(input_string) and (input_string in self.valid_inputs)):
-			return True
-		return False
+		return (self.keys >> input) & 0x1 == 0x1
 	
-	def wait_for_input(self) -> int:
+	def wait_for_input(self) -> int|None:
 		"""
 		Waits until a key press. Valid inputs are: '1','2','3','4','q','w','e','r','a','s','d','f','z','x','c' and 'v'.
+		With a provider it doesn't wait, the keys only change when they are sampled.
 
 		Returns
 		-------
-		An integer corresponding to the hex value of the key that was pressed.
+		An integer corresponding to the hex value of the key that was pressed. With a provider, the lowest key pressed
+		in the last sample, or None if no key was pressed.
 		"""
+		if self.provider is not None:
+			if self.keys == 0:
+				return None
+			return (self.keys & -self.keys).bit_length() - 1
 		while True:
 			pressed_key = keyboard.read_key()
-			if pressed_key in self.valid_inputs:
+			if pressed_key in str_to_hex:
 				return str_to_hex[pressed_key]
+
+
+
+class Chip8LiveInput:
+	"""
+	Input provider that reads the 16 keys of the physical keyboard, with the mapping described in Chip8Keyboard.
+	"""
+	def get_keys(self) -> int:
+		"""
+		Returns
+		-------
+		A 16 bit mask, bit n is set if the key 0xn is pressed.
+		"""
+		keys = 0
+		for key, input_string in hex_to_str.items():
+			if keyboard.is_pressed(input_string):
+				keys |= 0x1 << key
+		return keys
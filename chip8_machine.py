@@ -1,29 +1,39 @@
 import numpy
 from chip8_screen import Chip8Screen
 from chip8_keyboard import Chip8Keyboard
-from chip8_register import Chip8Register, Chip8MemoryRegister
+from chip8_register import Chip8Register, Chip8RegisterFile
 from chip8_stack import Chip8Stack
 from chip8_timer import Chip8Timer
 from chip8_memory import Chip8Memory
-from chip8_font import font
+from chip8_font import font, big_font, BIG_FONT_ADDRESS
+from chip8_screen import LOW_RESOLUTION, HIGH_RESOLUTION
 
 class Chip8Machine:
-	def __init__(self) -> None:
-		self._screen = Chip8Screen()
-		self._registers = [Chip8Register() for i in range(17)]
-		self._memory_register = Chip8MemoryRegister()
+	def __init__(self, display=None, input_provider=None) -> None:
+		"""
+		Parameters
+		----------
+		display : A Chip8Display to present the screen in, or None to run headless.
+		input_provider : The source of the key states, see Chip8Keyboard.
+		"""
+		self._screen = Chip8Screen(display)
+		self._registers = Chip8RegisterFile()
 		self._memory = Chip8Memory()
-		self._keyboard = Chip8Keyboard()
+		self._keyboard = Chip8Keyboard(input_provider)
 		self._stack = Chip8Stack()
 		self._timer = Chip8Timer()
 		self._sound_timer = Chip8Timer()
+		# SUPER-CHIP persistent flags (FX75/FX85), the HP-48 calculator's RPL user flags
+		self._flags = bytearray(16)
 
-		# Load the font into memory
+		# Load the fonts into memory
 		for key, value in font.items():
 			self._memory.write(key * 0x5, numpy.array(value))
+		for key, value in big_font.items():
+			self._memory.write(BIG_FONT_ADDRESS + key * 0xA, numpy.array(value))
 
-	def draw_sprite(self, sprite:numpy.ndarray, x:int, y:int) -> bool:
-		return self._screen.draw_sprite(sprite, x, y)
+	def draw_sprite(self, sprite:numpy.ndarray, x:int, y:int, sprite_width:int=8, clip:bool=False) -> bool:
+		return self._screen.draw_sprite(sprite, x, y, sprite_width, clip)
 
 	def update_screen(self) -> None:
 		self._screen.update()
@@ -34,38 +44,109 @@ class Chip8Machine:
 	def get_screen_state(self) -> numpy.ndarray:
 		return self._screen.get_state()
 	
+	def get_screen_rows(self, plane:int=0) -> tuple:
+		return self._screen.get_rows(plane)
+
+	def get_screen_changes(self) -> int:
+		return self._screen.changes
+
+	def get_packed_screen(self, plane:int=0) -> bytes:
+		return self._screen.pack(plane)
+
+	def set_packed_screen(self, data:bytes, plane:int=0) -> None:
+		self._screen.unpack(data, plane)
+
 	def get_screen_width(self) -> int:
 		return self._screen.width
 	
 	def get_screen_height(self) -> int:
 		return self._screen.height
 
+	def set_screen_resolution(self, width:int, height:int) -> None:
+		self._screen.set_resolution(width, height)
+
+	def set_high_resolution(self, enabled:bool) -> None:
+		self._screen.set_resolution(*(HIGH_RESOLUTION if enabled else LOW_RESOLUTION))
+
+	def scroll_screen(self, right:int=0, down:int=0) -> None:
+		"""
+		Scroll the selected planes of the screen, negative values scroll left or up.
+		"""
+		if right > 0:
+			self._screen.scroll_right(right)
+		elif right < 0:
+			self._screen.scroll_left(-right)
+		if down > 0:
+			self._screen.scroll_down(down)
+		elif down < 0:
+			self._screen.scroll_up(-down)
+
+	def select_planes(self, plane_mask:int) -> None:
+		self._screen.select_planes(plane_mask)
+
+	def get_plane_mask(self) -> int:
+		return self._screen.plane_mask
+
+	def get_selected_plane_count(self) -> int:
+		return self._screen.get_selected_plane_count()
+
+	def read_flags(self, count:int) -> bytes:
+		return bytes(self._flags[:count])
+
+	def write_flags(self, values) -> None:
+		values = bytes(values)
+		self._flags[:len(values)] = values
+
 	def read_register(self, register_number:int) -> int:
-		return self._registers[register_number].get_state()
+		return self._registers.read(register_number)
 	
-	def write_register(self, register_number:int, value:int) -> None:
-		self._registers[register_number].set(value)
+	def write_register(self, register_number:int, value:int|Chip8Register) -> None:
+		self._registers.write(register_number, value)
+
+	def read_registers(self, count:int) -> bytes:
+		return self._registers.read_range(count)
+
+	def write_registers(self, values) -> None:
+		self._registers.write_range(values)
 
 	def read_memory_register(self) -> int:
-		return self._memory_register.get_state()
+		return self._registers.read_memory_register()
 
 	def write_memory_register(self, value:int) -> None:
-		self._memory_register.set(value)
+		self._registers.write_memory_register(value)
 	
 	def read_memory(self, address:int) -> int:
 		return self._memory.read(address)
 
-	def read_memory_range(self, start:int, finish:int):
+	def read_memory_range(self, start:int, finish:int) -> memoryview:
 		return self._memory.read_range(start, finish)
 
-	def write_memory(self, address:int, value:int|numpy.ndarray) -> None:
+	def read_memory_block(self, address:int, length:int) -> bytes|memoryview:
+		return self._memory.read_block(address, length)
+
+	def write_memory(self, address:int, value:int|bytes|numpy.ndarray) -> None:
 		self._memory.write(address, value)
 	
 	def is_key_pressed(self, input:int) -> bool:
 		return self._keyboard.is_key_pressed(input)
 
-	def wait_for_input(self) -> int:
+	def wait_for_input(self) -> int|None:
 		return self._keyboard.wait_for_input()
+
+	def sample_keys(self) -> int:
+		return self._keyboard.sample()
+
+	def get_pressed_keys(self) -> int:
+		return self._keyboard.pressed
+
+	def get_keys(self) -> int:
+		return self._keyboard.keys
+
+	def set_keys(self, keys:int) -> None:
+		self._keyboard.keys = keys & 0xFFFF
+
+	def set_input_provider(self, provider) -> None:
+		self._keyboard.provider = provider
 	
 	def push_stack(self, value:int) -> None:
 		self._stack.push(value)
@@ -73,6 +154,12 @@ class Chip8Machine:
 	def pop_stack(self) -> int:
 		return self._stack.pop()
 
+	def get_stack(self) -> tuple:
+		return tuple(self._stack.stack)
+
+	def set_stack(self, values) -> None:
+		self._stack.stack = [value & 0xFFF for value in values]
+
 	def get_remaining_time(self) -> int:
 		return self._timer.get_remaining_time()
 
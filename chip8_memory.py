@@ -2,8 +2,9 @@ import numpy
 
 class Chip8Memory:
 	def __init__(self) -> None:
-		self.memory = numpy.zeros(shape=(4096), dtype=int)
-	
+		self.memory = bytearray(4096)
+		self._view = memoryview(self.memory)
+
 	def read(self, address:int) -> int:
 		"""
 		Read the value stored at the given address.
@@ -14,7 +15,7 @@ class Chip8Memory:
 		"""
 		return self.memory[address & 0xFFF]
 
-	def read_range(self, start:int, finish:int) -> numpy.ndarray:
+	def read_range(self, start:int, finish:int) -> memoryview:
 		"""
 		Read a chunk of memory. Start inclusive, finish non-inclusive.
 
@@ -25,21 +26,54 @@ class Chip8Memory:
 
 		Returns
 		-------
-		A numpy.ndarray containing a copy of the memory in the specified range.
+		A memoryview of the memory in the specified range. It isn't a copy, so it reflects any later write.
+		"""
+		return self._view[start:finish]
+
+	def read_block(self, address:int, length:int) -> bytes|memoryview:
+		"""
+		Read length bytes starting at the given address. Blocks that go past the end of the memory wrap around to its
+		beginning, like the ones written by write.
+
+		Parameters
+		----------
+		address : int, only its 12 least significant bits are used.
+		length : int in the range (0x0,0x1000)
+
+		Returns
+		-------
+		A memoryview of the memory if the block doesn't wrap around, a copy (bytes) otherwise.
 		"""
-		return self.memory[start:finish]
-	
-	def write(self, address:int, value:int|numpy.ndarray) -> None:
+		address &= 0xFFF
+		end = address + length
+		if end <= len(self.memory):
+			return self._view[address:end]
+		return bytes(self._view[address:]) + bytes(self._view[:end - len(self.memory)])
+
+	def write(self, address:int, value:int|bytes|numpy.ndarray) -> None:
 		"""
 		Write a value into the given address. The Chip 8 memory has 1 byte cells, therefore, attempting to store a value larger than 0xFF
-		will result in data loss.
+		will result in data loss. Arrays that go past the end of the memory wrap around to its beginning.
 
 		Parameters
 		----------
 		address : int in the range [0x0,0xFFF] where the value will be inserted.
-		value : int in the range [0x0,0xFF] OR a numpy.ndarray whose elements are ints within the range [0x0,0xFF]
+		value : int in the range [0x0,0xFF], a bytes-like object OR a numpy.ndarray whose elements are ints within the range [0x0,0xFF]
 		"""
-		if type(value) is numpy.ndarray:
-			self.memory.put([address + i for i in range(len(value))], value & 0xFF)
+		if isinstance(value, numpy.ndarray):
+			value = (value & 0xFF).astype(numpy.uint8).tobytes()
+		elif not isinstance(value, (bytes, bytearray, memoryview)):
+			self.memory[address] = value & 0xFF
+			return
+
+		if len(value) > len(self.memory):
+			raise ValueError(f"Can't write {len(value)} bytes into a memory of {len(self.memory)} bytes")
+		address &= 0xFFF
+		end = address + len(value)
+		if end <= len(self.memory):
+			self._view[address:end] = value
 		else:
-			self.memory[address] = value & 0xFF
\ No newline at end of file
+			# Wrap the part that doesn't fit around to the beginning of the memory
+			split = len(self.memory) - address
+			self._view[address:] = value[:split]
+			self._view[:end - len(self.memory)] = value[split:]
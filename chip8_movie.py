@@ -0,0 +1,185 @@
+from chip8_control_unit import Chip8ControlUnit
+from chip8_rom import Chip8Rom
+from chip8_quirks import get_profile
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+import numpy
+
+MOVIE_MAGIC = b"C8MV"
+MOVIE_VERSION = 3
+
+# magic, version, seed, SHA-256 of the ROM, name of the quirks profile (ASCII, padded with zeros), number of frames
+_HEADER = struct.Struct("<4sBQ32s16sI")
+# Everything that can change between two runs of the same ROM with the same seed, per frame
+FRAME_DTYPE = numpy.dtype([
+	("keys", "<u2"),
+	("instructions", "<u2"),
+	("ticks", "u1")
+])
+
+def rom_hash(rom:Chip8Rom) -> bytes:
+	"""
+	Get the SHA-256 digest of a ROM's image.
+	"""
+	return hashlib.sha256(rom.data).digest()
+
+class Chip8Movie:
+	"""
+	A recording of a session: the seed of the random number generator, the quirks profile, and for every frame the
+	state of the 16 keys, the number of instructions executed and the number of timer ticks. Replaying it reproduces the session exactly,
+	as fast as the interpreter can run.
+	"""
+	def __init__(self, seed:int, rom_digest:bytes, frames:numpy.ndarray|None=None, quirks:str="default") -> None:
+		"""
+		Parameters
+		----------
+		seed : The seed of the control unit's random number generator, an unsigned 64 bit integer.
+		rom_digest : The SHA-256 digest of the recorded ROM, see rom_hash.
+		frames : A numpy.ndarray of FRAME_DTYPE, None to start an empty recording.
+		quirks : The name of the quirks profile of the recorded control unit, see chip8_quirks.PROFILES.
+		"""
+		# Only named profiles can be stored
+		get_profile(quirks)
+		self.seed = seed
+		self.rom_digest = rom_digest
+		self.quirks = quirks
+		self._recorded = []
+		self._frames = numpy.zeros(shape=0, dtype=FRAME_DTYPE) if frames is None else frames
+
+	@classmethod
+	def record(cls, rom:Chip8Rom, seed:int|None=None, quirks:str="default") -> "Chip8Movie":
+		"""
+		Start an empty recording of a ROM.
+
+		Parameters
+		----------
+		seed : The seed for the random number generator, None for a random one. Create the recorded control unit
+		with the movie's seed.
+		quirks : The name of the quirks profile, create the recorded control unit with the movie's quirks.
+		"""
+		if seed is None:
+			seed = int.from_bytes(os.urandom(8), "little")
+		return cls(seed, rom_hash(rom), quirks=quirks)
+
+	def __len__(self) -> int:
+		return len(self._frames) + len(self._recorded)
+
+	def record_frame(self, keys:int, instructions:int, ticks:int) -> None:
+		"""
+		Add a frame to the recording, see Chip8Scheduler. Frames with more than 0xFFFF instructions are split.
+		"""
+		while instructions > 0xFFFF:
+			self._recorded.append((keys, 0xFFFF, 0))
+			instructions -= 0xFFFF
+		self._recorded.append((keys, instructions, ticks))
+
+	@property
+	def frames(self) -> numpy.ndarray:
+		"""
+		Every frame recorded so far, as a numpy.ndarray of FRAME_DTYPE.
+		"""
+		if self._recorded:
+			self._frames = numpy.concatenate((self._frames, numpy.array(self._recorded, dtype=FRAME_DTYPE)))
+			self._recorded = []
+		return self._frames
+
+	def to_bytes(self) -> bytes:
+		"""
+		Get the movie in its file format: a header followed by the compressed frames.
+		"""
+		frames = self.frames
+		return _HEADER.pack(MOVIE_MAGIC, MOVIE_VERSION, self.seed, self.rom_digest, self.quirks.encode("ascii"), len(frames)) + zlib.compress(frames.tobytes())
+
+	@classmethod
+	def from_bytes(cls, data:bytes) -> "Chip8Movie":
+		"""
+		Read a movie in the format written by to_bytes.
+		"""
+		magic, version, seed, rom_digest, quirks, count = _HEADER.unpack_from(data)
+		if magic != MOVIE_MAGIC:
+			raise ValueError("The buffer isn't a Chip 8 movie")
+		if version != MOVIE_VERSION:
+			raise ValueError(f"Unsupported movie version {version}, expected {MOVIE_VERSION}")
+		frames = numpy.frombuffer(zlib.decompress(data[_HEADER.size:]), dtype=FRAME_DTYPE)
+		if len(frames) != count:
+			raise ValueError(f"The movie has {len(frames)} frames, its header says {count}")
+		return cls(seed, rom_digest, frames, quirks.rstrip(b"\0").decode("ascii"))
+
+	def save(self, file_path:str) -> None:
+		with open(file_path, "wb") as file:
+			file.write(self.to_bytes())
+
+	@classmethod
+	def load(cls, file_path:str) -> "Chip8Movie":
+		with open(file_path, "rb") as file:
+			return cls.from_bytes(file.read())
+
+
+class Chip8MoviePlayer:
+	"""
+	Input provider that returns the recorded keys of a movie, one frame after another.
+	"""
+	def __init__(self, movie:Chip8Movie) -> None:
+		self.keys = movie.frames["keys"]
+		self.frame = 0
+
+	def get_keys(self) -> int:
+		keys = int(self.keys[self.frame])
+		self.frame += 1
+		return keys
+
+
+def replay(movie:Chip8Movie, rom:Chip8Rom, display=None) -> Chip8ControlUnit:
+	"""
+	Replay a movie without any pacing: every frame samples its recorded keys, executes its instructions and ticks
+	the timers, exactly as Chip8Scheduler did while recording.
+
+	Parameters
+	----------
+	movie : The Chip8Movie to replay.
+	rom : The recorded ROM.
+	display : A Chip8Display to present every frame in, or None to replay headlessly.
+
+	Returns
+	-------
+	The control unit, in the state the recording ended with.
+	"""
+	if rom_hash(rom) != movie.rom_digest:
+		raise ValueError("The movie wasn't recorded with this ROM")
+	chip8vm = Chip8ControlUnit(display, seed=movie.seed, input_provider=Chip8MoviePlayer(movie), quirks=movie.quirks)
+	chip8vm.load_rom(rom)
+
+	for frame in movie.frames.tolist():
+		keys, instructions, ticks = frame
+		chip8vm.sample_keys()
+		if instructions > 0:
+			chip8vm.run(cycles=instructions)
+		for i in range(ticks):
+			chip8vm.tick_timers()
+		if display is not None:
+			chip8vm.machine.update_screen()
+	return chip8vm
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Replay a Chip 8 movie headlessly, as fast as possible.")
+	parser.add_argument("movie", help="A movie recorded with main.py --record")
+	parser.add_argument("rom", help="The *.ch8 file the movie was recorded with")
+	arguments = parser.parse_args()
+
+	movie = Chip8Movie.load(arguments.movie)
+	start = time.perf_counter()
+	chip8vm = replay(movie, Chip8Rom.open(arguments.rom))
+	elapsed = time.perf_counter() - start
+	print(json.dumps({
+		"frames": len(movie),
+		"instructions": int(movie.frames["instructions"].sum()),
+		"seconds": elapsed,
+		"program_counter": chip8vm.program_counter,
+		"screen": hashlib.sha256(chip8vm.machine.get_packed_screen()).hexdigest()
+	}))
@@ -0,0 +1,120 @@
+import time
+
+class Chip8Profiler:
+	"""
+	Counts the executions and accumulates the wall time of every opcode handler and every program counter address of a
+	control unit. While enabled, the control unit's dispatch table is replaced by one whose entries wrap the handlers
+	with the instrumentation, so a control unit that isn't being profiled doesn't pay anything for it.
+	"""
+	def __init__(self, control_unit) -> None:
+		self.control_unit = control_unit
+		self._original_table = None
+		self.reset()
+
+	def reset(self) -> None:
+		"""
+		Discard everything measured so far.
+		"""
+		# Handler name -> executions, and handler name -> nanoseconds
+		self.counts = {}
+		self.times = {}
+		# Executions per program counter address
+		self.address_counts = [0] * 0x1000
+		# (call stack, handler name) -> nanoseconds
+		self.stacks = {}
+
+	def enable(self) -> None:
+		"""
+		Start profiling, by switching the control unit to an instrumented dispatch table.
+		"""
+		if self._original_table is not None:
+			return
+		self._original_table = self.control_unit._dispatch_table
+		wrappers = {}
+		for handler in set(self._original_table):
+			wrappers[handler] = self._instrument(handler)
+		self.control_unit._dispatch_table = [wrappers[handler] for handler in self._original_table]
+		# Translated blocks call the handlers they were built with, so they must be built again, this time setting the
+		# program counter before every instruction so the addresses are counted right
+		self.control_unit._translator.track_program_counter = True
+		self.control_unit._translator.clear()
+
+	def disable(self) -> None:
+		"""
+		Stop profiling, restoring the control unit's original dispatch table. The measurements are kept.
+		"""
+		if self._original_table is None:
+			return
+		self.control_unit._dispatch_table = self._original_table
+		self._original_table = None
+		self.control_unit._translator.track_program_counter = False
+		self.control_unit._translator.clear()
+
+	def _instrument(self, handler):
+		"""
+		Wrap a handler with the code that measures it.
+		"""
+		name = handler.__name__
+		counts = self.counts
+		times = self.times
+		address_counts = self.address_counts
+		stacks = self.stacks
+		clock = time.perf_counter_ns
+		self.counts.setdefault(name, 0)
+		self.times.setdefault(name, 0)
+
+		def instrumented(control_unit, remainder:int) -> None:
+			program_counter = control_unit.program_counter
+			call_stack = control_unit.machine.get_stack()
+			start = clock()
+			try:
+				handler(control_unit, remainder)
+			finally:
+				elapsed = clock() - start
+				counts[name] += 1
+				times[name] += elapsed
+				address_counts[program_counter & 0xFFF] += 1
+				key = (call_stack, name)
+				stacks[key] = stacks.get(key, 0) + elapsed
+		return instrumented
+
+	def histogram(self) -> list:
+		"""
+		Get the measurements of every handler that was executed, the most expensive first.
+
+		Returns
+		-------
+		A list of tuples (handler name, executions, total seconds, mean seconds).
+		"""
+		histogram = [(name, count, self.times[name] / 1e9, self.times[name] / 1e9 / count) for name, count in self.counts.items() if count > 0]
+		return sorted(histogram, key=lambda entry: entry[2], reverse=True)
+
+	def hot_addresses(self, count:int=10) -> list:
+		"""
+		Get the most executed program counter addresses.
+
+		Returns
+		-------
+		A list of up to count tuples (address, executions), the most executed first.
+		"""
+		executed = [(address, executions) for address, executions in enumerate(self.address_counts) if executions > 0]
+		return sorted(executed, key=lambda entry: entry[1], reverse=True)[:count]
+
+	def folded_stacks(self) -> list:
+		"""
+		Get the time spent in every handler, keyed by the Chip 8 call stack it ran in, in the folded format used by
+		flamegraph tools: one line per stack, "frame;frame;...;handler nanoseconds". Each frame is the address of
+		a call (2NNN) still waiting for its return.
+		"""
+		lines = []
+		for (call_stack, name), elapsed in self.stacks.items():
+			frames = ["main"] + [f"call@{address:#05x}" for address in call_stack] + [name]
+			lines.append(f"{';'.join(frames)} {elapsed}")
+		return sorted(lines)
+
+	def write_folded_stacks(self, file_path:str) -> None:
+		"""
+		Write the folded stacks to a file, see folded_stacks.
+		"""
+		with open(file_path, "w") as file:
+			file.write("\n".join(self.folded_stacks()) + "\n")
@@ -0,0 +1,92 @@
+# Behaviors that differ between the Chip 8 platforms. The handlers of Chip8ControlUnit implement the emulator's
+# original behavior, every quirk replaces some of them with a variant whose name adds the quirk's suffix. The variants
+# are chosen when the dispatch table is built (see build_dispatch_table), so the quirks cost nothing per instruction.
+QUIRKS = {
+	# 8XY6/8XYE shift Vy into Vx, instead of shifting Vx in place
+	"shift_vy":{
+		"suffix":"_vy",
+		"opcodes":{"opcode8_6", "opcode8_E"}
+	},
+	# BXNN jumps to XNN + Vx, instead of NNN + V0
+	"jump_vx":{
+		"suffix":"_vx",
+		"opcodes":{"opcodeB"}
+	},
+	# FX55/FX65 leave I = I + X + 1
+	"load_store_increment":{
+		"suffix":"_increment",
+		"opcodes":{"opcodeF_55", "opcodeF_65"}
+	},
+	# FX55/FX65 leave I = I + X
+	"load_store_increment_x":{
+		"suffix":"_increment_x",
+		"opcodes":{"opcodeF_55", "opcodeF_65"}
+	},
+	# 8XY1/8XY2/8XY3 set VF to 0
+	"logic_vf_reset":{
+		"suffix":"_vf_reset",
+		"opcodes":{"opcode8_1", "opcode8_2", "opcode8_3"}
+	},
+	# Sprites are clipped at the edges of the screen instead of wrapping around
+	"clip_sprites":{
+		"suffix":"_clip",
+		"opcodes":{"opcodeD"}
+	},
+	# DXYN waits for the next frame (the vertical blank interrupt) after drawing
+	"display_wait":{
+		"suffix":"_display_wait",
+		"opcodes":{"opcodeD"}
+	}
+}
+
+# Named profiles, each one the set of quirks of a platform
+PROFILES = {
+	# The emulator's original behavior
+	"default":frozenset(),
+	"cosmac-vip":frozenset({"shift_vy", "load_store_increment", "logic_vf_reset", "clip_sprites", "display_wait"}),
+	"chip-48":frozenset({"jump_vx", "load_store_increment_x", "clip_sprites"}),
+	"schip":frozenset({"jump_vx", "clip_sprites"}),
+	"xo-chip":frozenset({"shift_vy", "load_store_increment"})
+}
+
+def get_profile(quirks:str|frozenset|set|None) -> frozenset:
+	"""
+	Get the set of quirks of a profile.
+
+	Parameters
+	----------
+	quirks : The name of a profile in PROFILES, a set of quirk names from QUIRKS, or None for the default profile.
+
+	Returns
+	-------
+	A frozenset of quirk names, usable as a dictionary key.
+	"""
+	if quirks is None:
+		return PROFILES["default"]
+	if isinstance(quirks, str):
+		profile = PROFILES.get(quirks)
+		if profile is None:
+			raise ValueError(f"Unknown quirks profile {quirks!r}, expected one of {', '.join(PROFILES)}")
+		return profile
+	unknown = set(quirks) - QUIRKS.keys()
+	if unknown:
+		raise ValueError(f"Unknown quirks {', '.join(sorted(unknown))}")
+	if {"load_store_increment", "load_store_increment_x"} <= set(quirks):
+		raise ValueError("load_store_increment and load_store_increment_x can't be combined")
+	return frozenset(quirks)
+
+def get_handler_name(name:str, profile:frozenset) -> str:
+	"""
+	Get the name of the control unit method that executes an opcode under a profile. The suffixes of the quirks that
+	affect the opcode are added in the order of QUIRKS, e.g. opcodeD_clip_display_wait.
+
+	Parameters
+	----------
+	name : The name of the opcode's method, see chip8_decoder.
+	profile : A set of quirk names, see get_profile.
+	"""
+	handler_name = name
+	for quirk, description in QUIRKS.items():
+		if quirk in profile and name in description["opcodes"]:
+			handler_name += description["suffix"]
+	return handler_name
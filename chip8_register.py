@@ -1,5 +1,6 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+import numpy
 
 class Chip8RegisterInterface(ABC):
 	def __init__(self) -> None:
@@ -43,4 +44,70 @@ class Chip8MemoryRegister(Chip8RegisterInterface):
 		----------
 		value : An integer ranging from 0x0 to 0xFFFF
 		"""
-		self.state = value & 0xFFFF
\ No newline at end of file
+		self.state = value & 0xFFFF
+
+class Chip8RegisterFile:
+	"""
+	All the Chip 8 registers in a compact form: the 16 one byte registers (V0 to VF) share a single bytearray, and
+	the 16 bit memory register (I) is a plain integer.
+	"""
+	def __init__(self) -> None:
+		self.registers = bytearray(16)
+		self.memory_register = 0
+
+	def read(self, register_number:int) -> int:
+		"""
+		Get the value stored in a register.
+
+		Parameters
+		----------
+		register_number : int in the range (0x0,0xF)
+		"""
+		return self.registers[register_number]
+
+	def write(self, register_number:int, value:int|Chip8Register) -> None:
+		"""
+		Store a value in a register. Storing a number larger than 1 byte (0xFF) will result in data loss.
+
+		Parameters
+		----------
+		register_number : int in the range (0x0,0xF)
+		value : An integer or a Chip 8 register.
+		"""
+		if type(value) is Chip8Register:
+			value = value.get_state()
+		self.registers[register_number] = value & 0xFF
+
+	def read_range(self, count:int) -> bytes:
+		"""
+		Get a copy of the values stored in registers V0 to V(count - 1).
+
+		Parameters
+		----------
+		count : int in the range (0x0,0x10)
+		"""
+		return bytes(self.registers[:count])
+
+	def write_range(self, values) -> None:
+		"""
+		Store a sequence of values in the registers, starting at V0. Values larger than 1 byte will result in data loss.
+
+		Parameters
+		----------
+		values : A bytes-like object or a numpy.ndarray with at most 16 elements.
+		"""
+		if isinstance(values, numpy.ndarray):
+			values = (values & 0xFF).astype(numpy.uint8).tobytes()
+		self.registers[:len(values)] = values
+
+	def read_memory_register(self) -> int:
+		"""
+		Get the value stored in the memory register (I).
+		"""
+		return self.memory_register
+
+	def write_memory_register(self, value:int) -> None:
+		"""
+		Store a value in the memory register (I). Attempting to store a value greater than 0xFFFF will result in data loss.
+		"""
+		self.memory_register = value & 0xFFFF
@@ -0,0 +1,80 @@
+from chip8_snapshot import save_state, load_state
+import collections
+import zlib
+import numpy
+
+# Room left at the end of a keyframe, so frames with up to 16 more stack entries can share it
+KEYFRAME_PADDING = 32
+
+class Chip8Rewind:
+	"""
+	Keeps the recent history of a control unit, one snapshot per frame, in a fixed-size ring buffer so the emulation
+	can be stepped backwards. Every keyframe_interval frames a full snapshot (a keyframe) is kept, the frames in
+	between only store the compressed xor of their snapshot against it. A frame rarely changes more than a few bytes
+	of memory and of the framebuffer, so its delta compresses to a few dozen bytes.
+	"""
+	def __init__(self, control_unit, capacity:int=3600, keyframe_interval:int=60) -> None:
+		"""
+		Parameters
+		----------
+		control_unit : The Chip8ControlUnit to capture and restore.
+		capacity : The number of frames kept, the oldest ones are discarded first.
+		keyframe_interval : The number of frames that share a keyframe.
+		"""
+		self.control_unit = control_unit
+		self.keyframe_interval = keyframe_interval
+		# (keyframe, compressed delta) per frame, the most recent last
+		self._frames = collections.deque(maxlen=capacity)
+		self._keyframe = None
+		self._frames_since_keyframe = 0
+
+	def __len__(self) -> int:
+		return len(self._frames)
+
+	def capture(self) -> None:
+		"""
+		Store the current state of the control unit as the most recent frame. Call it once per frame.
+		"""
+		snapshot = numpy.frombuffer(save_state(self.control_unit), dtype=numpy.uint8)
+		# Snapshots grow with the call stack, one longer than the keyframe needs a new keyframe
+		if self._keyframe is None or self._frames_since_keyframe >= self.keyframe_interval or len(snapshot) > len(self._keyframe):
+			self._keyframe = numpy.zeros(shape=len(snapshot) + KEYFRAME_PADDING, dtype=numpy.uint8)
+			self._keyframe[:len(snapshot)] = snapshot
+			self._frames_since_keyframe = 0
+		# The delta is as long as the snapshot
+		self._frames.append((self._keyframe, zlib.compress((snapshot ^ self._keyframe[:len(snapshot)]).tobytes(), 1)))
+		self._frames_since_keyframe += 1
+
+	def step_back(self) -> bool:
+		"""
+		Discard the most recent frame and restore the control unit to the one before it. The oldest frame is never
+		discarded, stepping back from it restores it again.
+
+		Returns
+		-------
+		True if a frame was restored, False if nothing was captured yet.
+		"""
+		if len(self._frames) > 1:
+			self._frames.pop()
+		if not self._frames:
+			return False
+		keyframe, delta = self._frames[-1]
+		delta = numpy.frombuffer(zlib.decompress(delta), dtype=numpy.uint8)
+		load_state(self.control_unit, (delta ^ keyframe[:len(delta)]).tobytes())
+		# The next capture starts a new keyframe, the restored frame's one may be about to leave the buffer
+		self._keyframe = None
+		return True
+
+	def clear(self) -> None:
+		"""
+		Discard every frame.
+		"""
+		self._frames.clear()
+		self._keyframe = None
+
+	def memory_usage(self) -> int:
+		"""
+		Get the number of bytes taken by the stored frames and their keyframes.
+		"""
+		keyframes = {id(keyframe): len(keyframe) for keyframe, delta in self._frames}
+		return sum(keyframes.values()) + sum(len(delta) for keyframe, delta in self._frames)
@@ -0,0 +1,54 @@
+import os
+
+# Programs are loaded at 0x200, the memory below is reserved for the interpreter (and the font)
+PROGRAM_START = 0x200
+MAX_ROM_SIZE = 0x1000 - PROGRAM_START
+
+class Chip8Rom:
+	"""
+	An immutable Chip 8 program. Images opened from a file are read once, and the same file opened twice returns the
+	same image, so any number of control units in a process share it. Each control unit copies the image
+	into its own memory when it loads it, so the program can still modify itself.
+	"""
+	# Images already opened, keyed by the path of their files. Each value is ((modification time, size), image).
+	_opened = {}
+
+	def __init__(self, data:bytes, path:str|None=None) -> None:
+		"""
+		Parameters
+		----------
+		data : The program, at most MAX_ROM_SIZE bytes long.
+		path : The file the program was read from, if any.
+		"""
+		if len(data) > MAX_ROM_SIZE:
+			raise ValueError(f"The program is {len(data)} bytes long, the maximum is {MAX_ROM_SIZE} bytes ({PROGRAM_START:#x} to 0xFFF)")
+		self.path = path
+		self.data = memoryview(data).toreadonly()
+
+	def __len__(self) -> int:
+		return len(self.data)
+
+	@classmethod
+	def open(cls, file_path:str) -> "Chip8Rom":
+		"""
+		Get the image of a Chip 8 (*.ch8) file, reading it the first time it's opened. Programs are at most a few
+		kilobytes, so reading the file is cheaper than mapping it.
+
+		Parameters
+		----------
+		file_path : A string containing the path to the file
+
+		Returns
+		-------
+		The shared Chip8Rom for the file. A file that changed since it was opened is read again.
+		"""
+		file_path = os.path.realpath(file_path)
+		with open(file_path, 'rb') as file:
+			status = os.fstat(file.fileno())
+			version = (status.st_mtime_ns, status.st_size)
+			opened_version, rom = cls._opened.get(file_path, (None, None))
+			if opened_version != version:
+				rom = cls(file.read(), file_path)
+				# Replacing the entry drops the image of the previous version
+				cls._opened[file_path] = (version, rom)
+		return rom
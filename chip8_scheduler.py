@@ -0,0 +1,79 @@
+import time
+
+# The Chip 8 timers always count down at 60 Hz, regardless of the speed of the CPU
+TIMER_FREQUENCY = 60
+# Longest time a single frame can make up for, so a stall (e.g. a dragged window) doesn't cause a burst of instructions
+MAX_FRAME_TIME = 0.25
+
+class Chip8Scheduler:
+	"""
+	Drives a control unit with three independent clocks: the CPU runs a target number of instructions per second,
+	the timers tick at 60 Hz, and the screen is presented once per host frame. All of them are measured against a
+	monotonic clock, so changing the CPU speed doesn't change the timers.
+	"""
+	def __init__(self, control_unit, instructions_per_second:int=500, clock=time.monotonic, recorder=None) -> None:
+		"""
+		Parameters
+		----------
+		control_unit : The Chip8ControlUnit to drive.
+		instructions_per_second : The speed of the CPU.
+		clock : A function that returns the current time in seconds, time.monotonic by default.
+		recorder : An object with a record_frame(keys, instructions, ticks) method called after every frame (see
+		chip8_movie.Chip8Movie), or None.
+		"""
+		self.control_unit = control_unit
+		self.recorder = recorder
+		self.instructions_per_second = instructions_per_second
+		self._clock = clock
+		self._last_time = None
+		# Fractions of an instruction and of a timer tick carried over to the next frame
+		self._instruction_debt = 0.0
+		self._timer_debt = 0.0
+
+	def set_speed(self, instructions_per_second:int) -> None:
+		"""
+		Change the speed of the CPU. The timers are not affected.
+		"""
+		self.instructions_per_second = instructions_per_second
+
+	def restart_clock(self) -> None:
+		"""
+		Forget the time of the previous frame, so the time spent without calling run_frame (e.g. while rewinding)
+		isn't made up for. The next frame only starts the clocks again.
+		"""
+		self._last_time = None
+
+	def run_frame(self) -> int:
+		"""
+		Sample the keys, execute the instructions and timer ticks owed for the time elapsed since the previous frame,
+		then present the screen. The first frame only starts the clocks.
+
+		Returns
+		-------
+		The number of instructions executed.
+		"""
+		now = self._clock()
+		if self._last_time is None:
+			self._last_time = now
+			return 0
+		elapsed = min(now - self._last_time, MAX_FRAME_TIME)
+		self._last_time = now
+		keys = self.control_unit.sample_keys()
+
+		self._instruction_debt += elapsed * self.instructions_per_second
+		instructions = int(self._instruction_debt)
+		self._instruction_debt -= instructions
+		if instructions > 0:
+			# Through the translated blocks, with the same instructions as run(cycles=instructions)
+			self.control_unit.run_blocks(instructions)
+
+		self._timer_debt += elapsed * TIMER_FREQUENCY
+		ticks = int(self._timer_debt)
+		self._timer_debt -= ticks
+		for i in range(ticks):
+			self.control_unit.tick_timers()
+
+		if self.recorder is not None:
+			self.recorder.record_frame(keys, instructions, ticks)
+		self.control_unit.machine.update_screen()
+		return instructions
@@ -1,41 +1,114 @@
-from pygame import SCALED, FULLSCREEN, PixelArray, time
-from pygame.display import init, set_mode, get_surface, get_init, flip
-from pygame.pixelcopy import array_to_surface, surface_to_array
 import numpy
 
 white = 0xFFFFFF
+# Color of a pixel, indexed by its bit in plane 1 | its bit in plane 2 << 1 (XO-CHIP)
+palette = (0x000000, white, 0xAAAAAA, 0x555555)
+
+# Resolutions: the original Chip 8 one, and the SUPER-CHIP high resolution one
+LOW_RESOLUTION = (64, 32)
+HIGH_RESOLUTION = (128, 64)
+PLANE_COUNT = 2
 
 class Chip8Screen:
-	def __init__(self) -> None:
-		self.initialize()
+	def __init__(self, display=None) -> None:
+		self.initialize(display)
+
+	def initialize(self, display=None) -> None:
+		"""
+		Initializes the screen by setting its width, height and an in-memory framebuffer with one bit per pixel: every
+		row is an integer whose most significant bit is the leftmost pixel. There are two planes of rows (XO-CHIP),
+		drawing only affects the selected ones and the Chip 8 opcodes only select the first. The screen doesn't depend
+		on any window, a display (see the chip8_display module) can be attached to present the framebuffer.
+
+		Parameters
+		----------
+		display : An object with a present(screen) method, or None to run headless.
+		"""
+		self.display = display
+		# Bit n is set if plane n + 1 is selected
+		self.plane_mask = 0x1
+		# Number of times the framebuffer was modified
+		self.changes = 0
+		# Array returned by get_state, and the number of changes it was built at
+		self._state = None
+		self._state_changes = None
+		self.set_resolution(*LOW_RESOLUTION)
 
-	def initialize(self) -> None:
+	def set_resolution(self, width:int, height:int) -> None:
 		"""
-		Initializes the screen by setting its width, height, "scaled and fullscreen" flags, storing
-		the surface in aa variable and creaating a pixel array to modify each individual pixel.
+		Change the size of the screen, clearing every plane.
+
+		Parameters
+		----------
+		width : A power of two, at least 16.
+		height : A power of two.
+		"""
+		self.width = width
+		self.height = height
+		self.planes = [[0] * height for plane in range(PLANE_COUNT)]
+		# The first plane, the only one the Chip 8 opcodes use
+		self.rows = self.planes[0]
+		self._row_mask = (0x1 << width) - 1
+		# Region (left, top, right, bottom) changed since the last presentation, None if nothing changed
+		self.dirty_rect = None
+		self.mark_dirty(0, 0, width, height)
+
+	def select_planes(self, plane_mask:int) -> None:
+		"""
+		Select the planes affected by clear, scrolls and draw_sprite.
+
+		Parameters
+		----------
+		plane_mask : Bit n set to select plane n + 1. 0 selects no plane, which makes drawing do nothing.
 		"""
-		self.width = 64
-		self.height = 32
-		init()
-		set_mode(size=(self.width, self.height), flags = SCALED | FULLSCREEN)
-		self.surface = get_surface()
-		self.pixel_array = PixelArray(self.surface)
+		self.plane_mask = plane_mask & ((0x1 << PLANE_COUNT) - 1)
+
+	def _selected_planes(self) -> list:
+		return [plane for index, plane in enumerate(self.planes) if (self.plane_mask >> index) & 0x1]
+
+	def get_selected_plane_count(self) -> int:
+		return bin(self.plane_mask).count("1")
 	
 	def get_init(self) -> bool:
 		"""
-		Get the init state of the pygame display.
+		Get the init state of the screen.
 
 		Returns
 		-------
-		True if the display is initialized, False otherwise.
+		True if the framebuffer is allocated and the attached display (if any) is initialized, False otherwise.
 		"""
-		return get_init()
+		return self.rows is not None and (self.display is None or self.display.get_init())
 	
 	def update(self) -> None:
 		"""
-		Display the pixels inside the surface in the display.
+		Ask the attached display to present the framebuffer. This should be called once per frame, the display decides
+		if it's time to present and uploads only the dirty region. Does nothing when running headless.
+		"""
+		if self.display is not None:
+			self.display.present(self)
+
+	def mark_dirty(self, left:int, top:int, right:int, bottom:int) -> None:
+		"""
+		Add a region to the area that changed since the last presentation. Right and bottom are non-inclusive.
 		"""
-		flip()
+		self.changes += 1
+		if self.dirty_rect is None:
+			self.dirty_rect = (left, top, right, bottom)
+		else:
+			dirty_left, dirty_top, dirty_right, dirty_bottom = self.dirty_rect
+			self.dirty_rect = (min(left, dirty_left), min(top, dirty_top), max(right, dirty_right), max(bottom, dirty_bottom))
+
+	def take_dirty_rect(self) -> tuple|None:
+		"""
+		Get the region that changed since the last call and mark the whole screen as clean.
+
+		Returns
+		-------
+		A tuple (left, top, right, bottom), right and bottom non-inclusive, or None if nothing changed.
+		"""
+		dirty_rect = self.dirty_rect
+		self.dirty_rect = None
+		return dirty_rect
 
 	def set_pixels(self, pixel_array:numpy.ndarray) -> None:
 		"""
@@ -44,30 +117,111 @@ class Chip8Screen:
 
 		Parameters
 		------------
-		pixel_array : A numpy.ndarray of dimensions (64, 32) with the color of each pixel represented 
-		by an integer hexadecimal number 0xNNNNNN.
+		pixel_array : A numpy.ndarray of dimensions (width, height) with the color of each pixel represented
+		by an integer hexadecimal number 0xNNNNNN. Any color other than black turns the pixel on in the first plane.
+		"""
+		if numpy.shape(pixel_array) != (self.width, self.height):
+			raise ValueError(f"Expected an array of dimensions {(self.width, self.height)}, got {numpy.shape(pixel_array)}")
+		self._set_packed_rows(self.rows, numpy.packbits(numpy.not_equal(pixel_array, 0).T, axis=1).tobytes())
+		self.mark_dirty(0, 0, self.width, self.height)
+
+	def get_rows(self, plane:int=0) -> tuple:
+		"""
+		Get a plane of the framebuffer as a tuple of row integers, see initialize. It's hashable, so it can be compared
+		and used as a dictionary key directly.
+		"""
+		return tuple(self.planes[plane])
+
+	def pack(self, plane:int=0) -> bytes:
+		"""
+		Get a plane of the framebuffer with one bit per pixel, row after row, most significant bit first (see unpack).
+		"""
+		row_size = self.width // 8
+		return b"".join(row.to_bytes(row_size, "big") for row in self.planes[plane])
+
+	def unpack(self, data:bytes, plane:int=0) -> None:
+		"""
+		Replace a plane of the framebuffer with one packed by pack, and mark the whole screen as dirty.
+
+		Parameters
+		----------
+		data : width * height / 8 bytes.
+		"""
+		if len(data) * 8 != self.width * self.height:
+			raise ValueError(f"Expected {self.width * self.height // 8} bytes, got {len(data)}")
+		self._set_packed_rows(self.planes[plane], bytes(data))
+		self.mark_dirty(0, 0, self.width, self.height)
+
+	def _set_packed_rows(self, rows:list, data:bytes) -> None:
+		"""
+		Replace every row of a plane with the ones packed in data, see pack.
 		"""
-		array_to_surface(self.surface, pixel_array)
+		row_size = self.width // 8
+		rows[:] = [int.from_bytes(data[i:i + row_size], "big") for i in range(0, len(data), row_size)]
 
 	def clear(self) -> None:
 		"""
-		Sets all pixels of the screen to black.
+		Sets all pixels of the selected planes to black.
 		"""
-		array_to_surface(self.surface, numpy.zeros(shape=(self.width, self.height), dtype=int))
+		for rows in self._selected_planes():
+			rows[:] = [0] * self.height
+		self.mark_dirty(0, 0, self.width, self.height)
+
+	def scroll_down(self, count:int) -> None:
+		"""
+		Move the selected planes down by a number of rows, the rows at the top become black.
+		"""
+		count = min(count, self.height)
+		for rows in self._selected_planes():
+			rows[:] = [0] * count + rows[:self.height - count]
+		self.mark_dirty(0, 0, self.width, self.height)
+
+	def scroll_up(self, count:int) -> None:
+		"""
+		Move the selected planes up by a number of rows, the rows at the bottom become black.
+		"""
+		count = min(count, self.height)
+		for rows in self._selected_planes():
+			rows[:] = rows[count:] + [0] * count
+		self.mark_dirty(0, 0, self.width, self.height)
+
+	def scroll_right(self, count:int) -> None:
+		"""
+		Move the selected planes right by a number of pixels, the columns at the left become black.
+		"""
+		for rows in self._selected_planes():
+			rows[:] = [row >> count for row in rows]
+		self.mark_dirty(0, 0, self.width, self.height)
+
+	def scroll_left(self, count:int) -> None:
+		"""
+		Move the selected planes left by a number of pixels, the columns at the right become black.
+		"""
+		mask = self._row_mask
+		for rows in self._selected_planes():
+			rows[:] = [(row << count) & mask for row in rows]
+		self.mark_dirty(0, 0, self.width, self.height)
 
 	def get_state(self) -> numpy.ndarray:
 		"""
-		Get the current state of the pixels of the screen.
+		Get the current state of the pixels of the screen. The array is only built when the screen changed since the
+		previous call, it's meant for presentation and tests, the framebuffer itself is kept in rows (see get_rows).
 
 		Returns
 		-------
-		A numpy.ndarray of dimensions (64,32) containing the current value of every pixel.
+		A numpy.ndarray of dimensions (width, height) containing the current color of every pixel, see palette.
+		Don't modify it.
 		"""
-		state_array = numpy.ndarray(shape=(self.width, self.height), dtype=int)
-		surface_to_array(state_array, self.surface)
-		return state_array
+		if self._state_changes != self.changes:
+			colors = numpy.zeros(shape=(self.height, self.width), dtype=numpy.uint8)
+			for plane in range(PLANE_COUNT):
+				colors |= numpy.unpackbits(numpy.frombuffer(self.pack(plane), dtype=numpy.uint8)).reshape(self.height, self.width) << plane
+			self._state = numpy.asarray(palette)[colors.T]
+			self._state.flags.writeable = False
+			self._state_changes = self.changes
+		return self._state
 	
-	def draw_sprite(self, sprite:numpy.ndarray, x:int, y:int) -> bool:
+	def draw_sprite(self, sprite:numpy.ndarray, x:int, y:int, sprite_width:int=8, clip:bool=False) -> bool:
 		"""
 		Draw a sprite 8 pixels wide and specifiable height at coordinates (x,y). The pixels of the screen are xor'd with the sprite's pixels,
 		so if the current sprite bit = 1, the screen pixel is toggled. If the sprite's bit = 0, the screen pixel is left unchanged.
@@ -82,6 +236,10 @@ class Chip8Screen:
 		
 		x : Horizontal coordinate where the top left corner of the sprite will be located.
 		y : Vertical coordinate where the top left corner of the sprite will be located.
+		sprite_width : 8, or 16 for the SUPER-CHIP 16x16 sprites, whose rows take 2 elements (most significant first).
+		When several planes are selected (see select_planes), the sprite holds the rows for each one of them in turn.
+		clip : If True, the pixels past the right and bottom edges are discarded instead of wrapping around. The
+		coordinates themselves always wrap around.
 
 		Returns
 		-------
@@ -95,32 +253,51 @@ class Chip8Screen:
 		■ □ ■ □ ■ □ ■ □
 
 		"""
-		# Logic (not bitwise) xor function to toggle screen pixels
-		xor = lambda a,b : (a and not b) or (b and not a)
-
-		state = self.get_state()
-		result_array = numpy.copy(state)
-		screen_pixel_flipped = False
-		for byte in sprite:
-			mask = 0b10000000
-			iteration = 0
-			while mask > 0:
-				# Get a single bit from the sprite's byte
-				bit = byte & mask
-
-				# Bitwise "and" done to wrap out-of-bounds pixels to the other side of the screen.
-				x_index = (x + iteration) & 0x3F
-				y_index = y & 0x1F
-				# Toggle the current screen pixel if the sprite's bit = 1, set to 0 otherwise.
-				result_array[x_index, y_index] = xor(bit, state[x_index, y_index]) and white
+		width = self.width
+		height = self.height
+		x &= width - 1
+		y &= height - 1
+		mask = self._row_mask
+		planes = self._selected_planes()
+		if not planes:
+			return False
+		row_size = sprite_width // 8
+		sprite_height = len(sprite) // (row_size * len(planes))
+		if sprite_height == 0:
+			return False
 
-				# Check if the current screen pixel was toggled from 1 to 0
-				if bit and state[x_index, y_index]:
-					screen_pixel_flipped = True
+		# Each sprite row is placed at the left edge, then rotated right by x so the pixels past the right edge wrap around
+		shift = width - sprite_width
+		collision = 0
+		# Rows past the bottom edge are discarded when clipping
+		drawn_height = min(sprite_height, height - y) if clip else sprite_height
+		for plane, rows in enumerate(planes):
+			offset = plane * sprite_height * row_size
+			for i in range(drawn_height):
+				if row_size == 1:
+					sprite_row = int(sprite[offset]) & 0xFF
+				else:
+					sprite_row = ((int(sprite[offset]) & 0xFF) << 0x8) | (int(sprite[offset + 1]) & 0xFF)
+				offset += row_size
+				sprite_row <<= shift
+				if clip:
+					sprite_row >>= x
+				else:
+					sprite_row = ((sprite_row >> x) | (sprite_row << (width - x))) & mask
+				row = (y + i) & (height - 1)
+				# A screen pixel is toggled from 1 to 0 wherever both the sprite's bit and the pixel are set
+				collision |= rows[row] & sprite_row
+				rows[row] ^= sprite_row
 
-				mask >>= 1
-				iteration += 1
-			y += 1
+		# A sprite that wraps around marks the whole width (or height) of the screen as dirty, a clipped one stops at the edge
+		left = x
+		right = left + sprite_width
+		if right > width:
+			left, right = (left, width) if clip else (0, width)
+		top = y
+		bottom = top + sprite_height
+		if bottom > height:
+			top, bottom = (top, height) if clip else (0, height)
+		self.mark_dirty(left, top, right, bottom)
 
-		array_to_surface(self.surface, result_array)
-		return screen_pixel_flipped
\ No newline at end of file
+		return collision != 0
@@ -0,0 +1,135 @@
+import struct
+import numpy
+
+SNAPSHOT_MAGIC = b"C8SS"
+SNAPSHOT_VERSION = 4
+# Value of the waiting register field when the CPU isn't waiting for a key press
+_NOT_WAITING = 0xFF
+
+# magic, version, program counter, I, delay timer, sound timer, stack depth, screen width, screen height,
+# register waiting for a key press (or the next frame, see DISPLAY_WAIT), last sampled keys, selected screen planes
+_HEADER = struct.Struct("<4sBHHBBHBBBHB")
+# PCG64 state, PCG64 increment, has_uint32, uinteger
+_RANDOM_STATE = struct.Struct("<16s16sBI")
+_REGISTERS_SIZE = 16
+_MEMORY_SIZE = 0x1000
+_FLAGS_SIZE = 16
+_PLANE_COUNT = 2
+
+# Snapshot layout, every part at a fixed offset except the stack, which goes last:
+# header | random state | V0-VF | memory | SUPER-CHIP flags | framebuffer planes (1 bit per pixel, see Chip8Screen.pack) |
+# stack (2 bytes per address)
+_RANDOM_OFFSET = _HEADER.size
+_REGISTERS_OFFSET = _RANDOM_OFFSET + _RANDOM_STATE.size
+_MEMORY_OFFSET = _REGISTERS_OFFSET + _REGISTERS_SIZE
+_FLAGS_OFFSET = _MEMORY_OFFSET + _MEMORY_SIZE
+_SCREEN_OFFSET = _FLAGS_OFFSET + _FLAGS_SIZE
+
+def save_state(control_unit) -> bytes:
+	"""
+	Capture the whole state of a control unit and its machine: memory, registers, I, stack, program counter, both
+	timers, framebuffer (resolution and planes included), SUPER-CHIP flags, random number generator, key press wait
+	(FX0A) and the last sampled keys. The snapshot is a flat binary buffer, built from a few buffer copies, so it's
+	cheap enough to take every frame.
+
+	Parameters
+	----------
+	control_unit : The Chip8ControlUnit to capture.
+
+	Returns
+	-------
+	The snapshot, see load_state.
+	"""
+	machine = control_unit.machine
+	stack = machine.get_stack()
+	random_state = control_unit.random.state
+	return b"".join((
+		_HEADER.pack(
+			SNAPSHOT_MAGIC,
+			SNAPSHOT_VERSION,
+			control_unit.program_counter & 0xFFFF,
+			machine.read_memory_register(),
+			machine.get_remaining_time(),
+			machine.get_remaining_sound_time(),
+			len(stack),
+			machine.get_screen_width(),
+			machine.get_screen_height(),
+			_NOT_WAITING if control_unit.waiting_register is None else control_unit.waiting_register,
+			machine.get_keys(),
+			machine.get_plane_mask()
+		),
+		_RANDOM_STATE.pack(
+			random_state["state"]["state"].to_bytes(16, "little"),
+			random_state["state"]["inc"].to_bytes(16, "little"),
+			random_state["has_uint32"],
+			random_state["uinteger"]
+		),
+		machine.read_registers(_REGISTERS_SIZE),
+		machine.read_memory_range(0x0, _MEMORY_SIZE),
+		machine.read_flags(_FLAGS_SIZE),
+		*(machine.get_packed_screen(plane) for plane in range(_PLANE_COUNT)),
+		numpy.array(stack, dtype="<u2").tobytes()
+	))
+
+def load_state(control_unit, snapshot:bytes) -> None:
+	"""
+	Restore a state captured by save_state into a control unit. The translated blocks are discarded and the whole
+	screen is marked as dirty, so the restored framebuffer is presented on the next frame.
+
+	Parameters
+	----------
+	control_unit : The Chip8ControlUnit to restore, it doesn't need to be the one the snapshot was taken from.
+	snapshot : A buffer returned by save_state.
+	"""
+	snapshot = memoryview(snapshot)
+	magic, version, program_counter, memory_register, timer, sound_timer, stack_depth, width, height, waiting_register, keys, plane_mask = _HEADER.unpack_from(snapshot)
+	if magic != SNAPSHOT_MAGIC:
+		raise ValueError("The buffer isn't a Chip 8 snapshot")
+	if version != SNAPSHOT_VERSION:
+		raise ValueError(f"Unsupported snapshot version {version}, expected {SNAPSHOT_VERSION}")
+
+	machine = control_unit.machine
+	plane_size = width * height // 8
+	stack_offset = _SCREEN_OFFSET + _PLANE_COUNT * plane_size
+	if len(snapshot) != stack_offset + 2 * stack_depth:
+		raise ValueError(f"The snapshot is {len(snapshot)} bytes long, expected {stack_offset + 2 * stack_depth} bytes")
+
+	state, increment, has_uint32, uinteger = _RANDOM_STATE.unpack_from(snapshot, _RANDOM_OFFSET)
+	control_unit.random.state = {
+		"bit_generator": "PCG64",
+		"state": {"state": int.from_bytes(state, "little"), "inc": int.from_bytes(increment, "little")},
+		"has_uint32": has_uint32,
+		"uinteger": uinteger
+	}
+
+	control_unit.program_counter = program_counter
+	control_unit.waiting_register = None if waiting_register == _NOT_WAITING else waiting_register
+	machine.set_keys(keys)
+	machine.write_memory_register(memory_register)
+	machine.set_timer(timer)
+	machine.set_sound_timer(sound_timer)
+	machine.write_registers(snapshot[_REGISTERS_OFFSET:_MEMORY_OFFSET])
+	machine.write_memory(0x0, snapshot[_MEMORY_OFFSET:_FLAGS_OFFSET])
+	machine.write_flags(snapshot[_FLAGS_OFFSET:_SCREEN_OFFSET])
+	if (width, height) != (machine.get_screen_width(), machine.get_screen_height()):
+		machine.set_screen_resolution(width, height)
+	machine.select_planes(plane_mask)
+	for plane in range(_PLANE_COUNT):
+		plane_offset = _SCREEN_OFFSET + plane * plane_size
+		machine.set_packed_screen(snapshot[plane_offset:plane_offset + plane_size], plane)
+	machine.set_stack(numpy.frombuffer(snapshot[stack_offset:], dtype="<u2").tolist())
+	control_unit._translator.clear()
+
+def write_state_file(control_unit, file_path:str) -> None:
+	"""
+	Save the state of a control unit into a file, see save_state.
+	"""
+	with open(file_path, "wb") as file:
+		file.write(save_state(control_unit))
+
+def read_state_file(control_unit, file_path:str) -> None:
+	"""
+	Restore the state of a control unit from a file written by write_state_file.
+	"""
+	with open(file_path, "rb") as file:
+		load_state(control_unit, file.read())
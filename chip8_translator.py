@@ -0,0 +1,179 @@
+from chip8_decoder import OPCODE_NAMES
+from chip8_quirks import get_handler_name
+
+# Opcodes that jump, call, return, skip, wait for a key or exit end a basic block, because the next instruction depends
+# on them. The opcodes that write memory end it too, so a block that modifies itself stops before running stale code.
+BLOCK_TERMINATORS = {
+	"opcode00EE",
+	"opcode00FD",
+	"opcode1",
+	"opcode2",
+	"opcode3",
+	"opcode4",
+	"opcode5",
+	"opcode5_2",
+	"opcode9",
+	"opcodeB",
+	"opcodeE_9E",
+	"opcodeE_A1",
+	"opcodeF_0A",
+	"opcodeF_33",
+	"opcodeF_55",
+	# Quirk variants (see chip8_quirks)
+	"opcodeB_vx",
+	"opcodeD_display_wait",
+	"opcodeD_clip_display_wait",
+	"opcodeF_55_increment",
+	"opcodeF_55_increment_x"
+}
+
+MAX_BLOCK_LENGTH = 64
+
+class Chip8Translator:
+	"""
+	Translates basic blocks (straight runs of instructions) of a control unit's memory into Python functions
+	and caches them by start address, so running a block costs a single call instead of a fetch and a decode
+	per instruction.
+	"""
+	def __init__(self, control_unit) -> None:
+		self.control_unit = control_unit
+		# Start address -> (function, number of instructions)
+		self.blocks = {}
+		# Memory address -> start addresses of the blocks that contain it
+		self.covering_blocks = {}
+		# Static analysis of the loaded program (see chip8_disassembler), only used as hints
+		self.leaders = frozenset()
+		self.hazards = frozenset()
+		# Set while profiling (see Chip8Profiler): every instruction sets the program counter, not only the terminators
+		self.track_program_counter = False
+
+	def set_analysis(self, analysis) -> None:
+		"""
+		Use the static analysis of the loaded program: blocks end where the analysis found another block starting, so
+		entering a block in the middle doesn't translate the same instructions twice, and the instructions the program
+		may modify are interpreted instead of being translated again after every write. The analysis only affects how
+		the program is split, a wrong one (e.g. after the program is replaced) doesn't change the execution.
+
+		Parameters
+		----------
+		analysis : A Chip8Analysis, or None to translate without hints.
+		"""
+		self.leaders = frozenset() if analysis is None else analysis.leaders
+		self.hazards = frozenset() if analysis is None else frozenset(analysis.hazards)
+
+	def execute(self, max_instructions:int|None=None) -> int:
+		"""
+		Execute the block that starts at the control unit's program counter, translating it first if it's not cached.
+		If there's no valid instruction at that address, the control unit executes it on its own.
+
+		Parameters
+		----------
+		max_instructions : The most instructions to execute, a longer block only executes its first instruction.
+		None for no limit.
+
+		Returns
+		-------
+		The number of instructions executed.
+		"""
+		control_unit = self.control_unit
+		block = self.blocks.get(control_unit.program_counter)
+		if block is None:
+			block = self.translate(control_unit.program_counter)
+			if block is None:
+				control_unit.execute_instruction()
+				return 1
+		function, length = block
+		if max_instructions is not None and length > max_instructions:
+			control_unit.execute_instruction()
+			return 1
+		function(control_unit)
+		return length
+
+	def translate(self, address:int) -> tuple|None:
+		"""
+		Translate the block starting at the given address and store it in the cache.
+
+		Parameters
+		----------
+		address : int in the range (0x0,0xFFF)
+
+		Returns
+		-------
+		A tuple (function, number of instructions), or None if the first instruction isn't valid.
+		"""
+		if address in self.hazards:
+			return None
+		dispatch_table = self.control_unit._dispatch_table
+		quirks = self.control_unit.quirks
+		leaders = self.leaders
+		hazards = self.hazards
+		track_program_counter = self.track_program_counter
+		memory = self.control_unit.machine.read_memory_range(address, min(address + 2 * MAX_BLOCK_LENGTH, 0x1000))
+
+		lines = []
+		namespace = {}
+		terminated = False
+		length = 0
+		while length < MAX_BLOCK_LENGTH and 2 * length + 1 < len(memory):
+			if length > 0 and (address + 2 * length in leaders or address + 2 * length in hazards):
+				break
+			code = (int(memory[2 * length]) << 0x8) | int(memory[2 * length + 1])
+			name = OPCODE_NAMES[code]
+			if name is None:
+				break
+
+			handler = f"handler{length}"
+			namespace[handler] = dispatch_table[code]
+			# The name of the variant picked by the quirks profile, the handler itself may be wrapped (see Chip8Profiler)
+			if get_handler_name(name, quirks) in BLOCK_TERMINATORS:
+				# The opcodes that end a block need the program counter pointing at them
+				lines.append(f"\tcontrol_unit.program_counter = {address + 2 * length:#x}")
+				lines.append(f"\t{handler}(control_unit, {code & 0xFFF:#x})")
+				lines.append(f"\tcontrol_unit.program_counter += 0x2")
+				terminated = True
+			else:
+				if track_program_counter:
+					lines.append(f"\tcontrol_unit.program_counter = {address + 2 * length:#x}")
+				lines.append(f"\t{handler}(control_unit, {code & 0xFFF:#x})")
+			length += 1
+			if terminated:
+				break
+
+		if length == 0:
+			return None
+		if not terminated:
+			lines.append(f"\tcontrol_unit.program_counter = {address + 2 * length:#x}")
+
+		source = "def block(control_unit):\n" + "\n".join(lines) + "\n"
+		exec(compile(source, f"<chip8 block {address:#05x}>", "exec"), namespace)
+
+		block = (namespace["block"], length)
+		self.blocks[address] = block
+		for covered_address in range(address, address + 2 * length):
+			self.covering_blocks.setdefault(covered_address, set()).add(address)
+		return block
+
+	def invalidate(self, start:int, finish:int) -> None:
+		"""
+		Remove from the cache every block containing an address in the given range. Start inclusive, finish non-inclusive.
+		Addresses wrap around the end of the memory, like the writes done by Chip8Memory.
+
+		Parameters
+		----------
+		start : int, only its 12 least significant bits are used.
+		finish : int, at most 0x1000 addresses past start.
+		"""
+		for address in range(start, finish):
+			for block_address in self.covering_blocks.pop(address & 0xFFF, ()):
+				function, length = self.blocks.pop(block_address)
+				for covered_address in range(block_address, block_address + 2 * length):
+					covering = self.covering_blocks.get(covered_address)
+					if covering is not None:
+						covering.discard(block_address)
+
+	def clear(self) -> None:
+		"""
+		Remove every block from the cache.
+		"""
+		self.blocks.clear()
+		self.covering_blocks.clear()
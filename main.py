@@ -1,39 +1,74 @@
 from chip8_control_unit import Chip8ControlUnit
+from chip8_display import Chip8Display, Chip8PygameInput
+from chip8_scheduler import Chip8Scheduler
+from chip8_rewind import Chip8Rewind
+from chip8_movie import Chip8Movie
+from chip8_rom import Chip8Rom
+from chip8_quirks import PROFILES
+from chip8_disassembler import analyze_rom
+import argparse
 import pygame
-import keyboard
 
-MIN_FPS = 30
-MAX_FPS  = 1000
+MIN_INSTRUCTIONS_PER_SECOND = 30
+MAX_INSTRUCTIONS_PER_SECOND = 1000
+FRAME_RATE = 60
+# One minute of history
+REWIND_FRAMES = 60 * FRAME_RATE
 
 if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Play a Chip 8 ROM.")
+	parser.add_argument("rom", nargs="?", default="rom.ch8", help="The *.ch8 file to play")
+	parser.add_argument("--record", default=None, help="Record the keys of every frame into this movie file, see chip8_movie.py")
+	parser.add_argument("--cache-dir", default=None, help="Keep the static analysis of the ROM in this directory, so the next launch skips it, see chip8_decode_cache.py")
+	parser.add_argument("--quirks", default="default", choices=PROFILES, help="The platform whose behavior the ROM expects, see chip8_quirks.py")
+	arguments = parser.parse_args()
+
+	rom = Chip8Rom.open(arguments.rom)
 	clock = pygame.time.Clock()
-	chip8vm = Chip8ControlUnit()
-	current_fps = 500
-
-	timer_tick_every_x_cycles = current_fps // 60
-	cycle_counter = 0
-	
-	chip8vm.load_file("rom.ch8")
-
-	while True:
-		chip8vm.execute_instruction()
-		pygame.event.pump()
-
-		if cycle_counter >= timer_tick_every_x_cycles:
-			chip8vm.tick_timers()
-			cycle_counter = 0
-
-			if keyboard.is_pressed("right"):
-				current_fps = min(current_fps + 10, MAX_FPS)
-				timer_tick_every_x_cycles = current_fps // 60
-			if keyboard.is_pressed("left"):
-				current_fps = max(current_fps - 10, MIN_FPS)
-				timer_tick_every_x_cycles = current_fps // 60
-		if keyboard.is_pressed("esc"):
-			break
-		
-		cycle_counter += 1
-		clock.tick(current_fps)
-	
-	pygame.quit()
+	# The scheduler already presents once per frame, the display doesn't need to throttle it
+	display = Chip8Display(refresh_rate=None)
+	movie = None if arguments.record is None else Chip8Movie.record(rom, quirks=arguments.quirks)
+	# The keys are sampled once per frame, the scheduler delivers key presses to a CPU waiting for one (FX0A)
+	chip8vm = Chip8ControlUnit(display, seed=None if movie is None else movie.seed, input_provider=Chip8PygameInput(), quirks=arguments.quirks)
+	instructions_per_second = 500
+	scheduler = Chip8Scheduler(chip8vm, instructions_per_second, recorder=movie)
+	rewind = Chip8Rewind(chip8vm, REWIND_FRAMES)
+
+	# The static analysis tells the translator where the blocks start and which code the ROM modifies
+	if arguments.cache_dir is None:
+		chip8vm.load_rom(rom, analyze_rom(rom))
+	else:
+		chip8vm.load_rom(rom, cache_dir=arguments.cache_dir)
+
+	running = True
+	while running:
+		# The window's events are processed once per frame, every key state of the frame comes from them
+		for event in pygame.event.get():
+			if event.type == pygame.QUIT:
+				running = False
+		pressed = pygame.key.get_pressed()
 
+		# Rewinding would make the recording impossible to replay
+		if movie is None and pressed[pygame.K_BACKSPACE]:
+			# Step one frame back per frame while the key is held
+			rewind.step_back()
+			chip8vm.machine.update_screen()
+			scheduler.restart_clock()
+		else:
+			scheduler.run_frame()
+			rewind.capture()
+
+		if pressed[pygame.K_RIGHT]:
+			instructions_per_second = min(instructions_per_second + 10, MAX_INSTRUCTIONS_PER_SECOND)
+			scheduler.set_speed(instructions_per_second)
+		if pressed[pygame.K_LEFT]:
+			instructions_per_second = max(instructions_per_second - 10, MIN_INSTRUCTIONS_PER_SECOND)
+			scheduler.set_speed(instructions_per_second)
+		if pressed[pygame.K_ESCAPE]:
+			running = False
+
+		clock.tick(FRAME_RATE)
+
+	if movie is not None:
+		movie.save(arguments.record)
+	pygame.quit()
@@ -0,0 +1,98 @@
+import asyncio
+from chip8_async import Chip8Host, Chip8Session, _read_input
+from chip8_control_unit import Chip8ControlUnit
+from chip8_rom import Chip8Rom
+
+# Draw the font character of the key pressed (FX0A) into V0, forever
+ROM = Chip8Rom(bytes.fromhex("F0 0A 00 E0 F0 29 D1 15 12 00"))
+
+def new_control_unit() -> Chip8ControlUnit:
+	chip8vm = Chip8ControlUnit()
+	chip8vm.load_rom(ROM)
+	return chip8vm
+
+def test_sessions_share_the_event_loop():
+	async def scenario():
+		host = Chip8Host()
+		sessions = [host.start(new_control_unit(), instructions_per_second=6000, frames=20) for i in range(5)]
+		# Only a key pressed while FX0A waits ends the wait
+		while any(session.control_unit.waiting_register is None for session in sessions):
+			await asyncio.sleep(0.005)
+		for i, session in enumerate(sessions):
+			session.set_keys(0x1 << (i + 1))
+		await asyncio.gather(*host.sessions.values())
+		return sessions
+
+	sessions = asyncio.run(scenario())
+	for i, session in enumerate(sessions):
+		assert session.frames_run == 20
+		assert session.finished
+		# Every session got its own key press
+		assert session.control_unit.machine.read_register(0x0) == i + 1
+
+def test_frames_follow_the_screen():
+	async def scenario():
+		session = Chip8Session(new_control_unit(), instructions_per_second=6000, frame_rate=200)
+		task = asyncio.create_task(session.run(frames=40))
+		screens = []
+		async def present():
+			async for screen in session.frames():
+				screens.append(screen)
+		async def press():
+			# Only a key pressed while FX0A waits ends the wait
+			while session.control_unit.waiting_register is None:
+				await asyncio.sleep(0.005)
+			session.set_keys(0x4)
+		await asyncio.gather(task, present(), press())
+		return session, screens
+
+	session, screens = asyncio.run(scenario())
+	# The blank screen, then the key's character
+	assert len(screens) >= 2
+	assert screens[0] == bytes(256)
+	assert screens[-1] == session.control_unit.machine.get_packed_screen()
+	assert screens[-1] != bytes(256)
+
+def test_server():
+	async def scenario():
+		host = Chip8Host()
+		server = await host.serve(ROM, instructions_per_second=6000)
+		port = server.sockets[0].getsockname()[1]
+		reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+		first = await asyncio.wait_for(reader.readline(), timeout=5)
+		# Wait for the session to reach the FX0A
+		session = next(iter(host.sessions))
+		while session.control_unit.waiting_register is None:
+			await asyncio.sleep(0.005)
+		writer.write(b"keys 0008\n")
+		await writer.drain()
+		second = await asyncio.wait_for(reader.readline(), timeout=5)
+		sessions = len(host.sessions)
+
+		writer.write(b"quit\n")
+		await writer.drain()
+		await asyncio.wait_for(reader.read(), timeout=5)
+		writer.close()
+		server.close()
+		await server.wait_closed()
+		return first, second, sessions, len(host.sessions)
+
+	first, second, sessions, remaining = asyncio.run(scenario())
+	assert first == b"frame " + bytes(256).hex().encode("ascii") + b"\n"
+	assert second.startswith(b"frame ") and second != first
+	assert sessions == 1
+	assert remaining == 0
+
+def test_input_skips_blank_lines():
+	async def scenario():
+		session = Chip8Session(new_control_unit(), instructions_per_second=6000)
+		reader = asyncio.StreamReader()
+		reader.feed_data(b"\n  \nkeys 0010\n\nquit\nkeys 0001\n")
+		reader.feed_eof()
+		await asyncio.wait_for(_read_input(session, reader), timeout=5)
+		return session
+
+	session = asyncio.run(scenario())
+	# The keys before the quit are applied, the ones after it aren't
+	assert session.input.keys == 0x0010
@@ -0,0 +1,82 @@
+import pytest
+import numpy
+from chip8_batch import Chip8BatchMachine
+from chip8_control_unit import Chip8ControlUnit
+
+TEST_SIZE = 6
+
+# A program that exercises most opcodes, and branches on the value of V3 (different for every machine)
+program = bytes.fromhex(
+	"60 05 61 0A F0 29 D0 15 "	# 0x200: V0=5, V1=10, I=font(V0), draw it at (V0,V1)
+	"22 22 80 14 A4 00 F2 33 "	# 0x208: call 0x222, V0+=V1, I=0x400, BCD of V2 at I
+	"F2 65 33 02 D0 15 84 36 "	# 0x210: load V0..V2, skip if V3==2 else draw, V4=V3>>1
+	"85 3E 86 37 A5 00 F6 55 "	# 0x218: V5=V3<<1, V6-=V3, I=0x500, store V0..V6
+	"12 20 "					# 0x220: loop forever
+	"62 FF 82 34 87 35 88 30 "	# 0x222: V2=0xFF, V2+=V3, V7-=V3, V8=V3
+	"89 81 8A 82 8B 83 00 EE"	# 0x22A: V9|=V8, VA&=V8, VB^=V8, return
+)
+
+@pytest.fixture
+def batch():
+	batch = Chip8BatchMachine(TEST_SIZE, seed=0)
+	batch.load_rom(program)
+	batch.registers[:, 3] = numpy.arange(TEST_SIZE)
+	return batch
+
+def test_batch_matches_control_unit(batch):
+	control_units = []
+	for i in range(TEST_SIZE):
+		chip8vm = Chip8ControlUnit()
+		chip8vm.machine.write_memory(0x200, program)
+		chip8vm.machine.write_register(3, i)
+		control_units.append(chip8vm)
+
+	for step in range(40):
+		batch.step()
+		for chip8vm in control_units:
+			chip8vm.execute_instruction()
+
+		for i, chip8vm in enumerate(control_units):
+			assert batch.program_counter[i] == chip8vm.program_counter
+			assert bytes(batch.registers[i]) == chip8vm.machine.read_registers(16)
+			assert batch.memory_register[i] == chip8vm.machine.read_memory_register()
+			assert numpy.array_equal(batch.screens[i].T, chip8vm.machine.get_screen_state() != 0)
+
+	for i, chip8vm in enumerate(control_units):
+		assert bytes(batch.memory[i]) == bytes(chip8vm.machine.read_memory_range(0x0, 0x1000))
+
+def test_invalid_opcode_halts_only_its_machine(batch):
+	# Machine 0 runs into an invalid opcode, the rest keep running
+	batch.memory[0, 0x200:0x202] = [0x80, 0x08]
+	batch.run(3)
+	assert batch.halted[0] and not batch.halted[1:].any()
+	assert batch.program_counter[0] == 0x200
+	assert batch.cycles[0] == 1 and batch.cycles[1] == 3
+
+def test_5xyn_halts_unless_n_is_0(batch):
+	# Machine 1 runs into a 5XY2, machine 2 into a 5XY1, the rest skip on V0 == V1 (both 5)
+	batch.memory[:, 0x200:0x206] = [0x60, 0x05, 0x61, 0x05, 0x50, 0x10]
+	batch.memory[1, 0x204:0x206] = [0x50, 0x12]
+	batch.memory[2, 0x204:0x206] = [0x50, 0x11]
+	batch.run(3)
+	assert list(batch.halted) == [False, True, True, False, False, False]
+	assert list(batch.program_counter) == [0x208, 0x204, 0x204, 0x208, 0x208, 0x208]
+
+def test_wait_for_key(batch):
+	# FX0A at the start of every program
+	batch.memory[:, 0x200:0x202] = [0xF7, 0x0A]
+	batch.run(5)
+	assert (batch.program_counter == 0x200).all()
+
+	keys = numpy.zeros(shape=(TEST_SIZE, 16), dtype=bool)
+	keys[1, 0xB] = True
+	batch.set_keys(keys)
+	batch.step()
+	assert batch.registers[1, 7] == 0xB
+	assert batch.program_counter[1] == 0x204
+	assert (batch.program_counter[2:] == 0x200).all()
+
+def test_timers(batch):
+	batch.timer[:] = [0, 1, 2, 3, 4, 5]
+	batch.tick_timers()
+	assert list(batch.timer) == [0, 0, 1, 2, 3, 4]
@@ -0,0 +1,26 @@
+import json
+from chip8_benchmark import run_benchmarks, SYNTHETIC_PROGRAMS
+
+TEST_CYCLES = 500
+
+def test_run_benchmarks(tmp_path):
+	(tmp_path / "loop.ch8").write_bytes(bytes.fromhex("70 01 12 00"))
+	report = run_benchmarks(TEST_CYCLES, [str(tmp_path)])
+
+	names = [result["name"] for result in report["benchmarks"]]
+	assert names == list(SYNTHETIC_PROGRAMS) + ["loop.ch8"]
+	for result in report["benchmarks"]:
+		assert result["instructions_per_second"] > 0
+		assert result["block_instructions_per_second"] > 0
+		assert result["frame_time"]["mean_ms"] <= result["frame_time"]["max_ms"]
+		assert sum(opcode["count"] for opcode in result["opcodes"].values()) == TEST_CYCLES
+
+	# Every mix exercises the opcodes it's named after
+	opcodes = {result["name"]: result["opcodes"] for result in report["benchmarks"]}
+	assert "opcode8_4" in opcodes["alu"]
+	assert "opcodeD" in opcodes["sprites"]
+	assert "opcodeF_55" in opcodes["memory"] and "opcodeF_65" in opcodes["memory"]
+	assert "opcode2" in opcodes["calls"] and "opcode00EE" in opcodes["calls"]
+
+	# The report can be serialized
+	json.dumps(report)
@@ -1,4 +1,5 @@
 from chip8_machine import Chip8Machine
+from chip8_register import Chip8Register
 import pytest
 import numpy
 
@@ -53,6 +54,12 @@ def test_read_write_registers():
 		machine.write_register(i, number)
 		assert machine.read_register(i) == number
 
+def test_write_register_from_register():
+	register = Chip8Register()
+	register.set(0x5C)
+	machine.write_register(0x7, register)
+	assert machine.read_register(0x7) == 0x5C
+
 def test_read_write_memory_register():
 	number = numpy.random.randint(0, 0xFFF)
 	machine.write_memory_register(number)
@@ -341,3 +341,283 @@ def test_math_opcodes():
 	assert chip8vm.machine.read_register(0xF) == 0x1
 
 
+
+def test_dispatch_table():
+	chip8vm = Chip8ControlUnit()
+
+	# Every code of a category without mask goes to the same opcode, and the others are decoded with the mask
+	assert chip8vm._dispatch_table[0x1ABC] is Chip8ControlUnit.opcode1
+	assert chip8vm._dispatch_table[0x8AB4] is Chip8ControlUnit.opcode8_4
+	assert chip8vm._dispatch_table[0xF365] is Chip8ControlUnit.opcodeF_65
+
+	# The table is shared by all instances
+	assert Chip8ControlUnit()._dispatch_table is chip8vm._dispatch_table
+
+	# Codes that don't exist can't be executed
+	with pytest.raises(KeyError):
+		chip8vm.decode_and_execute(0x8AB8)
+
+def test_execute_block():
+	program = bytes.fromhex("60 00 70 01 71 02 30 0A 12 02 12 0A")
+
+	# Run the loop with the interpreter and with the translated blocks, until it reaches the last jump at 0x20A
+	interpreted = Chip8ControlUnit()
+	interpreted.machine.write_memory(0x200, numpy.frombuffer(program, dtype='B'))
+	while interpreted.program_counter != 0x20A:
+		interpreted.execute_instruction()
+
+	translated = Chip8ControlUnit()
+	translated.machine.write_memory(0x200, numpy.frombuffer(program, dtype='B'))
+	executed = 0
+	while translated.program_counter != 0x20A:
+		executed += translated.execute_block()
+
+	# V0=0, then ten iterations of (V0+=1, V1+=2, skip), the jump back is skipped on the last one
+	assert executed == 1 + 4 * 10 - 1
+	assert translated.machine.read_register(0) == interpreted.machine.read_register(0) == 10
+	assert translated.machine.read_register(1) == interpreted.machine.read_register(1) == 20
+
+def test_execute_block_self_modifying_code():
+	chip8vm = Chip8ControlUnit()
+	# V0=5, then jump back to the start
+	chip8vm.machine.write_memory(0x300, numpy.array([0x60, 0x05, 0x13, 0x00]))
+	chip8vm.program_counter = 0x300
+	assert chip8vm.execute_block() == 2
+	assert chip8vm.machine.read_register(0) == 5
+	assert chip8vm.program_counter == 0x300
+
+	# Overwrite the first instruction with V0=7 using FX55
+	chip8vm.decode_and_execute(0x6060)
+	chip8vm.decode_and_execute(0x6107)
+	chip8vm.decode_and_execute(0xA300)
+	chip8vm.decode_and_execute(0xF155)
+	chip8vm.program_counter = 0x300
+	chip8vm.execute_block()
+	assert chip8vm.machine.read_register(0) == 7
+
+def test_draw_doesnt_present():
+	class RecordingDisplay:
+		def __init__(self):
+			self.presented = 0
+
+		def get_init(self):
+			return True
+
+		def present(self, screen):
+			self.presented += 1
+
+	display = RecordingDisplay()
+	chip8vm = Chip8ControlUnit(display)
+
+	# Draw the font character 0 several times in the same frame
+	for i in range(5):
+		chip8vm.decode_and_execute(0xD015)
+	assert display.presented == 0
+
+	# The frame is presented once, when the machine is told the frame is over
+	chip8vm.machine.update_screen()
+	assert display.presented == 1
+
+def test_run():
+	from chip8_control_unit import pc_reaches, register_matches, display_idle
+
+	chip8vm = Chip8ControlUnit()
+	# 0x200: V0 += 1, 0x202: V1 += 2, 0x204: draw font character 0 at (V2,V2), 0x206: leave the loop if V0 == 3,
+	# 0x208: jump to 0x200, 0x20A: loop forever
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("70 01 71 02 D2 25 30 03 12 00 12 0A"))
+
+	with pytest.raises(ValueError):
+		chip8vm.run()
+
+	assert chip8vm.run(cycles=3) == 3
+	assert chip8vm.program_counter == 0x206
+
+	# Stop at the jump
+	assert chip8vm.run(until=pc_reaches(0x208)) == 1
+	assert chip8vm.run(until=pc_reaches(0x208)) == 0
+	# The cycle budget wins over an address that's never reached
+	assert chip8vm.run(cycles=2, until=pc_reaches(0x300)) == 2
+
+	# Stop when V1 gets to 4
+	chip8vm.run(until=register_matches(0x1, lambda value: value >= 4))
+	assert chip8vm.machine.read_register(0x1) == 4
+
+	# Once the loop is over nothing is drawn anymore
+	chip8vm.run(until=display_idle(20))
+	assert chip8vm.program_counter == 0x20A
+	assert chip8vm.machine.read_register(0x0) == 3
+
+def test_codeF_65_wraps_around():
+	chip8vm = Chip8ControlUnit()
+	chip8vm.machine.write_memory(0xFFE, bytes([0x1, 0x2]))
+	chip8vm.machine.write_memory(0x0, bytes([0x3, 0x4]))
+
+	# I = 0xFFE, load V0..V3
+	chip8vm.decode_and_execute(0xAFFE)
+	chip8vm.decode_and_execute(0xF365)
+	assert chip8vm.machine.read_registers(4) == bytes([0x1, 0x2, 0x3, 0x4])
+
+	# I = 0x1000 (reachable with FX1E) reads from address 0x0
+	chip8vm.machine.write_memory_register(0x1000)
+	chip8vm.decode_and_execute(0xF165)
+	assert chip8vm.machine.read_registers(2) == bytes([0x3, 0x4])
+
+def test_execute_block_invalidation_wraps_around():
+	chip8vm = Chip8ControlUnit()
+	# V0=5, then jump back to the start, at address 0x0
+	chip8vm.machine.write_memory(0x0, numpy.array([0x60, 0x05, 0x10, 0x00]))
+	chip8vm.program_counter = 0x0
+	chip8vm.execute_block()
+	assert chip8vm.machine.read_register(0) == 5
+
+	# I = 0x1000 writes to address 0x0
+	chip8vm.decode_and_execute(0x6060)
+	chip8vm.decode_and_execute(0x6107)
+	chip8vm.machine.write_memory_register(0x1000)
+	chip8vm.decode_and_execute(0xF155)
+	chip8vm.program_counter = 0x0
+	chip8vm.execute_block()
+	assert chip8vm.machine.read_register(0) == 7
+
+def test_codeF_0A_waits_without_blocking():
+	chip8vm = Chip8ControlUnit()
+	# 0x200: wait for a key into V3, 0x202: V0 += 1, 0x204: jump to 0x202
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("F3 0A 70 01 12 02"))
+
+	# The CPU parks on the FX0A
+	assert chip8vm.run(cycles=100) == 1
+	assert chip8vm.waiting_register == 0x3
+	assert chip8vm.program_counter == 0x200
+	assert chip8vm.run(cycles=100) == 0
+	assert chip8vm.execute_block() == 0
+
+	# The timers keep going
+	chip8vm.machine.set_timer(0x10)
+	chip8vm.tick_timers()
+	assert chip8vm.machine.get_remaining_time() == 0xF
+
+	assert chip8vm.press_key(0xB)
+	assert chip8vm.waiting_register is None
+	assert chip8vm.machine.read_register(0x3) == 0xB
+	assert chip8vm.program_counter == 0x202
+	assert not chip8vm.press_key(0xC)
+	assert chip8vm.run(cycles=10) == 10
+
+def test_key_opcodes_read_the_sampled_keys():
+	class ScriptedInput:
+		def get_keys(self):
+			return 0x8001
+
+	# Headless, no key is ever pressed
+	chip8vm = Chip8ControlUnit()
+	chip8vm.machine.write_register(0x2, 0xF)
+	chip8vm.decode_and_execute(0xE29E)
+	assert chip8vm.program_counter == 0x202
+	chip8vm.decode_and_execute(0xE2A1)
+	assert chip8vm.program_counter == 0x206
+
+	chip8vm = Chip8ControlUnit(input_provider=ScriptedInput())
+	chip8vm.machine.write_register(0x2, 0xF)
+	chip8vm.machine.write_register(0x3, 0x0)
+	# The keys don't change until they are sampled
+	chip8vm.decode_and_execute(0xE29E)
+	assert chip8vm.program_counter == 0x202
+	chip8vm.sample_keys()
+	chip8vm.decode_and_execute(0xE29E)
+	assert chip8vm.program_counter == 0x206
+	chip8vm.decode_and_execute(0xE3A1)
+	assert chip8vm.program_counter == 0x208
+	chip8vm.decode_and_execute(0xE2A1)
+	assert chip8vm.program_counter == 0x20A
+
+def test_super_chip_opcodes():
+	chip8vm = Chip8ControlUnit()
+	machine = chip8vm.machine
+
+	# 00FF / 00FE switch the resolution
+	chip8vm.decode_and_execute(0x00FF)
+	assert (machine.get_screen_width(), machine.get_screen_height()) == (128, 64)
+
+	# DXY0 draws the 16x16 sprite at I
+	machine.write_memory(0x300, bytes([0xFF, 0xFF] * 16))
+	chip8vm.decode_and_execute(0xA300)
+	chip8vm.decode_and_execute(0x6070)
+	chip8vm.decode_and_execute(0x6120)
+	chip8vm.decode_and_execute(0xD010)
+	state = machine.get_screen_state()
+	assert numpy.all(state[0x70:0x80, 0x20:0x30] == white)
+	assert machine.read_register(0xF) == 0x0
+
+	# 00CN scrolls down, 00FC left
+	chip8vm.decode_and_execute(0x00C2)
+	chip8vm.decode_and_execute(0x00FC)
+	state = machine.get_screen_state()
+	assert numpy.all(state[0x6C:0x7C, 0x22:0x32] == white)
+	assert numpy.count_nonzero(state) == 256
+
+	chip8vm.decode_and_execute(0x00FE)
+	assert (machine.get_screen_width(), machine.get_screen_height()) == (64, 32)
+
+	# FX30 points I at the big digit of Vx
+	chip8vm.decode_and_execute(0x6008)
+	chip8vm.decode_and_execute(0xF030)
+	assert bytes(machine.read_memory_block(machine.read_memory_register(), 10)) == bytes([0x3C, 0x7E, 0xC3, 0xC3, 0x7E, 0x7E, 0xC3, 0xC3, 0x7E, 0x3C])
+
+	# FX75 / FX85 keep V0-Vx in the flags
+	machine.write_registers(bytes([1, 2, 3, 4]))
+	chip8vm.decode_and_execute(0xF375)
+	machine.write_registers(bytes(4))
+	chip8vm.decode_and_execute(0xF285)
+	assert machine.read_registers(4) == bytes([1, 2, 3, 0])
+
+	# 00FD stays on itself
+	chip8vm.program_counter = 0x200
+	machine.write_memory(0x200, bytes.fromhex("00 FD"))
+	chip8vm.run(cycles=10)
+	assert chip8vm.program_counter == 0x200
+
+def test_xo_chip_opcodes():
+	chip8vm = Chip8ControlUnit()
+	machine = chip8vm.machine
+	machine.write_registers(bytes(range(0x10, 0x20)))
+
+	# 5XY2 stores Vx-Vy at I without moving I, 5XY3 loads them back, backwards if x > y
+	chip8vm.decode_and_execute(0xA300)
+	chip8vm.decode_and_execute(0x5242)
+	assert bytes(machine.read_memory_block(0x300, 3)) == bytes([0x12, 0x13, 0x14])
+	assert machine.read_memory_register() == 0x300
+	chip8vm.decode_and_execute(0x5973)
+	assert machine.read_registers(16)[7:10] == bytes([0x14, 0x13, 0x12])
+
+	# F201 selects the second plane
+	chip8vm.decode_and_execute(0xF201)
+	machine.write_memory(0x300, bytes([0x80]))
+	chip8vm.decode_and_execute(0x6000)
+	chip8vm.decode_and_execute(0xD001)
+	assert machine.get_screen_rows(0)[0] == 0x0
+	assert machine.get_screen_rows(1)[0] == 0x8000000000000000
+
+def test_run_blocks_matches_run():
+	# Random values, a subroutine that stores them over its own code, skips, a draw and a loop
+	program = bytes.fromhex("C0 FF C1 07 22 0C 31 03 D0 15 12 00 A2 1A F1 55 71 01 00 EE 00 00 00 00 00 00")
+	units = []
+	for run in ("run", "run_blocks"):
+		chip8vm = Chip8ControlUnit(seed=3)
+		chip8vm.machine.write_memory(0x200, program)
+		for budget in (1, 7, 64, 100, 3):
+			if run == "run":
+				assert chip8vm.run(cycles=budget) == budget
+			else:
+				assert chip8vm.run_blocks(budget) == budget
+		units.append(chip8vm)
+	plain, translated = units
+	assert translated.program_counter == plain.program_counter
+	assert translated.machine.read_registers(16) == plain.machine.read_registers(16)
+	assert bytes(translated.machine.read_memory_range(0x0, 0x1000)) == bytes(plain.machine.read_memory_range(0x0, 0x1000))
+	assert translated.machine.get_packed_screen() == plain.machine.get_packed_screen()
+
+	# A CPU waiting for a key stops the budget early
+	chip8vm = Chip8ControlUnit()
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("70 01 F3 0A"))
+	assert chip8vm.run_blocks(10) == 2
+	assert chip8vm.run_blocks(10) == 0
@@ -0,0 +1,57 @@
+import os
+from chip8_control_unit import Chip8ControlUnit
+from chip8_decode_cache import Chip8CachedAnalysis, load_analysis, get_cache_path
+from chip8_disassembler import analyze_rom
+from chip8_rom import Chip8Rom
+
+# Clear, draw the sprite at 0x20E, store V0 over the store itself (with the same value), loop, sprite
+ROM = Chip8Rom(bytes.fromhex("00E0 60F0 A20E D015 A20A F055 1206 F090F090F0".replace(" ", "")))
+
+def test_analyze():
+	cached = Chip8CachedAnalysis.analyze(ROM)
+	analysis = analyze_rom(ROM)
+	assert cached.leaders == analysis.leaders
+	assert cached.hazards == analysis.hazards == {0x20A}
+	assert cached.references == {0x20E, 0x20A}
+
+	restored = Chip8CachedAnalysis.from_buffer(cached.to_bytes())
+	assert (restored.rom_hash, restored.leaders, restored.hazards, restored.subroutines, restored.references, restored.unknown_writes) == \
+		(cached.rom_hash, cached.leaders, cached.hazards, cached.subroutines, cached.references, cached.unknown_writes)
+
+def test_cache_file(tmp_path, monkeypatch):
+	cache_dir = str(tmp_path / "cache")
+	analysis = load_analysis(ROM, cache_dir)
+	path = get_cache_path(cache_dir, ROM)
+	assert os.listdir(cache_dir) == [os.path.basename(path)]
+
+	# The next load reads the file instead of analyzing again
+	def analyze(rom):
+		raise AssertionError("The ROM was analyzed again")
+	with monkeypatch.context() as patch:
+		patch.setattr(Chip8CachedAnalysis, "analyze", analyze)
+		cached = load_analysis(ROM, cache_dir)
+	assert (cached.leaders, cached.hazards) == (analysis.leaders, analysis.hazards)
+
+	# Damaged files are written again
+	with open(path, "wb") as file:
+		file.write(b"C8DC")
+	assert load_analysis(ROM, cache_dir).leaders == analysis.leaders
+	with open(path, "rb") as file:
+		assert Chip8CachedAnalysis.from_buffer(file.read()).hazards == analysis.hazards
+
+def test_load_with_cache(tmp_path):
+	rom_path = str(tmp_path / "program.ch8")
+	with open(rom_path, "wb") as file:
+		file.write(bytes(ROM.data))
+	cache_dir = str(tmp_path / "cache")
+
+	cached = Chip8ControlUnit()
+	cached.load_file(rom_path, cache_dir=cache_dir)
+	plain = Chip8ControlUnit()
+	plain.load_file(rom_path)
+	assert cached._translator.hazards == {0x20A}
+	for chip8vm in (cached, plain):
+		for i in range(10):
+			chip8vm.execute_block()
+	assert cached.machine.get_packed_screen() == plain.machine.get_packed_screen()
+	assert cached.program_counter == plain.program_counter
@@ -0,0 +1,59 @@
+from chip8_control_unit import Chip8ControlUnit
+from chip8_disassembler import analyze_rom, disassemble_instruction, Chip8Analysis
+from chip8_rom import Chip8Rom
+
+# 0x200: clear, call 0x20A, draw the sprite at 0x212 forever
+# 0x20A: subroutine that writes over the first byte of its own return (0x210), with the same value
+# 0x212: sprite
+ROM = Chip8Rom(bytes.fromhex("00E0 220A A212 D015 1206 A210 6000 F055 00EE F090F090F0".replace(" ", "")))
+
+def test_disassemble_instruction():
+	assert disassemble_instruction(0x00E0) == "CLS"
+	assert disassemble_instruction(0xD125) == "DRW V1, V2, 5"
+	assert disassemble_instruction(0x8AB6) == "SHR VA, VB"
+	assert disassemble_instruction(0xA21F) == "LD I, 0x21f"
+	assert disassemble_instruction(0x0000) == "DW 0x0000"
+
+def test_analysis():
+	analysis = Chip8Analysis(ROM)
+	assert sorted(analysis.instructions) == list(range(0x200, 0x212, 2))
+	assert analysis.subroutines == {0x20A}
+	assert analysis.get_data_ranges() == [(0x212, 0x217)]
+
+	assert sorted(analysis.blocks) == [0x200, 0x204, 0x206, 0x20A, 0x210]
+	assert analysis.blocks[0x200].successors == (0x20A, 0x204)
+	assert len(analysis.blocks[0x206]) == 2
+	assert analysis.blocks[0x206].successors == (0x206,)
+	assert analysis.blocks[0x210].successors == ()
+
+	# The subroutine writes over its own return
+	assert analysis.hazards == {0x210}
+	assert analysis.unknown_writes == set()
+
+	listing = analysis.to_listing(ROM)
+	assert "block_20a: (subroutine) ; 3 instructions -> 0x210" in listing
+	assert "0x210  00EE  RET  ; modified by the program" in listing
+	assert "0x212  F0    ####....  DB 0xf0" in listing
+	assert "b200 -> b20a;" in analysis.to_dot()
+
+def test_analysis_is_cached():
+	assert analyze_rom(ROM) is analyze_rom(Chip8Rom(bytes(ROM.data)))
+
+def test_translator_uses_the_analysis():
+	plain = Chip8ControlUnit()
+	plain.load_rom(ROM)
+	hinted = Chip8ControlUnit()
+	hinted.load_rom(ROM, analyze_rom(ROM))
+
+	for chip8vm in (plain, hinted):
+		for i in range(4):
+			chip8vm.execute_block()
+	# Same execution
+	assert hinted.program_counter == plain.program_counter == 0x206
+
+	# The modified return is interpreted instead of translated
+	assert 0x210 not in hinted._translator.blocks
+	assert 0x210 in plain._translator.blocks
+	# Blocks end where the analysis found another one starting
+	assert hinted._translator.blocks[0x204][1] == 1
+	assert plain._translator.blocks[0x204][1] == 3
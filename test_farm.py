@@ -0,0 +1,44 @@
+import pytest
+from chip8_farm import run_farm, run_rom, screen_hash, find_roms, STATUS_FINISHED, STATUS_ERROR, STATUS_WAITING
+
+TEST_CYCLES = 200
+
+@pytest.fixture
+def rom_directory(tmp_path):
+	# Draw a random font character at a random position, forever
+	(tmp_path / "random.ch8").write_bytes(bytes.fromhex("C0 0F F0 29 C1 3F C2 1F D1 25 12 00"))
+	# Count in V0 until an invalid opcode is reached
+	(tmp_path / "invalid.ch8").write_bytes(bytes.fromhex("70 01 70 01 80 08"))
+	(tmp_path / "notes.txt").write_text("Not a ROM")
+	return tmp_path
+
+def test_find_roms(rom_directory):
+	assert find_roms(str(rom_directory)) == [str(rom_directory / "invalid.ch8"), str(rom_directory / "random.ch8")]
+
+def test_run_farm(rom_directory):
+	roms = find_roms(str(rom_directory))
+	jobs, results = run_farm(roms, TEST_CYCLES, seeds=[0, 1], processes=2)
+
+	assert jobs == [(roms[0], 0), (roms[0], 1), (roms[1], 0), (roms[1], 1)]
+	# The invalid opcode stops the job
+	assert results[0]["status"] == STATUS_ERROR
+	assert results[0]["cycles"] == 2
+	assert results[0]["registers"][0] == 2
+
+	# The results match the ones of a job run in this process
+	for (file_path, seed), result in zip(jobs[2:], results[2:]):
+		status, cycles, chip8vm = run_rom(file_path, seed, TEST_CYCLES, 8)
+		assert result["status"] == status == STATUS_FINISHED
+		assert result["cycles"] == cycles == TEST_CYCLES
+		assert bytes(result["registers"]) == chip8vm.machine.read_registers(16)
+		assert bytes(result["screen_hash"]) == screen_hash(chip8vm)
+
+def test_run_rom_waiting(tmp_path):
+	# Count in V0, then wait for a key press that never comes
+	(tmp_path / "waiting.ch8").write_bytes(bytes.fromhex("70 01 70 01 70 01 F1 0A"))
+	status, cycles, chip8vm = run_rom(str(tmp_path / "waiting.ch8"), 0, TEST_CYCLES, 8)
+	assert status == STATUS_WAITING
+	# The FX0A that starts the wait is executed
+	assert cycles == 4
+	assert chip8vm.waiting_register == 0x1
+	assert chip8vm.machine.read_register(0x0) == 3
@@ -1,9 +1,9 @@
 import pytest
 import keyboard
 import time
-from chip8_keyboard import Chip8Keyboard
+from chip8_keyboard import Chip8Keyboard, Chip8LiveInput
 
-chip8_keyboard = Chip8Keyboard()
+chip8_keyboard = Chip8Keyboard(Chip8LiveInput())
 
 @pytest.fixture
 def valid_inputs():
@@ -55,14 +55,16 @@ def hex_to_str():
 def test_check_if_key_is_pressed(valid_inputs, str_to_hex):
 	for input in valid_inputs:
 		keyboard.wait(input)
+		chip8_keyboard.sample()
 		assert chip8_keyboard.is_key_pressed(str_to_hex[input]) == True
 	
 	time.sleep(1)
 
+	chip8_keyboard.sample()
 	for input in valid_inputs:
 		assert chip8_keyboard.is_key_pressed(str_to_hex[input]) == False
 		
 def test_wait_for_input():
-    input = chip8_keyboard.wait_for_input()
+    input = Chip8Keyboard().wait_for_input()
     assert input >= 0 and input <= 0xF
 	
\ No newline at end of file
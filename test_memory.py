@@ -62,4 +62,28 @@ def test_read_range():
 	values = numpy.random.randint(0x0, 0xFF, size=1000)
 	memory.write(start_address, values)
 	range = memory.read_range(start_address, start_address + len(values))
-	assert numpy.array_equal(values, range)
\ No newline at end of file
+	assert numpy.array_equal(values, range)
+
+def test_memory_footprint():
+	# One byte per cell, and reads return native integers
+	assert len(memory.memory) == 0x1000
+	memory.write(0x10, 0xAB)
+	assert type(memory.read(0x10)) is int
+
+def test_read_range_is_not_a_copy():
+	memory.write(0x20, bytes([0x1, 0x2, 0x3]))
+	view = memory.read_range(0x20, 0x23)
+	memory.write(0x21, 0xFF)
+	assert bytes(view) == bytes([0x1, 0xFF, 0x3])
+
+def test_insert_array_wraps_around():
+	memory.write(0xFFE, numpy.array([0x1, 0x2, 0x3, 0x4]))
+	assert memory.read(0xFFE) == 0x1
+	assert memory.read(0xFFF) == 0x2
+	assert memory.read(0x0) == 0x3
+	assert memory.read(0x1) == 0x4
+
+def test_read_block_wraps_around():
+	memory.write(0xFFF, bytes([0x1, 0x2]))
+	assert bytes(memory.read_block(0xFFF, 2)) == bytes([0x1, 0x2])
+	assert bytes(memory.read_block(0x1000, 1)) == bytes([0x2])
@@ -0,0 +1,98 @@
+import pytest
+from chip8_control_unit import Chip8ControlUnit
+from chip8_scheduler import Chip8Scheduler
+from chip8_movie import Chip8Movie, replay
+from chip8_snapshot import save_state
+from chip8_rom import Chip8Rom
+
+# Wait for a key (FX0A) into V3, then draw a random character at (V1,V2) for as long as key 5 is held, forever
+ROM = Chip8Rom(bytes.fromhex("F3 0A 60 05 E0 A1 12 0A 12 04 C0 0F F0 29 C1 3F C2 1F D1 25 12 04"))
+
+class FakeClock:
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self):
+		self.now += 1 / 60
+		return self.now
+
+class ScriptedInput:
+	"""
+	Presses the keys of a list, one mask per frame.
+	"""
+	def __init__(self, masks):
+		self.masks = masks
+		self.frame = 0
+
+	def get_keys(self):
+		keys = self.masks[self.frame % len(self.masks)]
+		self.frame += 1
+		return keys
+
+def record(frames:int, movie:Chip8Movie) -> Chip8ControlUnit:
+	masks = [0x0] * 5 + [0x0100] * 3 + [0x0020] * 20 + [0x0]
+	chip8vm = Chip8ControlUnit(seed=movie.seed, input_provider=ScriptedInput(masks))
+	chip8vm.load_rom(ROM)
+	scheduler = Chip8Scheduler(chip8vm, instructions_per_second=600, clock=FakeClock(), recorder=movie)
+	for i in range(frames + 1):
+		scheduler.run_frame()
+	return chip8vm
+
+def test_keys_sampled_per_frame():
+	chip8vm = Chip8ControlUnit(input_provider=ScriptedInput([0x0, 0x0120]))
+	assert chip8vm.sample_keys() == 0x0
+	assert not chip8vm.machine.is_key_pressed(0x5)
+
+	assert chip8vm.sample_keys() == 0x0120
+	assert chip8vm.machine.is_key_pressed(0x5)
+	assert chip8vm.machine.is_key_pressed(0x8)
+	assert not chip8vm.machine.is_key_pressed(0x6)
+
+def test_replay():
+	movie = Chip8Movie.record(ROM)
+	chip8vm = record(120, movie)
+	assert len(movie) == 120
+	assert movie.frames["instructions"].sum() in (1199, 1200)
+	assert chip8vm.machine.read_register(0x3) == 0x8
+
+	replayed = replay(movie, ROM)
+	assert save_state(replayed) == save_state(chip8vm)
+
+def test_movie_file(tmp_path):
+	movie = Chip8Movie.record(ROM, seed=1234)
+	chip8vm = record(300, movie)
+	path = str(tmp_path / "session.c8m")
+	movie.save(path)
+
+	loaded = Chip8Movie.load(path)
+	assert loaded.seed == 1234
+	assert (loaded.frames == movie.frames).all()
+	# A header and five bytes per frame, compressed
+	assert len(loaded.to_bytes()) < 300 * 5
+	assert save_state(replay(loaded, ROM)) == save_state(chip8vm)
+
+def test_replay_checks_the_rom():
+	movie = Chip8Movie.record(ROM)
+	record(10, movie)
+	with pytest.raises(ValueError):
+		replay(movie, Chip8Rom(bytes.fromhex("12 00")))
+
+def test_replay_keeps_the_quirks():
+	# V1 = 0x80, V0 = V1 >> 1 (shifts Vy into Vx with the cosmac-vip quirks), loop
+	rom = Chip8Rom(bytes.fromhex("61 80 80 16 12 04"))
+	movie = Chip8Movie.from_bytes(Chip8Movie.record(rom, seed=7, quirks="cosmac-vip").to_bytes())
+	assert movie.quirks == "cosmac-vip"
+
+	chip8vm = Chip8ControlUnit(seed=movie.seed, quirks=movie.quirks)
+	chip8vm.load_rom(rom)
+	scheduler = Chip8Scheduler(chip8vm, instructions_per_second=600, clock=FakeClock(), recorder=movie)
+	for i in range(11):
+		scheduler.run_frame()
+	assert chip8vm.machine.read_register(0x0) == 0x40
+
+	replayed = replay(movie, rom)
+	assert save_state(replayed) == save_state(chip8vm)
+
+def test_movie_needs_a_named_profile():
+	with pytest.raises(ValueError):
+		Chip8Movie.record(ROM, quirks="chip-99")
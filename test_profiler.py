@@ -0,0 +1,69 @@
+import pytest
+from chip8_control_unit import Chip8ControlUnit
+from chip8_profiler import Chip8Profiler
+
+@pytest.fixture
+def chip8vm():
+	chip8vm = Chip8ControlUnit()
+	# 0x200: call 0x206, 0x202: jump to 0x200, 0x206: V0 += 1, 0x208: return
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("22 06 12 00 00 E0 70 01 00 EE"))
+	return chip8vm
+
+def test_profiler(chip8vm, tmp_path):
+	profiler = Chip8Profiler(chip8vm)
+	original_table = chip8vm._dispatch_table
+	profiler.enable()
+	assert chip8vm._dispatch_table is not original_table
+
+	# 10 loops of 4 instructions
+	chip8vm.run(cycles=40)
+	profiler.disable()
+	assert chip8vm._dispatch_table is original_table
+
+	counts = {name: count for name, count, total, mean in profiler.histogram()}
+	assert counts == {"opcode2": 10, "opcode1": 10, "opcode7": 10, "opcode00EE": 10}
+
+	assert sorted(profiler.hot_addresses()) == [(0x200, 10), (0x202, 10), (0x206, 10), (0x208, 10)]
+
+	# The subroutine runs with the call at 0x200 in the stack
+	frames = [line.rsplit(" ", 1)[0] for line in profiler.folded_stacks()]
+	assert "main;call@0x200;opcode7" in frames
+	assert "main;opcode1" in frames
+
+	profiler.write_folded_stacks(str(tmp_path / "stacks.folded"))
+	assert len((tmp_path / "stacks.folded").read_text().splitlines()) == len(frames)
+
+def test_profiler_disabled_doesnt_count(chip8vm):
+	profiler = Chip8Profiler(chip8vm)
+	chip8vm.run(cycles=8)
+	assert profiler.histogram() == []
+	assert profiler.hot_addresses() == []
+
+def test_profiler_keeps_blocks_terminated():
+	chip8vm = Chip8ControlUnit()
+	# 0x200: V0 += 1, 0x202: jump to 0x200, 0x204: V1 = 0x55 is never reached
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("70 01 12 00 61 55"))
+	profiler = Chip8Profiler(chip8vm)
+	profiler.enable()
+	for i in range(5):
+		assert chip8vm.execute_block() == 2
+		assert chip8vm.program_counter == 0x200
+	profiler.disable()
+	assert chip8vm.machine.read_register(0x0) == 5
+	assert chip8vm.machine.read_register(0x1) == 0x0
+
+def test_profiler_counts_addresses_in_blocks():
+	chip8vm = Chip8ControlUnit()
+	# 0x200: V0 += 1, 0x202: V1 += 2, 0x204: V2 += 3, 0x206: jump to 0x200
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("70 01 71 02 72 03 12 00"))
+	profiler = Chip8Profiler(chip8vm)
+	profiler.enable()
+	for i in range(4):
+		assert chip8vm.execute_block() == 4
+	profiler.disable()
+	assert profiler.hot_addresses() == [(0x200, 4), (0x202, 4), (0x204, 4), (0x206, 4)]
+
+	# Blocks translated after profiling don't set the program counter per instruction, but still end where they should
+	assert chip8vm.execute_block() == 4
+	assert chip8vm.program_counter == 0x200
+	assert chip8vm.machine.read_register(0x2) == 15
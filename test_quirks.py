@@ -0,0 +1,92 @@
+import pytest
+import numpy
+from chip8_control_unit import Chip8ControlUnit, build_dispatch_table
+from chip8_quirks import get_profile, get_handler_name, PROFILES
+
+def test_profiles():
+	assert get_profile(None) == get_profile("default") == frozenset()
+	assert get_profile({"jump_vx"}) == frozenset({"jump_vx"})
+	with pytest.raises(ValueError):
+		get_profile("chip-99")
+	with pytest.raises(ValueError):
+		get_profile({"wobbly_sprites"})
+	with pytest.raises(ValueError):
+		get_profile({"load_store_increment", "load_store_increment_x"})
+
+	assert get_handler_name("opcodeD", PROFILES["cosmac-vip"]) == "opcodeD_clip_display_wait"
+	assert get_handler_name("opcode8_4", PROFILES["cosmac-vip"]) == "opcode8_4"
+
+def test_dispatch_tables_are_shared_per_profile():
+	vip = Chip8ControlUnit(quirks="cosmac-vip")
+	assert Chip8ControlUnit(quirks="cosmac-vip")._dispatch_table is vip._dispatch_table
+	assert Chip8ControlUnit()._dispatch_table is not vip._dispatch_table
+	assert build_dispatch_table(Chip8ControlUnit, PROFILES["schip"])[0xB123] is Chip8ControlUnit.opcodeB_vx
+	assert build_dispatch_table(Chip8ControlUnit)[0xB123] is Chip8ControlUnit.opcodeB
+
+def test_shift_and_logic_quirks():
+	for quirks, shifted, flag in ((None, 0x40, 0x1), ("cosmac-vip", 0x08, 0x0)):
+		chip8vm = Chip8ControlUnit(quirks=quirks)
+		chip8vm.machine.write_register(0x1, 0x81)
+		chip8vm.machine.write_register(0x2, 0x10)
+		chip8vm.decode_and_execute(0x8126)
+		assert chip8vm.machine.read_register(0x1) == shifted
+		assert chip8vm.machine.read_register(0xF) == flag
+
+	# VF is reset by the logic opcodes
+	chip8vm = Chip8ControlUnit(quirks="cosmac-vip")
+	chip8vm.machine.write_register(0xF, 0x1)
+	chip8vm.decode_and_execute(0x8121)
+	assert chip8vm.machine.read_register(0xF) == 0x0
+
+def test_jump_and_load_store_quirks():
+	chip8vm = Chip8ControlUnit(quirks="chip-48")
+	chip8vm.machine.write_register(0x0, 0x10)
+	chip8vm.machine.write_register(0x3, 0x20)
+	chip8vm.decode_and_execute(0xB300)
+	assert chip8vm.program_counter == 0x320
+
+	for quirks, memory_register in ((None, 0x300), ("chip-48", 0x303), ("xo-chip", 0x304)):
+		chip8vm = Chip8ControlUnit(quirks=quirks)
+		chip8vm.machine.write_memory_register(0x300)
+		chip8vm.decode_and_execute(0xF355)
+		assert chip8vm.machine.read_memory_register() == memory_register
+		chip8vm.machine.write_memory_register(0x300)
+		chip8vm.decode_and_execute(0xF365)
+		assert chip8vm.machine.read_memory_register() == memory_register
+
+def test_clip_sprites():
+	for quirks, wrapped in ((None, True), ("schip", False)):
+		chip8vm = Chip8ControlUnit(quirks=quirks)
+		chip8vm.machine.write_memory(0x300, bytes([0xFF, 0xFF]))
+		chip8vm.decode_and_execute(0xA300)
+		chip8vm.decode_and_execute(0x603C)
+		chip8vm.decode_and_execute(0x611F)
+		chip8vm.decode_and_execute(0xD012)
+		state = chip8vm.machine.get_screen_state()
+		assert state[63, 31] != 0
+		assert (state[0, 0] != 0) == wrapped
+		assert numpy.count_nonzero(state) == (16 if wrapped else 4)
+
+def test_display_wait():
+	chip8vm = Chip8ControlUnit(quirks="cosmac-vip")
+	# Draw, V0 += 1, loop
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("D0 15 70 01 12 00"))
+
+	# One sprite per frame
+	assert chip8vm.run(cycles=100) == 1
+	assert chip8vm.run(cycles=100) == 0
+	assert chip8vm.execute_block() == 0
+	assert not chip8vm.press_key(0x1)
+
+	# The next frame continues after the sprite
+	chip8vm.sample_keys()
+	assert chip8vm.waiting_register is None
+	assert chip8vm.program_counter == 0x202
+	assert chip8vm.run(cycles=100) == 3
+	assert chip8vm.machine.read_register(0x0) == 0x1
+
+	# Translated blocks end at the sprite too
+	chip8vm.sample_keys()
+	assert chip8vm.execute_block() == 2
+	assert chip8vm.execute_block() == 1
+	assert chip8vm.waiting_register is not None
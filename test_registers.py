@@ -1,12 +1,15 @@
 import pytest
+import numpy
 
-from chip8_register import Chip8Register, Chip8MemoryRegister
+from chip8_register import Chip8Register, Chip8MemoryRegister, Chip8RegisterFile
 
 register1 = Chip8Register()
 register2 = Chip8Register()
 
 memory_register = Chip8MemoryRegister()
 
+register_file = Chip8RegisterFile()
+
 def test_set_register():
 	register1.set(0xA8)
 	assert register1.get_state() == 0xA8
@@ -31,4 +34,25 @@ def test_memory_register_overflow_underflow():
 	assert memory_register.get_state() == 0x3AB0
 
 	memory_register.set(-0x1)
-	assert memory_register.get_state() == 0xFFFF
\ No newline at end of file
+	assert memory_register.get_state() == 0xFFFF
+
+def test_register_file():
+	register_file.write(0x3, 0xA8)
+	assert register_file.read(0x3) == 0xA8
+
+	register_file.write(0x3, 0x1FF)
+	assert register_file.read(0x3) == 0xFF
+
+	register2.set(0x42)
+	register_file.write(0x3, register2)
+	assert register_file.read(0x3) == 0x42
+
+	register_file.write_memory_register(0x23AB0)
+	assert register_file.read_memory_register() == 0x3AB0
+
+def test_register_file_ranges():
+	register_file.write_range(bytes([0x1, 0x2, 0x3, 0x4]))
+	assert register_file.read_range(4) == bytes([0x1, 0x2, 0x3, 0x4])
+
+	register_file.write_range(numpy.array([0x100, 0xAA]))
+	assert register_file.read_range(3) == bytes([0x0, 0xAA, 0x3])
@@ -0,0 +1,66 @@
+from chip8_control_unit import Chip8ControlUnit
+from chip8_rewind import Chip8Rewind
+from chip8_snapshot import save_state
+
+# Draw a random font character at a random position, clearing the screen every 4th frame, with a subroutine call
+PROGRAM = bytes.fromhex("C0 0F F0 29 C1 3F C2 1F D1 25 22 10 73 01 12 00 A3 00 F3 55 00 EE")
+
+def new_control_unit() -> Chip8ControlUnit:
+	chip8vm = Chip8ControlUnit(seed=1)
+	chip8vm.machine.write_memory(0x200, PROGRAM)
+	return chip8vm
+
+def test_step_back():
+	chip8vm = new_control_unit()
+	rewind = Chip8Rewind(chip8vm, capacity=100, keyframe_interval=10)
+	assert not rewind.step_back()
+
+	snapshots = []
+	for frame in range(50):
+		chip8vm.run(cycles=7)
+		chip8vm.tick_timers()
+		rewind.capture()
+		snapshots.append(save_state(chip8vm))
+	assert len(rewind) == 50
+
+	# Every step back restores the previous frame exactly
+	for frame in range(48, -1, -1):
+		assert rewind.step_back()
+		assert save_state(chip8vm) == snapshots[frame]
+
+	# The oldest frame stays
+	assert rewind.step_back()
+	assert save_state(chip8vm) == snapshots[0]
+	assert len(rewind) == 1
+
+def test_capture_after_step_back():
+	chip8vm = new_control_unit()
+	rewind = Chip8Rewind(chip8vm, capacity=100, keyframe_interval=10)
+	snapshots = []
+	for frame in range(15):
+		chip8vm.run(cycles=7)
+		rewind.capture()
+		snapshots.append(save_state(chip8vm))
+
+	for frame in range(5):
+		rewind.step_back()
+	assert save_state(chip8vm) == snapshots[9]
+
+	# The emulation goes on from the restored frame, deterministically
+	for frame in range(10, 15):
+		chip8vm.run(cycles=7)
+		rewind.capture()
+		assert save_state(chip8vm) == snapshots[frame]
+	rewind.step_back()
+	assert save_state(chip8vm) == snapshots[13]
+
+def test_ring_buffer_is_bounded():
+	chip8vm = new_control_unit()
+	rewind = Chip8Rewind(chip8vm, capacity=1000, keyframe_interval=60)
+	for frame in range(3000):
+		chip8vm.run(cycles=8)
+		rewind.capture()
+	assert len(rewind) == 1000
+
+	# A full snapshot is more than 4 KB, the deltas keep a thousand frames well below that each
+	assert rewind.memory_usage() < 1000 * len(save_state(chip8vm)) / 10
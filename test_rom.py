@@ -0,0 +1,59 @@
+import pytest
+import os
+from chip8_rom import Chip8Rom, MAX_ROM_SIZE
+from chip8_control_unit import Chip8ControlUnit
+
+@pytest.fixture
+def rom_path(tmp_path):
+	path = tmp_path / "program.ch8"
+	path.write_bytes(bytes([0x60, 0xAA, 0x12, 0x02]))
+	return str(path)
+
+def test_open_rom(rom_path):
+	rom = Chip8Rom.open(rom_path)
+	assert len(rom) == 4
+	assert bytes(rom.data) == bytes([0x60, 0xAA, 0x12, 0x02])
+
+	# The image is read-only
+	with pytest.raises(TypeError):
+		rom.data[0] = 0x0
+
+def test_rom_is_shared(rom_path):
+	assert Chip8Rom.open(rom_path) is Chip8Rom.open(rom_path)
+
+	chip8vm1 = Chip8ControlUnit()
+	chip8vm2 = Chip8ControlUnit()
+	chip8vm1.load_file(rom_path)
+	chip8vm2.load_file(rom_path)
+
+	# Each control unit gets its own copy of the program
+	chip8vm1.machine.write_memory(0x201, 0x55)
+	assert chip8vm1.machine.read_memory(0x201) == 0x55
+	assert chip8vm2.machine.read_memory(0x201) == 0xAA
+	assert Chip8Rom.open(rom_path).data[1] == 0xAA
+
+def test_rom_too_large(tmp_path):
+	path = tmp_path / "large.ch8"
+	path.write_bytes(bytes(MAX_ROM_SIZE + 1))
+	with pytest.raises(ValueError):
+		Chip8Rom.open(str(path))
+
+def test_empty_rom(tmp_path):
+	path = tmp_path / "empty.ch8"
+	path.write_bytes(b"")
+	assert len(Chip8Rom.open(str(path))) == 0
+
+def test_rewritten_rom_replaces_the_old_image(rom_path):
+	old_rom = Chip8Rom.open(rom_path)
+	with open(rom_path, "wb") as file:
+		file.write(bytes([0x12, 0x00]))
+	# Make sure the modification time changes, even on coarse file systems
+	os.utime(rom_path, ns=(0, 0))
+
+	new_rom = Chip8Rom.open(rom_path)
+	assert new_rom is not old_rom
+	assert bytes(new_rom.data) == bytes([0x12, 0x00])
+	# The entry of the file now holds the new version
+	version, rom = Chip8Rom._opened[os.path.realpath(rom_path)]
+	assert rom is new_rom
+	assert version == (0, 2)
@@ -0,0 +1,89 @@
+import pytest
+from chip8_control_unit import Chip8ControlUnit
+from chip8_scheduler import Chip8Scheduler
+
+class FakeClock:
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self):
+		return self.now
+
+@pytest.fixture
+def chip8vm():
+	chip8vm = Chip8ControlUnit()
+	# V0 += 1, then jump back
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("70 01 12 00"))
+	return chip8vm
+
+def test_instructions_per_frame(chip8vm):
+	clock = FakeClock()
+	scheduler = Chip8Scheduler(chip8vm, instructions_per_second=500, clock=clock)
+	assert scheduler.run_frame() == 0
+
+	# 500 instructions per second at 60 frames per second is 8.33 instructions per frame, the fractions carry over
+	executed = 0
+	for i in range(60):
+		clock.now += 1 / 60
+		executed += scheduler.run_frame()
+	assert executed in (499, 500)
+
+def test_timers_dont_depend_on_speed(chip8vm):
+	for instructions_per_second in (30, 1000):
+		clock = FakeClock()
+		chip8vm.machine.set_timer(0xFF)
+		scheduler = Chip8Scheduler(chip8vm, instructions_per_second=instructions_per_second, clock=clock)
+		scheduler.run_frame()
+		for i in range(30):
+			clock.now += 1 / 60
+			scheduler.run_frame()
+		assert chip8vm.machine.get_remaining_time() in (0xFF - 29, 0xFF - 30)
+
+def test_restart_clock(chip8vm):
+	clock = FakeClock()
+	scheduler = Chip8Scheduler(chip8vm, instructions_per_second=600, clock=clock)
+	scheduler.run_frame()
+	clock.now += 0.1
+	scheduler.restart_clock()
+
+	# The time before the restart isn't made up for
+	assert scheduler.run_frame() == 0
+	clock.now += 0.1
+	assert scheduler.run_frame() == 60
+
+def test_key_press_ends_wait():
+	class ScriptedInput:
+		def __init__(self):
+			self.keys = 0x0
+
+		def get_keys(self):
+			return self.keys
+
+	provider = ScriptedInput()
+	# Wait for a key into V3, then V0 += 1 forever
+	chip8vm = Chip8ControlUnit(input_provider=provider)
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("F3 0A 70 01 12 02"))
+	chip8vm.machine.set_timer(0xFF)
+	clock = FakeClock()
+	scheduler = Chip8Scheduler(chip8vm, instructions_per_second=600, clock=clock)
+	scheduler.run_frame()
+
+	# A key held before the wait doesn't end it, it has to be pressed again
+	provider.keys = 0x0040
+	for i in range(30):
+		clock.now += 1 / 60
+		scheduler.run_frame()
+	assert chip8vm.waiting_register == 0x3
+	assert chip8vm.machine.read_register(0x0) == 0
+	# The timer kept going at 60 Hz
+	assert chip8vm.machine.get_remaining_time() in (0xFF - 29, 0xFF - 30, 0xFF - 31)
+
+	provider.keys = 0x0
+	clock.now += 1 / 60
+	scheduler.run_frame()
+	provider.keys = 0x0050
+	clock.now += 1 / 60
+	scheduler.run_frame()
+	assert chip8vm.waiting_register is None
+	assert chip8vm.machine.read_register(0x3) == 0x4
+	assert chip8vm.machine.read_register(0x0) > 0
@@ -198,4 +198,112 @@ def test_screen_preserves_state(sprite4):
 	manual_array[11,1] = white
 	manual_array[13,1] = white
 	manual_array[15,1] = white
-	assert numpy.array_equal(screen.get_state(), manual_array)
\ No newline at end of file
+	assert numpy.array_equal(screen.get_state(), manual_array)
+
+def test_headless_screen():
+	class RecordingDisplay:
+		def __init__(self):
+			self.presented = []
+
+		def get_init(self):
+			return True
+
+		def present(self, screen):
+			self.presented.append(screen.get_state())
+
+	# Without a display, updating the screen does nothing
+	headless_screen = Chip8Screen()
+	assert headless_screen.display is None
+	headless_screen.draw_sprite(numpy.array([0x80]), 0, 0)
+	headless_screen.update()
+
+	# With a display, the framebuffer is presented on update
+	display = RecordingDisplay()
+	presented_screen = Chip8Screen(display)
+	presented_screen.draw_sprite(numpy.array([0x80]), 1, 2)
+	presented_screen.update()
+	assert len(display.presented) == 1
+	assert display.presented[0][1,2] == white
+
+def test_dirty_rect(sprite4):
+	screen.clear()
+	assert screen.take_dirty_rect() == (0, 0, screen.width, screen.height)
+	assert screen.take_dirty_rect() is None
+
+	# Two sprites are merged into a single region
+	screen.draw_sprite(sprite4, 4, 10)
+	screen.draw_sprite(sprite4, 20, 3)
+	assert screen.take_dirty_rect() == (4, 3, 28, 12)
+
+	# A sprite that wraps around horizontally marks every column
+	screen.draw_sprite(sprite4, 60, 10)
+	assert screen.take_dirty_rect() == (0, 10, screen.width, 12)
+
+def test_packed_rows(sprite4):
+	packed_screen = Chip8Screen()
+	assert packed_screen.get_rows() == (0,) * packed_screen.height
+
+	# The most significant bit of a row is its leftmost pixel, a sprite past the right edge wraps around
+	packed_screen.draw_sprite(sprite4, 60, 1)
+	assert packed_screen.rows[1] == 0xA000000000000000 | 0xA
+	assert packed_screen.rows[2] == 0x5000000000000000 | 0x5
+	assert len(packed_screen.pack()) == 256
+
+	# Equal screens have equal, hashable states
+	other_screen = Chip8Screen()
+	other_screen.unpack(packed_screen.pack())
+	assert other_screen.get_rows() == packed_screen.get_rows()
+	assert hash(other_screen.get_rows()) == hash(packed_screen.get_rows())
+	assert numpy.array_equal(other_screen.get_state(), packed_screen.get_state())
+
+	# Collisions only where a set pixel is drawn again
+	assert packed_screen.draw_sprite(numpy.array([0x01]), 55, 2) == False
+	assert packed_screen.draw_sprite(numpy.array([0x01]), 56, 2) == True
+
+def test_high_resolution_and_scrolling():
+	hires_screen = Chip8Screen()
+	hires_screen.set_resolution(128, 64)
+	assert hires_screen.get_state().shape == (128, 64)
+	assert hires_screen.take_dirty_rect() == (0, 0, 128, 64)
+
+	# 16x16 sprites take 2 bytes per row
+	assert hires_screen.draw_sprite(numpy.array([0x80, 0x01] * 16), 120, 60, sprite_width=16) == False
+	assert hires_screen.rows[60] == (0x1 << 7) | (0x1 << 120)
+	assert hires_screen.get_state()[120, 60] == white
+	# Wrapped around both edges
+	assert hires_screen.get_state()[7, 3] == white
+
+	hires_screen.scroll_down(2)
+	assert hires_screen.get_state()[120, 62] == white
+	assert hires_screen.get_state()[7, 5] == white
+	hires_screen.scroll_up(2)
+	hires_screen.scroll_right(4)
+	assert hires_screen.get_state()[124, 60] == white
+	assert hires_screen.get_state()[11, 3] == white
+	# Columns scrolled past the edge are lost
+	hires_screen.scroll_right(4)
+	hires_screen.scroll_left(4)
+	assert hires_screen.get_state()[124, 60] == 0
+	assert hires_screen.get_state()[11, 3] == white
+
+def test_planes():
+	plane_screen = Chip8Screen()
+	# Only the first plane is selected at first
+	plane_screen.draw_sprite(numpy.array([0x80]), 0, 0)
+	assert plane_screen.get_rows(1) == (0,) * 32
+
+	# With both planes selected, the sprite holds the rows of the first plane and then the ones of the second
+	plane_screen.select_planes(0x3)
+	plane_screen.draw_sprite(numpy.array([0x00, 0xC0]), 0, 1)
+	assert plane_screen.rows[1] == 0x0
+	assert plane_screen.get_rows(1)[1] == 0xC000000000000000
+	plane_screen.select_planes(0x2)
+	plane_screen.draw_sprite(numpy.array([0x80]), 0, 0)
+	state = plane_screen.get_state()
+	assert state[0, 0] == 0x555555
+	assert state[0, 1] == 0xAAAAAA
+
+	# Clearing only affects the selected planes
+	plane_screen.clear()
+	assert plane_screen.get_rows(1) == (0,) * 32
+	assert plane_screen.rows[0] == 0x8000000000000000
@@ -0,0 +1,115 @@
+import pytest
+from chip8_control_unit import Chip8ControlUnit
+from chip8_rom import Chip8Rom
+from chip8_snapshot import save_state, load_state, write_state_file, read_state_file
+
+# Random registers, I=font of V0, draw it at (V1,V2), call a subroutine that stores V0-V2 at 0x300, then loop
+PROGRAM = bytes.fromhex("C0 0F C1 3F C2 1F F0 29 D1 25 22 0E 12 00 A3 00 F2 55 00 EE")
+
+def new_control_unit(seed:int=1) -> Chip8ControlUnit:
+	chip8vm = Chip8ControlUnit(seed=seed)
+	chip8vm.load_rom(Chip8Rom(PROGRAM))
+	return chip8vm
+
+def machine_state(chip8vm:Chip8ControlUnit) -> tuple:
+	machine = chip8vm.machine
+	return (
+		chip8vm.program_counter,
+		machine.read_registers(16),
+		machine.read_memory_register(),
+		bytes(machine.read_memory_range(0x0, 0x1000)),
+		machine.get_stack(),
+		machine.get_remaining_time(),
+		machine.get_remaining_sound_time(),
+		machine.get_packed_screen()
+	)
+
+def test_snapshot_round_trip():
+	chip8vm = new_control_unit()
+	chip8vm.run(cycles=6)
+	chip8vm.machine.set_timer(0x30)
+	chip8vm.machine.set_sound_timer(0x7)
+	snapshot = save_state(chip8vm)
+
+	# Call stack holds the return address of the subroutine
+	assert chip8vm.machine.get_stack() == (0x20A,)
+
+	restored = new_control_unit(seed=2)
+	load_state(restored, snapshot)
+	assert machine_state(restored) == machine_state(chip8vm)
+
+	# Both continue exactly the same way, random numbers included
+	chip8vm.run(cycles=100)
+	restored.run(cycles=100)
+	assert machine_state(restored) == machine_state(chip8vm)
+
+def test_snapshot_rewinds():
+	chip8vm = new_control_unit()
+	snapshot = save_state(chip8vm)
+	chip8vm.run(cycles=50)
+	after = machine_state(chip8vm)
+
+	load_state(chip8vm, snapshot)
+	assert chip8vm.program_counter == 0x200
+	assert chip8vm.machine.get_stack() == ()
+	chip8vm.run(cycles=50)
+	assert machine_state(chip8vm) == after
+
+def test_snapshot_discards_translated_blocks():
+	chip8vm = new_control_unit()
+	snapshot = save_state(chip8vm)
+	# Translate a block that starts with V0=0xAA instead of V0=rand() & 0x0F
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("60 AA"))
+	chip8vm.execute_block()
+	assert chip8vm.machine.read_register(0x0) == 0xAA
+
+	# The original program comes back, the block translated from the modified one must not run
+	load_state(chip8vm, snapshot)
+	chip8vm.execute_block()
+	assert chip8vm.machine.read_register(0x0) <= 0x0F
+
+def test_snapshot_file(tmp_path):
+	chip8vm = new_control_unit()
+	chip8vm.run(cycles=20)
+	path = str(tmp_path / "state.c8s")
+	write_state_file(chip8vm, path)
+
+	restored = new_control_unit(seed=3)
+	read_state_file(restored, path)
+	assert machine_state(restored) == machine_state(chip8vm)
+
+def test_invalid_snapshot():
+	chip8vm = new_control_unit()
+	snapshot = save_state(chip8vm)
+	with pytest.raises(ValueError):
+		load_state(chip8vm, b"XXXX" + snapshot[4:])
+	with pytest.raises(ValueError):
+		load_state(chip8vm, snapshot[:-1])
+
+def test_snapshot_keeps_key_wait():
+	chip8vm = Chip8ControlUnit()
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("F3 0A 12 00"))
+	chip8vm.run(cycles=10)
+	snapshot = save_state(chip8vm)
+
+	restored = Chip8ControlUnit()
+	load_state(restored, snapshot)
+	assert restored.waiting_register == 0x3
+	assert restored.run(cycles=10) == 0
+	assert restored.press_key(0x1)
+
+def test_snapshot_keeps_super_chip_state():
+	chip8vm = Chip8ControlUnit()
+	# High resolution, both planes, a big digit drawn and V0-V2 in the flags
+	chip8vm.machine.write_memory(0x200, bytes.fromhex("00 FF F3 01 60 07 F0 30 D1 1A F2 75 12 0C"))
+	chip8vm.run(cycles=10)
+	snapshot = save_state(chip8vm)
+
+	restored = Chip8ControlUnit()
+	load_state(restored, snapshot)
+	assert (restored.machine.get_screen_width(), restored.machine.get_screen_height()) == (128, 64)
+	assert restored.machine.get_plane_mask() == 0x3
+	assert restored.machine.read_flags(3) == chip8vm.machine.read_flags(3) == bytes([0x07, 0x0, 0x0])
+	for plane in range(2):
+		assert restored.machine.get_packed_screen(plane) == chip8vm.machine.get_packed_screen(plane)
+	assert restored.machine.get_screen_rows(1) != (0,) * 64